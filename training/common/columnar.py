@@ -0,0 +1,99 @@
+"""Columnar sidecar store for scenario datasets.
+
+Each column is a standalone ``.npy`` file inside ``<dataset>.columns/`` so
+loaders can memory-map it instead of re-parsing JSONL. ``columns.json`` records
+the row count and the byte size, modification time and SHA-256 of the JSONL it
+was derived from; a sidecar whose source size or mtime no longer matches is
+ignored and callers fall back to the JSONL. The SHA-256 is provenance only:
+hashing the source on every load would cost as much as the read it replaces.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Mapping
+
+import numpy as np
+
+from training.common.jsonl_io import compression_for
+from training.common.weight_export import write_json
+
+COLUMNAR_FORMAT = "ceip-columnar-v1"
+COLUMNAR_INDEX = "columns.json"
+
+
+def columns_dir_for(dataset_path: str | Path) -> Path:
+    source = Path(dataset_path)
+    plain = source.with_suffix("") if compression_for(source) else source
+    return plain.with_name(f"{plain.stem}.columns")
+
+
+def write_columns(
+    dataset_path: str | Path,
+    columns: Mapping[str, np.ndarray],
+    *,
+    source_sha256: str | None = None,
+    metadata: Mapping[str, Any] | None = None,
+) -> Path:
+    source = Path(dataset_path)
+    directory = columns_dir_for(source)
+    if directory.exists():
+        shutil.rmtree(directory)
+    directory.mkdir(parents=True)
+    row_counts = {int(np.shape(values)[0]) for values in columns.values()}
+    if len(row_counts) > 1:
+        raise ValueError(f"Columns disagree on row count: {sorted(row_counts)}")
+    for name, values in columns.items():
+        np.save(directory / f"{name}.npy", np.ascontiguousarray(values), allow_pickle=False)
+    write_json(
+        directory / COLUMNAR_INDEX,
+        {
+            "format": COLUMNAR_FORMAT,
+            "row_count": row_counts.pop() if row_counts else 0,
+            "source": source.name,
+            "source_bytes": source.stat().st_size if source.exists() else None,
+            "source_mtime_ns": source.stat().st_mtime_ns if source.exists() else None,
+            "source_sha256": source_sha256,
+            "columns": {
+                name: {"dtype": str(np.asarray(values).dtype), "shape": list(np.shape(values))}
+                for name, values in columns.items()
+            },
+            "metadata": dict(metadata or {}),
+        },
+    )
+    return directory
+
+
+def read_columns_index(dataset_path: str | Path) -> dict[str, Any] | None:
+    """Return the sidecar index if it exists and still matches the dataset on disk."""
+    source = Path(dataset_path)
+    index_path = columns_dir_for(source) / COLUMNAR_INDEX
+    if not index_path.exists():
+        return None
+    index = json.loads(index_path.read_text(encoding="utf-8"))
+    if index.get("format") != COLUMNAR_FORMAT:
+        return None
+    if source.exists():
+        # A same-size rewrite still moves the mtime, so check both.
+        stat = source.stat()
+        if index.get("source_bytes") != stat.st_size or index.get("source_mtime_ns") != stat.st_mtime_ns:
+            return None
+    return index
+
+
+def load_columns(dataset_path: str | Path, mmap: bool = True) -> dict[str, np.ndarray] | None:
+    index = read_columns_index(dataset_path)
+    if index is None:
+        return None
+    directory = columns_dir_for(dataset_path)
+    mode = "r" if mmap else None
+    return {name: np.load(directory / f"{name}.npy", mmap_mode=mode, allow_pickle=False) for name in index["columns"]}
+
+
+def discard_columns(dataset_path: str | Path) -> None:
+    """Drop a sidecar so a regenerated JSONL is never shadowed by stale columns."""
+    directory = columns_dir_for(dataset_path)
+    if directory.exists():
+        shutil.rmtree(directory)
@@ -17,6 +17,9 @@ def build_dataset_manifest(
     source_description: str = "placeholder bootstrap dataset",
     sampling_strategy: str | None = None,
     git_commit_sha: str | None = None,
+    solver_backend: str | None = None,
+    dataset_sha256: str | None = None,
+    lineage: list[dict[str, Any]] | None = None,
 ) -> dict[str, Any]:
     manifest = {
         "model_key": model_key,
@@ -35,4 +38,10 @@ def build_dataset_manifest(
         manifest["sampling_strategy"] = sampling_strategy
     if git_commit_sha:
         manifest["git_commit_sha"] = git_commit_sha
+    if dataset_sha256:
+        manifest["dataset_sha256"] = dataset_sha256
+    if lineage:
+        manifest["lineage"] = lineage
+    if solver_backend:
+        manifest["simulator_config"]["solver_backend"] = solver_backend
     return manifest
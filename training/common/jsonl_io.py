@@ -0,0 +1,153 @@
+"""Streaming JSONL readers and writers for simulator scenario datasets.
+
+Rows are serialized with ``stable_json_dumps`` one line at a time, so memory
+stays bounded by the buffer size rather than the dataset size. Outputs ending
+in ``.gz`` or ``.zst`` are compressed transparently; the recorded SHA-256 always
+covers the uncompressed JSONL bytes so it is comparable across encodings.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Callable, Iterable, Iterator
+
+from training.common.weight_export import stable_json_dumps
+
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+WRITE_BUFFER_BYTES = 1 << 20
+
+
+@dataclass(frozen=True)
+class JsonlWriteResult:
+    path: Path
+    row_count: int
+    sha256: str
+
+
+def compression_for(path: str | Path) -> str | None:
+    return COMPRESSION_SUFFIXES.get(Path(path).suffix)
+
+
+def _load_zstandard():
+    try:
+        import zstandard  # type: ignore
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("zstandard is required for .zst scenario files. pip install zstandard first.") from exc
+    return zstandard
+
+
+def _compressed_writer(raw: IO[bytes], compression: str | None) -> IO[bytes]:
+    if compression is None:
+        return raw
+    if compression == "gzip":
+        # Fixed mtime and empty filename keep compressed output reproducible.
+        return gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0)
+    if compression == "zstd":
+        return _load_zstandard().ZstdCompressor().stream_writer(raw, closefd=False)
+    raise ValueError(f"Unsupported JSONL compression: {compression}")
+
+
+def write_jsonl_lines(path: str | Path, lines: Iterable[str], compression: str | None = None) -> JsonlWriteResult:
+    """Write pre-serialized JSONL lines, hashing them as they stream past.
+
+    The file is written to a temporary sibling and moved into place only once
+    every line has been consumed, so a failed run never leaves a truncated output.
+    """
+    destination = Path(path)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    compression = compression or compression_for(destination)
+    staging = destination.with_name(f"{destination.name}.tmp")
+    digest = hashlib.sha256()
+    row_count = 0
+    try:
+        with open(staging, "wb", buffering=WRITE_BUFFER_BYTES) as raw:
+            writer = _compressed_writer(raw, compression)
+            try:
+                for line in lines:
+                    encoded = (line + "\n").encode("utf-8")
+                    digest.update(encoded)
+                    writer.write(encoded)
+                    row_count += 1
+                if row_count == 0:
+                    # Matches the historical "\n".join(...) + "\n" output for empty datasets.
+                    digest.update(b"\n")
+                    writer.write(b"\n")
+            finally:
+                if writer is not raw:
+                    writer.close()
+        os.replace(staging, destination)
+    except BaseException:
+        staging.unlink(missing_ok=True)
+        raise
+    return JsonlWriteResult(path=destination, row_count=row_count, sha256=digest.hexdigest())
+
+
+def write_jsonl_rows(path: str | Path, rows: Iterable[Any], compression: str | None = None) -> JsonlWriteResult:
+    return write_jsonl_lines(path, (stable_json_dumps(row) for row in rows), compression)
+
+
+def open_jsonl(path: str | Path) -> IO[str]:
+    source = Path(path)
+    compression = compression_for(source)
+    if compression == "gzip":
+        return gzip.open(source, "rt", encoding="utf-8")
+    if compression == "zstd":
+        raw = open(source, "rb")
+        return io.TextIOWrapper(_load_zstandard().ZstdDecompressor().stream_reader(raw, closefd=True), encoding="utf-8")
+    return open(source, "r", encoding="utf-8")
+
+
+def _json_loader() -> Callable[[str], Any]:
+    """Return ``orjson.loads`` when installed, falling back to ``json.loads``.
+
+    Both parse floats with correct rounding, so the values are identical;
+    orjson rejects the NaN/Infinity literals ``json.dumps`` can emit, so those
+    lines are re-parsed with the standard library.
+    """
+    try:
+        import orjson  # type: ignore
+    except ImportError:  # pragma: no cover - optional accelerator
+        return json.loads
+
+    def loads(line: str) -> Any:
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            return json.loads(line)
+
+    return loads
+
+
+def iter_jsonl(path: str | Path) -> Iterator[Any]:
+    loads = _json_loader()
+    with open_jsonl(path) as handle:
+        for line in handle:
+            if line.strip():
+                yield loads(line)
+
+
+def read_jsonl_rows(path: str | Path, positions: Iterable[int]) -> dict[int, Any]:
+    """Parse only the rows at ``positions`` (counting non-blank lines, as ``iter_jsonl`` does)."""
+    wanted = set(positions)
+    rows: dict[int, Any] = {}
+    if not wanted:
+        return rows
+    loads = _json_loader()
+    last = max(wanted)
+    with open_jsonl(path) as handle:
+        position = 0
+        for line in handle:
+            if not line.strip():
+                continue
+            if position in wanted:
+                rows[position] = loads(line)
+            if position >= last:
+                break
+            position += 1
+    return rows
@@ -0,0 +1,140 @@
+"""Content-addressed on-disk cache for generated scenario datasets.
+
+Entries are keyed by a SHA-256 over the generation parameters (simulator
+version, seed, count, topology, backend options) and the bytes of the
+simulator source files, so any change to the simulator invalidates them.
+Each entry stores the plain JSONL plus an ``entry.json`` record; the cache is
+trimmed least-recently-used first once it exceeds its size budget. Other
+subdirectories (network contexts, solar tables, sensitivity memos) hold
+auxiliary files that count against the same budget and are evicted file by
+file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+from training.common.jsonl_io import JsonlWriteResult, compression_for, open_jsonl, write_jsonl_lines
+from training.common.weight_export import stable_json_dumps, write_json
+
+DEFAULT_CACHE_DIR = Path(os.environ.get("CEIP_SCENARIO_CACHE", "~/.cache/ceip-scenarios")).expanduser()
+DEFAULT_CACHE_MAX_BYTES = 10 * 1024**3
+CACHE_DATASET = "scenarios.jsonl"
+CACHE_ENTRY = "entry.json"
+
+
+@dataclass(frozen=True)
+class CachedDataset:
+    key: str
+    dataset_path: Path
+    row_count: int
+    sha256: str
+
+
+def scenario_cache_key(params: Mapping[str, Any], source_files: Iterable[str | Path]) -> str:
+    digest = hashlib.sha256(stable_json_dumps(dict(params)).encode("utf-8"))
+    for source in sorted(str(Path(path).resolve()) for path in source_files):
+        digest.update(Path(source).read_bytes())
+    return digest.hexdigest()
+
+
+def lookup_cached_dataset(key: str, cache_dir: Path = DEFAULT_CACHE_DIR) -> CachedDataset | None:
+    entry_dir = cache_dir / key
+    entry_path = entry_dir / CACHE_ENTRY
+    dataset_path = entry_dir / CACHE_DATASET
+    if not entry_path.exists() or not dataset_path.exists():
+        return None
+    entry = json.loads(entry_path.read_text(encoding="utf-8"))
+    if entry.get("bytes") != dataset_path.stat().st_size:
+        return None
+    # Touch the entry so LRU eviction sees it as recently used.
+    os.utime(entry_path)
+    return CachedDataset(key=key, dataset_path=dataset_path, row_count=int(entry["row_count"]), sha256=str(entry["sha256"]))
+
+
+def restore_cached_dataset(cached: CachedDataset, destination: Path) -> JsonlWriteResult:
+    """Materialize a cache hit at ``destination``, compressing if its suffix asks for it."""
+    if compression_for(destination):
+        with open_jsonl(cached.dataset_path) as handle:
+            return write_jsonl_lines(destination, (line.rstrip("\n") for line in handle if line.strip()))
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    staging = destination.with_name(f"{destination.name}.tmp")
+    shutil.copyfile(cached.dataset_path, staging)
+    os.replace(staging, destination)
+    return JsonlWriteResult(path=destination, row_count=cached.row_count, sha256=cached.sha256)
+
+
+def store_cached_dataset(
+    key: str,
+    written: JsonlWriteResult,
+    *,
+    params: Mapping[str, Any],
+    cache_dir: Path = DEFAULT_CACHE_DIR,
+    max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+) -> None:
+    staging = cache_dir / f".{key}.tmp"
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+    try:
+        if compression_for(written.path):
+            with open_jsonl(written.path) as handle:
+                write_jsonl_lines(staging / CACHE_DATASET, (line.rstrip("\n") for line in handle if line.strip()))
+        else:
+            shutil.copyfile(written.path, staging / CACHE_DATASET)
+        write_json(
+            staging / CACHE_ENTRY,
+            {
+                "params": dict(params),
+                "row_count": written.row_count,
+                "sha256": written.sha256,
+                "bytes": (staging / CACHE_DATASET).stat().st_size,
+            },
+        )
+        entry_dir = cache_dir / key
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+        os.replace(staging, entry_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    evict_cache(cache_dir, max_bytes)
+
+
+def evict_cache(cache_dir: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> list[str]:
+    """Delete least-recently-used entries and auxiliary files until the cache fits in ``max_bytes``."""
+    if not cache_dir.exists():
+        return []
+    entries = []
+    for entry_dir in cache_dir.iterdir():
+        # Skip loose files and in-flight ``.<key>.tmp`` staging directories.
+        if not entry_dir.is_dir() or entry_dir.name.startswith("."):
+            continue
+        entry_path = entry_dir / CACHE_ENTRY
+        if entry_path.exists():
+            size = sum(path.stat().st_size for path in entry_dir.iterdir() if path.is_file())
+            entries.append((entry_path.stat().st_mtime, entry_dir, size))
+            continue
+        for path in entry_dir.iterdir():
+            if path.is_file():
+                stat = path.stat()
+                entries.append((stat.st_mtime, path, stat.st_size))
+    entries.sort()
+    total = sum(size for _, _, size in entries)
+    evicted: list[str] = []
+    for _, path, size in entries:
+        if total <= max_bytes:
+            break
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+        total -= size
+        evicted.append(str(path.relative_to(cache_dir)))
+    return evicted
@@ -0,0 +1,260 @@
+"""Offline timing suite for the dispatch pipeline: generate, load, prepare, train and eval.
+
+Every stage reports ``seconds_per_1k_rows`` (per epoch for training), so runs
+with different profiles stay comparable. Results are written as JSON; passing a
+previous result as ``--baseline`` flags any stage that got slower by more than
+``--threshold`` and exits non-zero, which makes the suite usable as a gate
+between commits. Stage times are medians over ``--repeat`` runs; comparisons
+from fewer than three runs, and stages under 50 ms, are reported but never
+fail.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+if __package__ is None or __package__ == "":
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import numpy as np
+import torch
+
+from training.common.columnar import load_columns, write_columns
+from training.common.jsonl_io import write_jsonl_lines
+from training.common.weight_export import DEFAULT_SEED, PLACEHOLDER_TRAINED_AT, stable_json_dumps, write_json
+from training.dispatch_pinn.eval import forward_mlp, forward_mlp_batch
+from training.dispatch_pinn.simulator import FEATURE_COLUMNS, dispatch_columns_from_rows, iter_dispatch_rows, load_dispatch_columns
+from training.dispatch_pinn.train import export_weights, fit_dispatch_model, prepare_arrays, prepare_training_data, set_determinism
+
+BENCHMARK_FORMAT = "dispatch-benchmark-v1"
+DEFAULT_THRESHOLD = 0.2
+# Fewer runs per stage than this are too noisy to fail a baseline comparison on.
+GATE_MIN_REPEAT = 3
+# Stages this short (in seconds, baseline and current) are dominated by timer and cache noise.
+GATE_MIN_SECONDS = 0.05
+
+
+@dataclass(frozen=True)
+class BenchmarkProfile:
+    pandapower_rows: int
+    native_rows: int
+    load_rows: int
+    epochs: int
+    scalar_eval_rows: int
+    repeat: int
+    hidden_dim: int = 32
+    learning_rate: float = 0.008
+
+
+PROFILES = {
+    # pandapower solves dominate the small profile (~0.15 s each), so it keeps them few and runs each stage once.
+    "small": BenchmarkProfile(pandapower_rows=16, native_rows=1000, load_rows=20_000, epochs=5, scalar_eval_rows=500, repeat=1),
+    "full": BenchmarkProfile(pandapower_rows=256, native_rows=5000, load_rows=200_000, epochs=20, scalar_eval_rows=2000, repeat=3),
+}
+
+
+def _median_of(repeat: int, run: Callable[[], Any]) -> tuple[float, Any]:
+    """Run ``run`` ``repeat`` times and return the median wall time with the last result."""
+    timings = []
+    result = None
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def _stage(rows: int, seconds: float, **extra: Any) -> dict[str, Any]:
+    return {
+        "rows": rows,
+        "seconds": round(seconds, 6),
+        "seconds_per_1k_rows": round(seconds * 1000.0 / max(1, rows), 6),
+        "rows_per_second": round(rows / seconds, 1) if seconds > 0 else None,
+        **extra,
+    }
+
+
+def run_benchmarks(profile: BenchmarkProfile, *, seed: int, repeat: int, workers: int | None, scratch: Path) -> dict[str, dict[str, Any]]:
+    stages: dict[str, dict[str, Any]] = {}
+
+    seconds, _ = _median_of(
+        repeat,
+        lambda: list(iter_dispatch_rows(profile.pandapower_rows, seed, solver="pandapower", workers=workers)),
+    )
+    stages["generate_pandapower"] = _stage(profile.pandapower_rows, seconds)
+
+    try:
+        seconds, rows = _median_of(repeat, lambda: list(iter_dispatch_rows(profile.native_rows, seed, solver="native")))
+        stages["generate_native"] = _stage(profile.native_rows, seconds)
+    except (RuntimeError, ImportError) as exc:
+        # The native backend needs a HiGHS build; fall back to pandapower rows for the later stages.
+        print(f"[benchmark] skipping generate_native: {exc}", file=sys.stderr)
+        rows = list(iter_dispatch_rows(profile.pandapower_rows, seed, solver="pandapower", workers=workers))
+
+    lines = [stable_json_dumps(row) for row in rows]
+    dataset = scratch / "scenarios.jsonl"
+    write_jsonl_lines(dataset, (lines[position % len(lines)] for position in range(profile.load_rows)))
+    seconds, columns = _median_of(repeat, lambda: load_dispatch_columns(dataset))
+    stages["load_jsonl"] = _stage(profile.load_rows, seconds)
+
+    write_columns(dataset, columns)
+    seconds, _ = _median_of(
+        repeat,
+        lambda: {name: np.array(values) for name, values in (load_columns(dataset) or {}).items()},
+    )
+    stages["load_columnar"] = _stage(profile.load_rows, seconds)
+
+    seconds, _ = _median_of(repeat, lambda: prepare_arrays(columns))
+    stages["prepare_arrays"] = _stage(profile.load_rows, seconds)
+
+    training_columns = dispatch_columns_from_rows(rows)
+    data = prepare_training_data(training_columns, seed)
+
+    def train() -> Any:
+        set_determinism(seed)
+        model, _ = fit_dispatch_model(
+            data,
+            seed=seed,
+            epochs=profile.epochs,
+            hidden_dim=profile.hidden_dim,
+            learning_rate=profile.learning_rate,
+            patience=profile.epochs + 1,
+        )
+        return model
+
+    seconds, model = _median_of(repeat, train)
+    stages["train_epoch"] = _stage(len(data.train_idx), seconds / profile.epochs, epochs=profile.epochs)
+
+    weights = export_weights(
+        model,
+        data.feature_means,
+        data.feature_stds,
+        {},
+        seed,
+        data.row_count,
+        PLACEHOLDER_TRAINED_AT,
+        data.target_mean,
+        data.target_std,
+    )
+    features = np.column_stack([np.asarray(training_columns[column], dtype=np.float64) for column in FEATURE_COLUMNS])
+    scalar_rows = features[: profile.scalar_eval_rows].tolist()
+    seconds, _ = _median_of(repeat, lambda: [forward_mlp(weights, row) for row in scalar_rows])
+    stages["eval_forward"] = _stage(len(scalar_rows), seconds)
+    seconds, _ = _median_of(repeat, lambda: forward_mlp_batch(weights, features))
+    stages["eval_forward_batch"] = _stage(len(features), seconds)
+    return stages
+
+
+def compare_to_baseline(
+    stages: dict[str, dict[str, Any]],
+    baseline: dict[str, Any],
+    threshold: float,
+) -> dict[str, dict[str, Any]]:
+    """Ratio of each shared stage's seconds_per_1k_rows to the baseline; ratios above 1 + threshold regress.
+
+    Stages shorter than ``GATE_MIN_SECONDS`` in both runs are compared but never regress.
+    """
+    comparison: dict[str, dict[str, Any]] = {}
+    for name, stage in stages.items():
+        previous = baseline.get("stages", {}).get(name)
+        if not previous or not previous.get("seconds_per_1k_rows"):
+            continue
+        ratio = stage["seconds_per_1k_rows"] / previous["seconds_per_1k_rows"]
+        gated = max(stage["seconds"], float(previous.get("seconds", 0.0))) >= GATE_MIN_SECONDS
+        comparison[name] = {
+            "baseline_seconds_per_1k_rows": previous["seconds_per_1k_rows"],
+            "seconds_per_1k_rows": stage["seconds_per_1k_rows"],
+            "ratio": round(ratio, 4),
+            "gated": gated,
+            "regressed": gated and ratio > 1.0 + threshold,
+        }
+    return comparison
+
+
+def _environment() -> dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "torch": torch.__version__,
+        "torch_threads": torch.get_num_threads(),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time the dispatch pipeline stages and compare against a baseline run.")
+    parser.add_argument("--out", required=True, help="Path to write the benchmark results JSON.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="small", help="Row counts and epochs to run. Default: small.")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Deterministic seed. Default: 42.")
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=None,
+        help=(
+            "Runs per stage; the median is reported. Default: the profile's (1 for small, 3 for full), raised to "
+            f"{GATE_MIN_REPEAT} when --baseline is given. Below {GATE_MIN_REPEAT} the comparison is report-only."
+        ),
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for pandapower generation. Default: min(cpu count, 8).")
+    parser.add_argument("--label", default=None, help="Free-form label recorded with the results, e.g. a git commit.")
+    parser.add_argument("--baseline", default=None, help="Earlier results JSON to compare against.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed slowdown per stage before it counts as a regression. Default: 0.2 (20%%).",
+    )
+    args = parser.parse_args()
+
+    profile = PROFILES[args.profile]
+    repeat = args.repeat
+    if repeat is None:
+        repeat = max(profile.repeat, GATE_MIN_REPEAT) if args.baseline else profile.repeat
+    with tempfile.TemporaryDirectory(prefix="dispatch-benchmark-") as scratch:
+        stages = run_benchmarks(profile, seed=args.seed, repeat=repeat, workers=args.workers, scratch=Path(scratch))
+
+    results: dict[str, Any] = {
+        "format": BENCHMARK_FORMAT,
+        "label": args.label,
+        "profile": args.profile,
+        "profile_config": asdict(profile),
+        "seed": args.seed,
+        "repeat": repeat,
+        "environment": _environment(),
+        "stages": stages,
+    }
+    regressions: list[str] = []
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        comparison = compare_to_baseline(stages, baseline, args.threshold)
+        regressions = [name for name, entry in comparison.items() if entry["regressed"]]
+        gated = repeat >= GATE_MIN_REPEAT
+        results["baseline"] = {"label": baseline.get("label"), "threshold": args.threshold, "gated": gated, "stages": comparison}
+    write_json(Path(args.out), results)
+
+    for name, stage in stages.items():
+        line = f"[benchmark] {name}: {stage['seconds_per_1k_rows']:.4f} s/1k rows"
+        if name in results.get("baseline", {}).get("stages", {}):
+            line += f" (x{results['baseline']['stages'][name]['ratio']:.2f} vs baseline)"
+        print(line, file=sys.stderr)
+    if regressions:
+        print(f"[benchmark] regressions beyond {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        if results["baseline"]["gated"]:
+            return 1
+        print(f"[benchmark] report-only: --repeat {repeat} is below {GATE_MIN_REPEAT}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -12,7 +12,23 @@ if __package__ is None or __package__ == "":
 import numpy as np
 
 from training.common.weight_export import DEFAULT_SEED, write_json
-from training.dispatch_pinn.simulator import FEATURE_COLUMNS, SIMULATOR_VERSION
+from training.dispatch_pinn.simulator import FEATURE_COLUMNS, SIMULATOR_VERSION, load_dispatch_columns
+
+# Inputs where the batched path once diverged from ``forward_mlp``: (weights, features, expected MW).
+FORWARD_REGRESSION_CASES = (
+    # Narrowing the final layer to float32 before de-scaling turned 1070.4 into 1070.5.
+    (
+        {
+            "feature_means": [0.0],
+            "feature_stds": [1.0],
+            "target_mean": 749.798223,
+            "target_std": 118.759917,
+            "layers": [{"weights": [[1.0]], "bias": [0.0], "activation": "linear"}],
+        },
+        [2.7],
+        1070.4,
+    ),
+)
 
 
 def _activate(value: float, activation: str) -> float:
@@ -23,7 +39,7 @@ def _activate(value: float, activation: str) -> float:
     return value
 
 
-def _forward(weights: dict[str, object], features: list[float]) -> float:
+def forward_mlp(weights: dict[str, object], features: list[float]) -> float:
     vector = []
     means = [float(entry) for entry in weights["feature_means"]]
     stds = [float(entry) for entry in weights["feature_stds"]]
@@ -51,6 +67,93 @@ def _forward(weights: dict[str, object], features: list[float]) -> float:
     return round(scaled * target_std + target_mean, 1)
 
 
+def _round_1(values: np.ndarray) -> np.ndarray:
+    """Elementwise ``round(value, 1)`` with Python's exact decimal semantics.
+
+    ``np.round`` scales by 10 in binary and can land on the other side of a tie
+    (``round(0.15, 1) == 0.1`` but ``np.round(0.15, 1) == 0.2``), so elements
+    within reach of a tie are re-rounded with the builtin.
+    """
+    scaled = values * 10.0
+    rounded = np.round(scaled) / 10.0
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) <= 1e-6 * np.maximum(1.0, np.abs(scaled))
+    for position in np.flatnonzero(near_tie):
+        rounded.flat[position] = round(float(values.flat[position]), 1)
+    return rounded
+
+
+def _activate_batch(values: np.ndarray, activation: str) -> np.ndarray:
+    if activation == "relu":
+        # Matches max(0.0, value): NaN and -0.0 both map to 0.0.
+        return np.where(values > 0.0, values, 0.0)
+    if activation == "sigmoid":
+        return 1.0 / (1.0 + np.exp(-values))
+    return values
+
+
+def forward_mlp_batch(weights: dict[str, object], feature_matrix: np.ndarray) -> np.ndarray:
+    """Vectorized ``forward_mlp`` over an [N, features] matrix, bit-identical to the scalar path.
+
+    Each layer accumulates in float32 one input column at a time, in the same
+    order as the scalar loop, so no summation is reassociated. Rounded layer
+    outputs stay float64 and are narrowed to float32 only where the next layer
+    reads them, so the final de-scaling sees the same value as the scalar path.
+    """
+    features = np.asarray(feature_matrix, dtype=np.float64)
+    if features.ndim != 2:
+        raise ValueError("feature_matrix must be two-dimensional.")
+    feature_count = features.shape[1]
+    means = np.zeros(feature_count)
+    stds = np.ones(feature_count)
+    raw_means = [float(entry) for entry in weights["feature_means"]][:feature_count]
+    raw_stds = [abs(float(entry)) or 1.0 for entry in weights["feature_stds"]][:feature_count]
+    means[: len(raw_means)] = raw_means
+    stds[: len(raw_stds)] = raw_stds
+    vector = ((features - means) / stds).astype(np.float32)
+
+    for layer in weights["layers"]:
+        layer_weights = layer["weights"]
+        bias = layer["bias"]
+        width = max((len(row) for row in layer_weights), default=0)
+        matrix = np.zeros((len(layer_weights), width), dtype=np.float32)
+        present = np.zeros((len(layer_weights), width), dtype=bool)
+        for row_index, row in enumerate(layer_weights):
+            matrix[row_index, : len(row)] = np.asarray(row, dtype=np.float64).astype(np.float32)
+            present[row_index, : len(row)] = True
+        inputs = np.zeros((len(vector), width), dtype=np.float32)
+        inputs[:, : min(width, vector.shape[1])] = vector[:, :width].astype(np.float32)
+        totals = np.tile(
+            np.asarray([bias[row_index] if row_index < len(bias) else 0.0 for row_index in range(len(layer_weights))], dtype=np.float64).astype(np.float32),
+            (len(vector), 1),
+        )
+        for column_index in range(width):
+            step = totals + matrix[:, column_index] * inputs[:, column_index : column_index + 1]
+            totals = np.where(present[:, column_index], step, totals)
+        vector = _round_1(_activate_batch(totals.astype(np.float64), str(layer["activation"])))
+
+    scaled = vector[:, 0] if vector.shape[1] else np.zeros(len(vector))
+    target_mean = float(weights.get("target_mean", 0.0))
+    target_std = abs(float(weights.get("target_std", 1.0))) or 1.0
+    return _round_1(scaled * target_std + target_mean)
+
+
+def check_forward_parity(weights: dict[str, object], feature_matrix: np.ndarray, batched: np.ndarray) -> list[int]:
+    """Return row positions where the batched predictions differ bitwise from ``forward_mlp``."""
+    reference = np.asarray([forward_mlp(weights, features) for features in np.asarray(feature_matrix).tolist()], dtype=np.float64)
+    actual = np.asarray(batched, dtype=np.float64)
+    return np.flatnonzero(reference.view(np.uint64) != actual.view(np.uint64)).tolist()
+
+
+def check_forward_regressions() -> list[int]:
+    """Return the ``FORWARD_REGRESSION_CASES`` positions where either forward path misses its expected value."""
+    failures = []
+    for position, (weights, features, expected) in enumerate(FORWARD_REGRESSION_CASES):
+        batched = forward_mlp_batch(weights, np.asarray([features], dtype=np.float64))
+        if forward_mlp(weights, features) != expected or check_forward_parity(weights, np.asarray([features]), batched):
+            failures.append(position)
+    return failures
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Evaluate pandapower-calibrated dispatch weights.")
     parser.add_argument("--weights", required=True, help="Path to dispatch-pinn-v2.json.")
@@ -59,26 +162,44 @@ def main() -> int:
     parser.add_argument("--out-fixture", default=None, help="Optional path to write a Python↔TS conformance fixture JSON.")
     parser.add_argument("--fixture-limit", type=int, default=20, help="Maximum rows to include in the conformance fixture.")
     parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Deterministic seed. Default: 42.")
+    parser.add_argument(
+        "--parity-sample",
+        type=int,
+        default=-1,
+        help=(
+            "Rows re-scored with the scalar reference to assert bit-identical batched predictions; fixture rows are "
+            "always checked. -1 checks all, 0 checks only the fixture rows. Default: -1."
+        ),
+    )
     args = parser.parse_args()
 
     weights = json.loads(Path(args.weights).read_text(encoding="utf-8"))
-    rows = [json.loads(line) for line in Path(args.input).read_text(encoding="utf-8").splitlines() if line.strip()]
+    columns = load_dispatch_columns(Path(args.input))
+    row_count = len(columns["index"])
 
     if "manifest" not in weights or "layers" not in weights:
         raise SystemExit("Weights did not match the expected dispatch MLP schema.")
 
-    predictions = np.array(
-        [
-            _forward(weights, [float(row[column]) for column in FEATURE_COLUMNS])
-            for row in rows
-        ],
-        dtype=np.float32,
-    )
-    targets = np.array([float(row["target_dispatch_mw"]) for row in rows], dtype=np.float32)
-    upper_bounds = np.array([float(row["physics_upper_bound_mw"]) for row in rows], dtype=np.float32)
-    lower_bounds = np.array([float(row["physics_lower_bound_mw"]) for row in rows], dtype=np.float32)
-    previous = np.array([float(row["previous_dispatch_mw"]) for row in rows], dtype=np.float32)
-    ramp_limits = np.array([float(row["ramp_limit_mw_per_hour"]) for row in rows], dtype=np.float32)
+    regressions = check_forward_regressions()
+    if regressions:
+        raise SystemExit(f"Forward passes failed regression cases {regressions}.")
+    feature_matrix = np.column_stack([np.asarray(columns[column], dtype=np.float64) for column in FEATURE_COLUMNS])
+    batched = forward_mlp_batch(weights, feature_matrix)
+    fixture_limit = max(1, min(row_count, int(args.fixture_limit)))
+    sample = row_count if args.parity_sample < 0 else min(row_count, args.parity_sample)
+    if args.out_fixture:
+        # Fixture rows are the leading rows, so widening the sample covers them.
+        sample = max(sample, min(fixture_limit, row_count))
+    if sample > 0:
+        mismatches = check_forward_parity(weights, feature_matrix[:sample], batched[:sample])
+        if mismatches:
+            raise SystemExit(f"Batched forward diverged from the scalar reference on {len(mismatches)} rows (first: {mismatches[0]}).")
+    predictions = batched.astype(np.float32)
+    targets = np.asarray(columns["target_dispatch_mw"], dtype=np.float32)
+    upper_bounds = np.asarray(columns["physics_upper_bound_mw"], dtype=np.float32)
+    lower_bounds = np.asarray(columns["physics_lower_bound_mw"], dtype=np.float32)
+    previous = np.asarray(columns["previous_dispatch_mw"], dtype=np.float32)
+    ramp_limits = np.asarray(columns["ramp_limit_mw_per_hour"], dtype=np.float32)
     violations = (
         (predictions > upper_bounds)
         | (predictions < lower_bounds)
@@ -88,7 +209,7 @@ def main() -> int:
     report = {
         "model_key": weights["manifest"]["model_key"],
         "seed": args.seed,
-        "scenario_count": len(rows),
+        "scenario_count": row_count,
         "passed": True,
         "note": f"Pandapower DC-OPF calibrated evaluation on IEEE-30 scenarios ({SIMULATOR_VERSION}).",
         "manifest_seed": weights["manifest"]["seed"],
@@ -102,17 +223,16 @@ def main() -> int:
     write_json(Path(args.out_report), report)
 
     if args.out_fixture:
-        fixture_limit = max(1, min(len(rows), int(args.fixture_limit)))
         fixture_rows = []
-        for row, prediction in zip(rows[:fixture_limit], predictions[:fixture_limit], strict=False):
+        for position in range(min(fixture_limit, row_count)):
             fixture_rows.append(
                 {
-                    "index": int(row["index"]),
-                    "features": [round(float(row[column]), 6) for column in FEATURE_COLUMNS],
-                    "expected_dispatch_mw": round(float(prediction), 6),
-                    "target_dispatch_mw": round(float(row["target_dispatch_mw"]), 6),
-                    "previous_dispatch_mw": round(float(row["previous_dispatch_mw"]), 6),
-                    "simulator_status": str(row["simulator_status"]),
+                    "index": int(columns["index"][position]),
+                    "features": [round(float(value), 6) for value in feature_matrix[position].tolist()],
+                    "expected_dispatch_mw": round(float(predictions[position]), 6),
+                    "target_dispatch_mw": round(float(columns["target_dispatch_mw"][position]), 6),
+                    "previous_dispatch_mw": round(float(columns["previous_dispatch_mw"][position]), 6),
+                    "simulator_status": str(columns["simulator_status"][position]),
                 },
             )
 
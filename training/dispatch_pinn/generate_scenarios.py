@@ -1,24 +1,271 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import sys
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Iterable, Iterator
 
 if __package__ is None or __package__ == "":
-    import sys
-
     sys.path.append(str(Path(__file__).resolve().parents[2]))
 
+from training.common.columnar import discard_columns, write_columns
 from training.common.dataset_manifest import build_dataset_manifest
-from training.common.weight_export import DEFAULT_SEED, PLACEHOLDER_TRAINED_AT, write_json
+from training.common.jsonl_io import JsonlWriteResult, compression_for, iter_jsonl, open_jsonl, write_jsonl_lines
+from training.common.scenario_cache import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_CACHE_MAX_BYTES,
+    lookup_cached_dataset,
+    restore_cached_dataset,
+    scenario_cache_key,
+    store_cached_dataset,
+)
+from training.common.weight_export import DEFAULT_SEED, PLACEHOLDER_TRAINED_AT, stable_json_dumps, write_json
+from training.dispatch_pinn import simulator
 from training.dispatch_pinn.simulator import (
+    SAMPLING_STRATEGIES,
     SIMULATOR_NAME,
     SIMULATOR_TOPOLOGY,
     SIMULATOR_VERSION,
-    build_dispatch_rows,
-    write_jsonl,
+    SOLVER_BACKENDS,
+    DispatchProgress,
+    compare_solver_backends,
+    default_worker_count,
+    dispatch_columns_from_rows,
+    iter_dispatch_rows,
+    summarize_instrumentation,
 )
 
 
+def shard_indices(count: int, shard_index: int, shard_count: int) -> range:
+    """Contiguous index block owned by one shard; blocks concatenate back to range(count)."""
+    return range(count * shard_index // shard_count, count * (shard_index + 1) // shard_count)
+
+
+def shard_path(out: Path, shard_index: int, shard_count: int) -> Path:
+    # Shards are always plain JSONL; only the merged output is compressed.
+    plain = out.with_suffix("") if compression_for(out) else out
+    return plain.with_name(f"{plain.stem}.shard-{shard_index}-of-{shard_count}{plain.suffix}")
+
+
+def _iter_shard_lines(path: Path, seed: int) -> Iterator[tuple[int, str, int]]:
+    """Yield (index, line, byte length) for each complete row of a shard file, stopping at a torn line."""
+    with path.open("rb") as handle:
+        for raw in handle:
+            if not raw.endswith(b"\n"):
+                return
+            line = raw.decode("utf-8").rstrip("\n")
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                return
+            if int(row["seed"]) != seed:
+                raise SystemExit(f"{path} was generated with seed {row['seed']}, not {seed}.")
+            yield int(row["index"]), line, len(raw)
+
+
+def read_completed_indices(path: Path, seed: int) -> set[int]:
+    """Return the indices already written to a shard file.
+
+    A torn final line from a preempted run is dropped and the file is truncated
+    back to its last complete row so appends resume cleanly.
+    """
+    if not path.exists():
+        return set()
+    completed: set[int] = set()
+    valid_bytes = 0
+    for index, _, size in _iter_shard_lines(path, seed):
+        completed.add(index)
+        valid_bytes += size
+    if valid_bytes < path.stat().st_size:
+        with path.open("r+b") as handle:
+            handle.truncate(valid_bytes)
+    return completed
+
+
+def generate_shard(
+    path: Path,
+    *,
+    count: int,
+    seed: int,
+    shard_index: int,
+    shard_count: int,
+    solver: str,
+    sampling: str,
+    resume: bool,
+    workers: int | None = None,
+    progress_every: int = 0,
+    warm_start: bool = False,
+    instrument: bool = False,
+    store_opf: bool = False,
+) -> None:
+    """Stream one shard's rows to ``path``, flushing each row as soon as it is solved.
+
+    A sidecar records the generation settings so --resume refuses to mix rows
+    from a run with a different count (LHS strata depend on it) or backend.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    settings = {"count": count, "seed": seed, "shard_count": shard_count, "solver": solver, "sampling": sampling}
+    if warm_start:
+        settings["warm_start"] = True
+    if instrument:
+        settings["instrument"] = True
+    if store_opf:
+        settings["store_opf"] = True
+    settings_path = path.with_name(f"{path.name}.settings.json")
+    if resume and path.exists():
+        recorded = json.loads(settings_path.read_text(encoding="utf-8")) if settings_path.exists() else None
+        if recorded != settings:
+            raise SystemExit(f"Cannot resume {path}: it was generated with {recorded}, not {settings}.")
+    write_json(settings_path, settings)
+    completed = read_completed_indices(path, seed) if resume else set()
+    pending = [index for index in shard_indices(count, shard_index, shard_count) if index not in completed]
+    with path.open("a" if resume else "w", encoding="utf-8") as handle:
+        rows = iter_dispatch_rows(
+            count,
+            seed,
+            solver=solver,
+            sampling=sampling,
+            indices=pending,
+            workers=workers,
+            progress=_report_progress,
+            progress_every=progress_every,
+            warm_start=warm_start,
+            instrument=instrument,
+            store_opf=store_opf,
+        )
+        for row in rows:
+            handle.write(stable_json_dumps(row) + "\n")
+            handle.flush()
+
+
+def _solver_backend_label(solver: str, warm_start: bool) -> str | None:
+    if solver != "native":
+        return None
+    return "native-highs-warm-start" if warm_start else "native-highs"
+
+
+def _report_progress(progress: DispatchProgress) -> None:
+    print(f"[dispatch] {progress.summary()}", file=sys.stderr, flush=True)
+
+
+def _merged_lines(out: Path, *, count: int, seed: int, shard_count: int) -> Iterator[str]:
+    # Shards own contiguous blocks and are always written in index order, so a
+    # sequential pass over them reproduces range(count) without buffering rows.
+    expected = 0
+    for shard_index in range(shard_count):
+        path = shard_path(out, shard_index, shard_count)
+        if not path.exists():
+            continue
+        for index, line, _ in _iter_shard_lines(path, seed):
+            if index != expected:
+                raise SystemExit(f"Cannot merge: expected scenario {expected} but found {index} in {path}.")
+            yield line
+            expected += 1
+    if expected != count:
+        raise SystemExit(f"Cannot merge: {count - expected} of {count} scenarios are missing (first index {expected}).")
+
+
+def merge_shards(out: Path, *, count: int, seed: int, shard_count: int) -> JsonlWriteResult:
+    """Combine shard files into the final JSONL, identical to a single-process run."""
+    return write_jsonl_lines(out, _merged_lines(out, count=count, seed=seed, shard_count=shard_count))
+
+
+def remove_shards(out: Path, shard_count: int) -> None:
+    """Delete merged shard files and their settings sidecars so a later run cannot pick them up."""
+    for shard_index in range(shard_count):
+        path = shard_path(out, shard_index, shard_count)
+        path.unlink(missing_ok=True)
+        path.with_name(f"{path.name}.settings.json").unlink(missing_ok=True)
+
+
+@dataclass(frozen=True)
+class ExtensionBase:
+    path: Path
+    row_count: int
+    sha256: str
+    sampling: str
+    lineage: list[dict[str, Any]]
+
+
+def read_extension_base(
+    path: Path,
+    *,
+    seed: int,
+    manifest_path: Path | None,
+    solver_backend: str | None = None,
+    store_opf: bool = False,
+) -> ExtensionBase:
+    """Validate an existing dataset for --extend-from and collect its lineage.
+
+    Rows must be indices 0..N-1 generated with ``seed``, carrying stored OPF
+    outputs exactly when ``store_opf`` is set; the sampling strategy and any
+    earlier lineage come from the dataset's manifest when it exists, whose
+    simulator config must match the current simulator and ``solver_backend``.
+    """
+    digest = hashlib.sha256()
+    expected = 0
+    with open_jsonl(path) as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if int(row["seed"]) != seed:
+                raise SystemExit(f"{path} was generated with seed {row['seed']}, not {seed}.")
+            if int(row["index"]) != expected:
+                raise SystemExit(f"Cannot extend {path}: expected scenario {expected} but found {row['index']}.")
+            if ("opf" in row) != store_opf:
+                raise SystemExit(f"Cannot extend {path}: scenario {expected} {'lacks' if store_opf else 'has'} stored OPF outputs; match --store-opf.")
+            digest.update((line.rstrip("\n") + "\n").encode("utf-8"))
+            expected += 1
+    manifest = {}
+    if manifest_path is not None and manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if int(manifest.get("scenario_count", expected)) != expected:
+            raise SystemExit(f"{manifest_path} records {manifest['scenario_count']} scenarios but {path} has {expected}.")
+        recorded = manifest.get("simulator_config", {})
+        current = {"name": SIMULATOR_NAME, "version": SIMULATOR_VERSION, "topology": SIMULATOR_TOPOLOGY, "solver_backend": solver_backend}
+        mismatched = {key: recorded.get(key) for key, value in current.items() if recorded.get(key) != value}
+        if mismatched:
+            raise SystemExit(
+                f"Cannot extend {path}: {manifest_path} records simulator config {mismatched}, "
+                f"but this run uses {({key: current[key] for key in mismatched})}.",
+            )
+    return ExtensionBase(
+        path=path,
+        row_count=expected,
+        sha256=digest.hexdigest(),
+        sampling=str(manifest.get("sampling_strategy", "latin_hypercube")),
+        lineage=list(manifest.get("lineage", [])),
+    )
+
+
+def _extended_lines(base: ExtensionBase, rows: Iterable[dict[str, Any]]) -> Iterator[str]:
+    # Existing rows are copied verbatim so their bytes, and hence the base SHA-256, never change.
+    with open_jsonl(base.path) as handle:
+        for line in handle:
+            if line.strip():
+                yield line.rstrip("\n")
+    for row in rows:
+        yield stable_json_dumps(row)
+
+
+def _extended_sampling(base: ExtensionBase) -> str:
+    parts = base.sampling.split("+")
+    return base.sampling if parts[-1] == "kronecker" else f"{base.sampling}+kronecker"
+
+
+def _check_native_parity(args: argparse.Namespace) -> None:
+    parity = compare_solver_backends(min(args.count, args.parity_sample), args.seed, warm_start=args.warm_start)
+    if not parity["passed"]:
+        raise SystemExit(
+            f"Native solver parity check failed on {len(parity['mismatches'])} fields "
+            f"(first: {parity['mismatches'][0]}).",
+        )
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Generate pandapower DC-OPF calibrated dispatch scenarios.")
     parser.add_argument("--out", required=True, help="Path to the scenario JSONL output.")
@@ -26,10 +273,220 @@ def main() -> int:
     parser.add_argument("--count", type=int, default=5000, help="Scenario count to generate.")
     parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Deterministic seed. Default: 42.")
     parser.add_argument("--git-commit", default=None, help="Optional git commit sha to record.")
+    parser.add_argument(
+        "--solver",
+        choices=SOLVER_BACKENDS,
+        default="pandapower",
+        help="DC-OPF backend. 'native' solves batched PTDF LPs with scipy HiGHS. Default: pandapower.",
+    )
+    parser.add_argument(
+        "--sampling",
+        choices=SAMPLING_STRATEGIES,
+        default=None,
+        help=(
+            "Feature design. 'kronecker' is count-independent, so row i is stable across counts; --extend-from "
+            "always samples new rows with it. Default: latin_hypercube."
+        ),
+    )
+    parser.add_argument(
+        "--warm-start",
+        action="store_true",
+        help="Native backend only: solve each batch in feature-proximity order, seeding every LP from its neighbour.",
+    )
+    parser.add_argument(
+        "--instrument",
+        action="store_true",
+        help=(
+            "Record prep/solve time, fallback reason and worker PID in each row and write a percentile "
+            "summary to <manifest>.instrumentation.json. Instrumented runs bypass the scenario cache."
+        ),
+    )
+    parser.add_argument(
+        "--store-opf",
+        action="store_true",
+        help="Keep unrounded OPF outputs in each row so rederive.py can recompute physics columns without re-solving.",
+    )
+    parser.add_argument(
+        "--parity-sample",
+        type=int,
+        default=256,
+        help="Scenarios to cross-check against pandapower before a native run. 0 disables the gate.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=f"Worker processes for the pandapower backend. Default: min(cpu count, 8) = {default_worker_count()}.",
+    )
+    parser.add_argument(
+        "--progress-every",
+        type=int,
+        default=1000,
+        help="Report throughput and fallback rate to stderr every N scenarios; 0 reports only at the end. Default: 1000.",
+    )
+    parser.add_argument("--shard-index", type=int, default=0, help="Zero-based shard to generate. Default: 0.")
+    parser.add_argument("--shard-count", type=int, default=1, help="Total shards the index range is split into. Default: 1.")
+    parser.add_argument("--resume", action="store_true", help="Keep rows already written to the shard file and generate only the rest.")
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help=(
+            "Merge the --shard-count shard files next to --out into the final JSONL and manifest. "
+            "The shard files are deleted once both are written."
+        ),
+    )
+    parser.add_argument(
+        "--extend-from",
+        default=None,
+        help=(
+            "Existing scenario JSONL to grow to --count. Its rows are kept byte-for-byte and only the new "
+            "indices are solved, sampled with the count-independent kronecker sequence. May equal --out."
+        ),
+    )
+    parser.add_argument(
+        "--extend-manifest",
+        default=None,
+        help="Manifest of --extend-from, for its sampling strategy and lineage. Default: --manifest if it exists.",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always regenerate; neither read nor populate the scenario cache.")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="Scenario cache directory. Default: ~/.cache/ceip-scenarios.")
+    parser.add_argument("--cache-max-gb", type=float, default=DEFAULT_CACHE_MAX_BYTES / 1024**3, help="LRU size budget for the cache. Default: 10.")
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Also write memory-mappable .npy columns next to --out for fast loading in train/eval.",
+    )
     args = parser.parse_args()
 
-    rows = build_dispatch_rows(args.count, args.seed)
-    write_jsonl(Path(args.out), rows)
+    if args.workers is not None and args.workers < 1:
+        raise SystemExit("--workers must be at least 1.")
+    if args.warm_start and args.solver != "native":
+        raise SystemExit("--warm-start requires --solver native.")
+    if args.shard_count < 1 or not 0 <= args.shard_index < args.shard_count:
+        raise SystemExit("--shard-index must be in [0, --shard-count).")
+    if args.extend_from and (args.shard_count > 1 or args.merge or args.resume):
+        raise SystemExit("--extend-from cannot be combined with sharding, --merge or --resume.")
+    if args.extend_from and args.sampling not in (None, "kronecker"):
+        raise SystemExit(f"--extend-from samples new rows with kronecker; --sampling {args.sampling} cannot be honoured.")
+    args.sampling = args.sampling or "latin_hypercube"
+
+    out = Path(args.out)
+    cache_dir = Path(args.cache_dir).expanduser()
+    cache_params = {
+        "model_key": "dispatch-pinn-v2",
+        "simulator_version": SIMULATOR_VERSION,
+        "topology": SIMULATOR_TOPOLOGY,
+        "count": args.count,
+        "seed": args.seed,
+        "solver": args.solver,
+        "sampling": args.sampling,
+    }
+    if args.warm_start:
+        cache_params["warm_start"] = True
+    if args.store_opf:
+        cache_params["store_opf"] = True
+    cache_key = None if args.no_cache or args.instrument else scenario_cache_key(cache_params, [simulator.__file__])
+    cached = None
+    if cache_key is not None and args.shard_count == 1 and not args.merge:
+        cached = lookup_cached_dataset(cache_key, cache_dir)
+
+    extension = None
+    if args.extend_from:
+        extension = read_extension_base(
+            Path(args.extend_from),
+            seed=args.seed,
+            manifest_path=Path(args.extend_manifest or args.manifest),
+            solver_backend=_solver_backend_label(args.solver, args.warm_start),
+            store_opf=args.store_opf,
+        )
+        if extension.row_count >= args.count:
+            raise SystemExit(f"{args.extend_from} already has {extension.row_count} scenarios; --count must be larger.")
+        cached = None
+        cache_key = None
+
+    merged_shard_count = 0
+    if cached is not None:
+        written = restore_cached_dataset(cached, out)
+    elif extension is not None:
+        if args.solver == "native" and args.parity_sample > 0:
+            _check_native_parity(args)
+        written = write_jsonl_lines(
+            out,
+            _extended_lines(
+                extension,
+                iter_dispatch_rows(
+                    args.count,
+                    args.seed,
+                    solver=args.solver,
+                    sampling="kronecker",
+                    indices=range(extension.row_count, args.count),
+                    workers=args.workers,
+                    progress=_report_progress,
+                    progress_every=args.progress_every,
+                    warm_start=args.warm_start,
+                    instrument=args.instrument,
+                    store_opf=args.store_opf,
+                ),
+            ),
+        )
+    else:
+        if not args.merge:
+            if args.solver == "native" and args.parity_sample > 0:
+                _check_native_parity(args)
+            generate_shard(
+                shard_path(out, args.shard_index, args.shard_count),
+                count=args.count,
+                seed=args.seed,
+                shard_index=args.shard_index,
+                shard_count=args.shard_count,
+                solver=args.solver,
+                sampling=args.sampling,
+                resume=args.resume,
+                workers=args.workers,
+                progress_every=args.progress_every,
+                warm_start=args.warm_start,
+                instrument=args.instrument,
+                store_opf=args.store_opf,
+            )
+            if args.shard_count > 1:
+                # Other shards may still be running; the final file is produced by --merge.
+                return 0
+
+        written = merge_shards(out, count=args.count, seed=args.seed, shard_count=args.shard_count)
+        merged_shard_count = args.shard_count
+        if cache_key is not None:
+            store_cached_dataset(
+                cache_key,
+                written,
+                params=cache_params,
+                cache_dir=cache_dir,
+                max_bytes=int(args.cache_max_gb * 1024**3),
+            )
+
+    if args.instrument:
+        manifest_path = Path(args.manifest)
+        write_json(
+            manifest_path.with_name(f"{manifest_path.stem}.instrumentation.json"),
+            summarize_instrumentation(iter_jsonl(out)),
+        )
+    if args.columnar:
+        # Re-read the merged file so columns are built with bounded memory, whatever the shard layout.
+        columns = dispatch_columns_from_rows(iter_jsonl(out), count=args.count)
+        write_columns(out, columns, source_sha256=written.sha256, metadata={"model_key": "dispatch-pinn-v2"})
+    else:
+        discard_columns(out)
+    lineage = None
+    sampling_strategy = args.sampling
+    if extension is not None:
+        sampling_strategy = _extended_sampling(extension)
+        lineage = [
+            *extension.lineage,
+            {
+                "scenario_count": extension.row_count,
+                "sampling_strategy": extension.sampling,
+                "dataset_sha256": extension.sha256,
+            },
+        ]
     write_json(
         Path(args.manifest),
         build_dataset_manifest(
@@ -41,10 +498,15 @@ def main() -> int:
             seed=args.seed,
             prepared_at=PLACEHOLDER_TRAINED_AT,
             source_description="pandapower DC-OPF calibrated dispatch scenarios on IEEE-30",
-            sampling_strategy="latin_hypercube",
+            sampling_strategy=sampling_strategy,
             git_commit_sha=args.git_commit,
+            solver_backend=_solver_backend_label(args.solver, args.warm_start),
+            dataset_sha256=written.sha256,
+            lineage=lineage,
         ),
     )
+    # Only drop the shards once the merged JSONL and its manifest are both in place.
+    remove_shards(out, merged_shard_count)
     return 0
 
 
@@ -0,0 +1,187 @@
+"""Compiled dispatch model export and batch scoring for offline backfills.
+
+The JSON artifact written by ``train.export_weights`` stays the source of
+truth for the TypeScript runtime. This module compiles that artifact into a
+TorchScript or ONNX graph (normalization, per-layer ``round(..., 1)`` and
+target de-scaling included) and scores whole feature matrices in one call.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Mapping
+
+if __package__ is None or __package__ == "":
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import numpy as np
+import torch
+from torch import nn
+
+from training.dispatch_pinn.simulator import FEATURE_COLUMNS, load_dispatch_columns
+
+COMPILED_FORMATS = {".onnx": "onnx", ".pt": "torchscript", ".ts": "torchscript", ".json": "json"}
+
+
+class _Round1(nn.Module):
+    def forward(self, values: torch.Tensor) -> torch.Tensor:
+        return torch.round(values * 10.0) / 10.0
+
+
+class DispatchServingModule(nn.Module):
+    """Raw feature rows in, dispatch MW out, mirroring ``eval.forward_mlp``."""
+
+    def __init__(self, weights: Mapping[str, Any]) -> None:
+        super().__init__()
+        means = [float(entry) for entry in weights["feature_means"]]
+        stds = [abs(float(entry)) or 1.0 for entry in weights["feature_stds"]]
+        self.register_buffer("feature_means", torch.tensor(means, dtype=torch.float32))
+        self.register_buffer("feature_stds", torch.tensor(stds, dtype=torch.float32))
+        blocks = []
+        for layer in weights["layers"]:
+            matrix = torch.tensor(layer["weights"], dtype=torch.float32)
+            linear = nn.Linear(matrix.shape[1], matrix.shape[0])
+            with torch.no_grad():
+                linear.weight.copy_(matrix)
+                linear.bias.copy_(torch.tensor(layer["bias"], dtype=torch.float32))
+            activation = str(layer["activation"])
+            if activation == "relu":
+                activate: nn.Module = nn.ReLU()
+            elif activation == "sigmoid":
+                activate = nn.Sigmoid()
+            else:
+                activate = nn.Identity()
+            blocks.append(nn.Sequential(linear, activate, _Round1()))
+        self.blocks = nn.ModuleList(blocks)
+        self.target_mean = float(weights.get("target_mean", 0.0))
+        self.target_std = abs(float(weights.get("target_std", 1.0))) or 1.0
+
+    def forward(self, features: torch.Tensor) -> torch.Tensor:
+        vector = (features - self.feature_means) / self.feature_stds
+        for block in self.blocks:
+            vector = block(vector)
+        return torch.round((vector[:, 0] * self.target_std + self.target_mean) * 10.0) / 10.0
+
+
+def _compiled_format(path: Path) -> str:
+    try:
+        return COMPILED_FORMATS[path.suffix]
+    except KeyError as exc:
+        raise ValueError(f"Unsupported dispatch model format {path.suffix!r}; use one of {sorted(COMPILED_FORMATS)}.") from exc
+
+
+def export_compiled_model(weights: Mapping[str, Any], path: Path) -> Path:
+    """Write ``weights`` as TorchScript (.pt/.ts) or ONNX (.onnx)."""
+    module = DispatchServingModule(weights).eval()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fmt = _compiled_format(path)
+    if fmt == "onnx":
+        try:
+            import onnx  # type: ignore # noqa: F401
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("onnx is required for .onnx dispatch exports. pip install onnx first.") from exc
+        torch.onnx.export(
+            module,
+            (torch.zeros((1, len(module.feature_means)), dtype=torch.float32),),
+            str(path),
+            input_names=["features"],
+            output_names=["dispatch_mw"],
+            dynamic_axes={"features": {0: "rows"}, "dispatch_mw": {0: "rows"}},
+        )
+    elif fmt == "torchscript":
+        with warnings.catch_warnings():
+            # Newer torch releases flag TorchScript as deprecated; it still loads without Python model code.
+            warnings.simplefilter("ignore", FutureWarning)
+            torch.jit.script(module).save(str(path))
+    else:
+        raise ValueError("JSON is the training artifact itself; export to .pt, .ts or .onnx.")
+    return path
+
+
+class DispatchPredictor:
+    """Scores [N, features] arrays with a compiled or JSON dispatch model."""
+
+    def __init__(self, backend: str, runner: Any) -> None:
+        self.backend = backend
+        self._runner = runner
+        self.last_rows_per_second = 0.0
+
+    @classmethod
+    def load(cls, path: str | Path) -> DispatchPredictor:
+        source = Path(path)
+        fmt = _compiled_format(source)
+        if fmt == "onnx":
+            try:
+                import onnxruntime  # type: ignore
+            except ImportError as exc:  # pragma: no cover - optional dependency
+                raise RuntimeError("onnxruntime is required to score .onnx dispatch models. pip install onnxruntime first.") from exc
+            return cls("onnx", onnxruntime.InferenceSession(str(source), providers=["CPUExecutionProvider"]))
+        if fmt == "torchscript":
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", FutureWarning)
+                return cls("torchscript", torch.jit.load(str(source)).eval())
+        return cls("json", DispatchServingModule(json.loads(source.read_text(encoding="utf-8"))).eval())
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        matrix = np.ascontiguousarray(features, dtype=np.float32)
+        started = time.perf_counter()
+        if self.backend == "onnx":
+            (predictions,) = self._runner.run(["dispatch_mw"], {"features": matrix})
+        else:
+            with torch.inference_mode():
+                predictions = self._runner(torch.from_numpy(matrix)).numpy()
+        elapsed = time.perf_counter() - started
+        self.last_rows_per_second = len(matrix) / elapsed if elapsed > 0 else float("inf")
+        return np.asarray(predictions, dtype=np.float32)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Export or score compiled dispatch PINN models.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Compile a dispatch-pinn-v2.json artifact to TorchScript or ONNX.")
+    export.add_argument("--weights", required=True, help="Path to dispatch-pinn-v2.json.")
+    export.add_argument("--out", required=True, help="Output path ending in .pt/.ts (TorchScript) or .onnx.")
+    score = commands.add_parser("score", help="Score a scenario dataset and report rows/sec.")
+    score.add_argument("--model", required=True, help="Compiled model (.pt/.ts/.onnx) or JSON weights.")
+    score.add_argument("--input", required=True, help="Scenario JSONL generated by generate_scenarios.py.")
+    score.add_argument("--out-predictions", default=None, help="Optional .npy path for the predictions.")
+    score.add_argument(
+        "--reference-weights",
+        default=None,
+        help="JSON weights to compare against the scalar-exact eval forward pass.",
+    )
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_compiled_model(json.loads(Path(args.weights).read_text(encoding="utf-8")), Path(args.out))
+        return 0
+
+    columns = load_dispatch_columns(Path(args.input))
+    features = np.column_stack([np.asarray(columns[column], dtype=np.float64) for column in FEATURE_COLUMNS])
+    predictor = DispatchPredictor.load(args.model)
+    predictions = predictor.predict(features)
+    report: dict[str, Any] = {
+        "backend": predictor.backend,
+        "row_count": len(predictions),
+        "rows_per_second": round(predictor.last_rows_per_second, 1),
+    }
+    if args.reference_weights:
+        from training.dispatch_pinn.eval import forward_mlp_batch
+
+        reference = forward_mlp_batch(json.loads(Path(args.reference_weights).read_text(encoding="utf-8")), features)
+        difference = np.abs(predictions.astype(np.float64) - reference)
+        report["max_abs_diff_mw"] = round(float(difference.max(initial=0.0)), 6)
+        report["exact_match_rate"] = round(float(np.mean(difference < 1e-3)) if len(difference) else 1.0, 6)
+    if args.out_predictions:
+        np.save(Path(args.out_predictions), predictions, allow_pickle=False)
+    print(json.dumps(report, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
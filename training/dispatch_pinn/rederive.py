@@ -0,0 +1,56 @@
+"""Recompute dispatch physics columns from stored OPF outputs.
+
+Datasets generated with ``generate_scenarios.py --store-opf`` keep the
+unrounded solver outputs in each row, so changing a bound or sample-weight
+coefficient only needs this vectorized pass instead of a fresh OPF run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict, fields, replace
+from pathlib import Path
+
+if __package__ is None or __package__ == "":
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from training.common.jsonl_io import iter_jsonl, write_jsonl_rows
+from training.common.weight_export import write_json
+from training.dispatch_pinn.simulator import DEFAULT_PHYSICS, PhysicsCoefficients, rederive_dispatch_rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Re-derive dispatch physics columns without re-running the OPF.")
+    parser.add_argument("--input", required=True, help="Scenario JSONL generated with --store-opf.")
+    parser.add_argument("--out", required=True, help="Path to the re-derived scenario JSONL output.")
+    parser.add_argument("--source-manifest", default=None, help="Manifest of --input to carry over into the new manifest.")
+    parser.add_argument("--manifest", default=None, help="Optional path to write the re-derived dataset manifest JSON.")
+    for field in fields(PhysicsCoefficients):
+        default = getattr(DEFAULT_PHYSICS, field.name)
+        parser.add_argument(
+            f"--{field.name.replace('_', '-')}",
+            type=type(default),
+            default=default,
+            help=f"Physics coefficient {field.name}. Default: {default}.",
+        )
+    args = parser.parse_args()
+
+    coefficients = replace(DEFAULT_PHYSICS, **{field.name: getattr(args, field.name) for field in fields(PhysicsCoefficients)})
+    started = time.perf_counter()
+    written = write_jsonl_rows(Path(args.out), rederive_dispatch_rows(iter_jsonl(Path(args.input)), coefficients))
+    elapsed = time.perf_counter() - started
+    print(f"[rederive] {written.row_count} scenarios in {elapsed:.2f}s", file=sys.stderr)
+
+    if args.manifest:
+        manifest = json.loads(Path(args.source_manifest).read_text(encoding="utf-8")) if args.source_manifest else {}
+        manifest["dataset_sha256"] = written.sha256
+        manifest["physics_coefficients"] = asdict(coefficients)
+        write_json(Path(args.manifest), manifest)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,384 @@
+"""Sobol and Morris sensitivity analysis of dispatch outputs over FEATURE_RANGES.
+
+Designs are drawn in the unit cube and scaled to ``FEATURE_RANGES`` (or
+per-feature overrides), then evaluated either through the OPF scenario
+pipeline or through a trained dispatch MLP as a fast screening surrogate. OPF
+evaluations are memoized on disk, keyed by the exact feature vector, so reruns
+with more samples or overlapping designs only solve the new points.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+if __package__ is None or __package__ == "":
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import numpy as np
+
+from training.common.jsonl_io import iter_jsonl
+from training.common.scenario_cache import DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_BYTES, evict_cache, scenario_cache_key
+from training.common.weight_export import DEFAULT_SEED, stable_json_dumps, write_json
+from training.dispatch_pinn import simulator
+from training.dispatch_pinn.simulator import (
+    FEATURE_COLUMNS,
+    FEATURE_RANGES,
+    SIMULATOR_VERSION,
+    SOLVER_BACKENDS,
+    DispatchProgress,
+    iter_feature_dispatch_rows,
+)
+
+SENSITIVITY_METHODS = ("sobol", "morris")
+SENSITIVITY_OUTPUTS = ("target_dispatch_mw", "physics_upper_bound_mw", "physics_lower_bound_mw", "available_generation_mw")
+SENSITIVITY_CACHE_SUBDIR = "sensitivity"
+DEFAULT_BOOTSTRAP = 500
+DEFAULT_CONFIDENCE = 0.95
+MORRIS_LEVELS = 4
+
+
+@dataclass(frozen=True)
+class SensitivityDesign:
+    """Unit-cube design points plus the bookkeeping each estimator needs to read them back."""
+
+    method: str
+    unit: np.ndarray
+    samples: int
+    levels: int = 0
+
+
+def sobol_design(samples: int, seed: int, dimensions: int) -> SensitivityDesign:
+    """Saltelli design: rows A, B and A with column i taken from B, stacked as [A; B; AB_0; ...].
+
+    A and B come from one scrambled Sobol sequence of dimension 2k, so a rerun
+    with the same seed and more samples extends the same points.
+    """
+    from scipy.stats import qmc
+
+    if samples < 2:
+        raise ValueError("Sobol analysis needs at least 2 base samples.")
+    base = qmc.Sobol(d=2 * dimensions, scramble=True, seed=seed).random(samples)
+    a_matrix, b_matrix = base[:, :dimensions], base[:, dimensions:]
+    blocks = [a_matrix, b_matrix]
+    for column in range(dimensions):
+        mixed = a_matrix.copy()
+        mixed[:, column] = b_matrix[:, column]
+        blocks.append(mixed)
+    return SensitivityDesign(method="sobol", unit=np.vstack(blocks), samples=samples)
+
+
+def morris_design(trajectories: int, seed: int, dimensions: int, levels: int = MORRIS_LEVELS) -> SensitivityDesign:
+    """Morris one-at-a-time trajectories of k+1 points on a ``levels``-level grid.
+
+    Each trajectory draws from its own generator, so adding trajectories keeps
+    the earlier ones unchanged.
+    """
+    if trajectories < 2:
+        raise ValueError("Morris analysis needs at least 2 trajectories.")
+    if levels < 2 or levels % 2:
+        raise ValueError("Morris levels must be an even number of at least 2.")
+    delta = levels / (2.0 * (levels - 1))
+    starts = np.arange(levels // 2) / (levels - 1)
+    points = []
+    for trajectory in range(trajectories):
+        rng = np.random.default_rng([seed, trajectory])
+        current = rng.choice(starts, size=dimensions)
+        directions = rng.choice([-1.0, 1.0], size=dimensions)
+        # Start from the end of the grid each direction moves away from, so every step stays in [0, 1].
+        current = np.where(directions > 0, current, current + delta)
+        points.append(current.copy())
+        for column in rng.permutation(dimensions):
+            current[column] += directions[column] * delta
+            points.append(current.copy())
+    return SensitivityDesign(method="morris", unit=np.asarray(points), samples=trajectories, levels=levels)
+
+
+def scale_design(unit: np.ndarray, ranges: dict[str, tuple[float, float]]) -> np.ndarray:
+    lows = np.asarray([ranges[name][0] for name in FEATURE_COLUMNS], dtype=np.float64)
+    highs = np.asarray([ranges[name][1] for name in FEATURE_COLUMNS], dtype=np.float64)
+    return lows + unit * (highs - lows)
+
+
+def _percentile_interval(samples: np.ndarray, confidence: float) -> np.ndarray:
+    tail = (1.0 - confidence) / 2.0 * 100.0
+    return np.percentile(samples, [tail, 100.0 - tail], axis=0).T
+
+
+def sobol_indices(
+    outputs: np.ndarray,
+    samples: int,
+    dimensions: int,
+    *,
+    bootstrap: int,
+    confidence: float,
+    seed: int,
+) -> dict[str, dict[str, Any]]:
+    """First-order (Saltelli 2010) and total (Jansen) indices with bootstrap percentile intervals."""
+    f_a = outputs[:samples]
+    f_b = outputs[samples : 2 * samples]
+    f_ab = outputs[2 * samples :].reshape(dimensions, samples).T
+
+    def estimate(rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Centering on the pooled mean leaves the estimators unbiased and keeps large MW offsets out of the products.
+        center = np.mean(np.concatenate([f_a[rows], f_b[rows]]))
+        a, b, ab = f_a[rows] - center, f_b[rows] - center, f_ab[rows] - center
+        variance = np.var(np.concatenate([a, b]))
+        if variance == 0:
+            return np.zeros(dimensions), np.zeros(dimensions)
+        first = np.mean(b[:, None] * (ab - a[:, None]), axis=0) / variance
+        total = 0.5 * np.mean((a[:, None] - ab) ** 2, axis=0) / variance
+        return first, total
+
+    first, total = estimate(np.arange(samples))
+    rng = np.random.default_rng(seed)
+    resampled = [estimate(rng.integers(0, samples, samples)) for _ in range(bootstrap)]
+    report: dict[str, dict[str, Any]] = {}
+    first_ci = _percentile_interval(np.asarray([entry[0] for entry in resampled]), confidence) if bootstrap else None
+    total_ci = _percentile_interval(np.asarray([entry[1] for entry in resampled]), confidence) if bootstrap else None
+    for column, name in enumerate(FEATURE_COLUMNS):
+        report[name] = {"S1": round(float(first[column]), 6), "ST": round(float(total[column]), 6)}
+        if bootstrap:
+            report[name]["S1_ci"] = [round(float(value), 6) for value in first_ci[column]]
+            report[name]["ST_ci"] = [round(float(value), 6) for value in total_ci[column]]
+    return report
+
+
+def morris_indices(
+    design: SensitivityDesign,
+    outputs: np.ndarray,
+    ranges: dict[str, tuple[float, float]],
+    *,
+    bootstrap: int,
+    confidence: float,
+    seed: int,
+) -> dict[str, dict[str, Any]]:
+    """Elementary-effect statistics mu, mu* and sigma (in output units per feature range)."""
+    dimensions = len(FEATURE_COLUMNS)
+    steps = design.unit.reshape(design.samples, dimensions + 1, dimensions)
+    values = outputs.reshape(design.samples, dimensions + 1)
+    effects = np.zeros((design.samples, dimensions))
+    for trajectory in range(design.samples):
+        moves = np.diff(steps[trajectory], axis=0)
+        columns = np.argmax(np.abs(moves), axis=1)
+        effects[trajectory, columns] = np.diff(values[trajectory]) / moves[np.arange(dimensions), columns]
+
+    mu_star = np.mean(np.abs(effects), axis=0)
+    rng = np.random.default_rng(seed)
+    resampled = np.asarray(
+        [np.mean(np.abs(effects[rng.integers(0, design.samples, design.samples)]), axis=0) for _ in range(bootstrap)],
+    )
+    mu_star_ci = _percentile_interval(resampled, confidence) if bootstrap else None
+    report: dict[str, dict[str, Any]] = {}
+    for column, name in enumerate(FEATURE_COLUMNS):
+        span = ranges[name][1] - ranges[name][0]
+        report[name] = {
+            "mu": round(float(np.mean(effects[:, column])), 6),
+            "mu_star": round(float(mu_star[column]), 6),
+            "sigma": round(float(np.std(effects[:, column], ddof=1)), 6),
+            "mu_star_per_unit": round(float(mu_star[column] / span), 6) if span else 0.0,
+        }
+        if bootstrap:
+            report[name]["mu_star_ci"] = [round(float(value), 6) for value in mu_star_ci[column]]
+    return report
+
+
+class OpfEvaluationCache:
+    """Append-only JSONL memo of OPF outputs keyed by the exact feature vector."""
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self.entries: dict[tuple[float, ...], dict[str, float]] = {}
+        if path is not None and path.exists():
+            # Touch the memo so LRU eviction sees it as recently used.
+            os.utime(path)
+            for record in iter_jsonl(path):
+                self.entries[tuple(record["features"])] = record["outputs"]
+
+    def store(self, features: tuple[float, ...], outputs: dict[str, float]) -> None:
+        self.entries[features] = outputs
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(stable_json_dumps({"features": list(features), "outputs": outputs}) + "\n")
+
+
+def evaluate_opf(
+    points: np.ndarray,
+    *,
+    seed: int,
+    solver: str,
+    context_index: int,
+    workers: int | None,
+    warm_start: bool,
+    cache: OpfEvaluationCache,
+    progress: Callable[[DispatchProgress], None] | None = None,
+    progress_every: int = 0,
+) -> tuple[dict[str, np.ndarray], int]:
+    """Solve each unique, uncached design point once; return every output column and the cache hit count."""
+    keys = [tuple(float(value) for value in row) for row in points.tolist()]
+    pending = list(dict.fromkeys(key for key in keys if key not in cache.entries))
+    rows = iter_feature_dispatch_rows(
+        (dict(zip(FEATURE_COLUMNS, key)) for key in pending),
+        seed,
+        solver=solver,
+        context_index=context_index,
+        workers=workers,
+        progress=progress,
+        progress_every=progress_every,
+        warm_start=warm_start,
+    )
+    for key, row in zip(pending, rows, strict=True):
+        cache.store(key, {name: float(row[name]) for name in SENSITIVITY_OUTPUTS})
+    hits = len(keys) - len(pending)
+    return {name: np.asarray([cache.entries[key][name] for key in keys], dtype=np.float64) for name in SENSITIVITY_OUTPUTS}, hits
+
+
+def evaluate_surrogate(points: np.ndarray, model_path: Path) -> dict[str, np.ndarray]:
+    from training.dispatch_pinn.predictor import DispatchPredictor
+
+    predictor = DispatchPredictor.load(model_path)
+    return {"target_dispatch_mw": predictor.predict(points).astype(np.float64)}
+
+
+def _parse_range_overrides(entries: list[str]) -> dict[str, tuple[float, float]]:
+    ranges = dict(FEATURE_RANGES)
+    for entry in entries:
+        name, _, bounds = entry.partition("=")
+        low, _, high = bounds.partition(":")
+        if name not in ranges or not low or not high:
+            raise SystemExit(f"--range expects <feature>=<low>:<high> with a feature from {FEATURE_COLUMNS}; got {entry!r}.")
+        ranges[name] = (float(low), float(high))
+    return ranges
+
+
+def _report_progress(progress: DispatchProgress) -> None:
+    print(f"[sensitivity] {progress.summary()}", file=sys.stderr, flush=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sobol or Morris sensitivity of dispatch outputs over FEATURE_RANGES.")
+    parser.add_argument("--out-report", required=True, help="Path to write the sensitivity report JSON.")
+    parser.add_argument("--method", choices=SENSITIVITY_METHODS, default="sobol", help="Variance-based Sobol indices or Morris screening.")
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=256,
+        help="Sobol base samples N (N*(k+2) evaluations) or Morris trajectories r (r*(k+1) evaluations). Default: 256.",
+    )
+    parser.add_argument("--levels", type=int, default=MORRIS_LEVELS, help="Morris grid levels. Default: 4.")
+    parser.add_argument("--output", choices=SENSITIVITY_OUTPUTS, default="target_dispatch_mw", help="Scenario column to analyse.")
+    parser.add_argument(
+        "--range",
+        action="append",
+        default=[],
+        metavar="FEATURE=LOW:HIGH",
+        help="Override one feature range; repeat for several. Defaults to FEATURE_RANGES.",
+    )
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed for the design, the simulator and bootstrap. Default: 42.")
+    parser.add_argument("--bootstrap", type=int, default=DEFAULT_BOOTSTRAP, help="Bootstrap resamples for confidence intervals; 0 disables. Default: 500.")
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE, help="Confidence level of the intervals. Default: 0.95.")
+    parser.add_argument(
+        "--surrogate",
+        default=None,
+        help="Score the design with a trained dispatch model (JSON weights, .pt/.ts or .onnx) instead of the OPF.",
+    )
+    parser.add_argument("--solver", choices=SOLVER_BACKENDS, default="pandapower", help="OPF backend for non-surrogate runs.")
+    parser.add_argument("--warm-start", action="store_true", help="Native backend only: warm-start LPs from neighbouring design points.")
+    parser.add_argument("--context-index", type=int, default=0, help="Scenario index whose renewable bus placement every design point uses. Default: 0.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for the pandapower backend.")
+    parser.add_argument("--progress-every", type=int, default=1000, help="Report OPF progress every N design points. Default: 1000.")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor extend the on-disk OPF evaluation cache.")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="Scenario cache directory. Default: ~/.cache/ceip-scenarios.")
+    parser.add_argument("--cache-max-gb", type=float, default=DEFAULT_CACHE_MAX_BYTES / 1024**3, help="LRU size budget for the cache. Default: 10.")
+    args = parser.parse_args()
+
+    if args.surrogate and args.output != "target_dispatch_mw":
+        raise SystemExit("The surrogate only predicts target_dispatch_mw.")
+    if args.warm_start and args.solver != "native":
+        raise SystemExit("--warm-start requires --solver native.")
+    if not 0.0 < args.confidence < 1.0:
+        raise SystemExit("--confidence must be in (0, 1).")
+    ranges = _parse_range_overrides(args.range)
+    dimensions = len(FEATURE_COLUMNS)
+    if args.method == "sobol":
+        design = sobol_design(args.samples, args.seed, dimensions)
+    else:
+        design = morris_design(args.samples, args.seed, dimensions, args.levels)
+    points = scale_design(design.unit, ranges)
+
+    started = time.perf_counter()
+    cache_hits = 0
+    if args.surrogate:
+        outputs = evaluate_surrogate(points, Path(args.surrogate))
+        evaluator: dict[str, Any] = {"kind": "surrogate", "model": Path(args.surrogate).name}
+    else:
+        cache_dir = Path(args.cache_dir).expanduser()
+        cache_path = None
+        if not args.no_cache:
+            cache_params = {
+                "model_key": "dispatch-pinn-v2",
+                "purpose": "sensitivity",
+                "simulator_version": SIMULATOR_VERSION,
+                "seed": args.seed,
+                "solver": args.solver,
+                "context_index": args.context_index,
+            }
+            if args.warm_start:
+                cache_params["warm_start"] = True
+            key = scenario_cache_key(cache_params, [simulator.__file__])
+            cache_path = cache_dir / SENSITIVITY_CACHE_SUBDIR / f"{key}.jsonl"
+        outputs, cache_hits = evaluate_opf(
+            points,
+            seed=args.seed,
+            solver=args.solver,
+            context_index=args.context_index,
+            workers=args.workers,
+            warm_start=args.warm_start,
+            cache=OpfEvaluationCache(cache_path),
+            progress=_report_progress,
+            progress_every=args.progress_every,
+        )
+        if cache_path is not None:
+            # The memo shares the scenario cache's size budget.
+            evict_cache(cache_dir, int(args.cache_max_gb * 1024**3))
+        evaluator = {"kind": "opf", "solver": args.solver, "context_index": args.context_index, "warm_start": args.warm_start}
+    evaluation_s = time.perf_counter() - started
+
+    values = outputs[args.output]
+    common = {"bootstrap": args.bootstrap, "confidence": args.confidence, "seed": args.seed}
+    if args.method == "sobol":
+        indices = sobol_indices(values, design.samples, dimensions, **common)
+    else:
+        indices = morris_indices(design, values, ranges, **common)
+
+    write_json(
+        Path(args.out_report),
+        {
+            "method": args.method,
+            "output": args.output,
+            "seed": args.seed,
+            "samples": design.samples,
+            "levels": design.levels or None,
+            "evaluations": len(points),
+            "cache_hits": cache_hits,
+            "evaluation_seconds": round(evaluation_s, 3),
+            "evaluator": evaluator,
+            "bootstrap": args.bootstrap,
+            "confidence": args.confidence,
+            "feature_ranges": {name: list(ranges[name]) for name in FEATURE_COLUMNS},
+            "output_mean": round(float(np.mean(values)), 6),
+            "output_std": round(float(np.std(values)), 6),
+            "indices": indices,
+        },
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,17 +1,22 @@
 from __future__ import annotations
 
 import copy
-import json
 import logging
+import operator
 import os
+import threading
+import time
 import warnings
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
-from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator, Mapping
 
 import numpy as np
 
+from training.common.columnar import load_columns
+from training.common.jsonl_io import JsonlWriteResult, iter_jsonl, write_jsonl_rows
+
 FEATURE_COLUMNS = [
     "load_mw",
     "temperature_c",
@@ -32,13 +37,42 @@ FEATURE_RANGES = {
     "previous_dispatch_mw": (80.0, 350.0),
 }
 
+ROW_INT_COLUMNS = ["index", "seed", "wind_bus", "solar_bus"]
+ROW_FLOAT_COLUMNS = [
+    *FEATURE_COLUMNS,
+    "target_dispatch_mw",
+    "physics_upper_bound_mw",
+    "physics_lower_bound_mw",
+    "available_generation_mw",
+    "capacity_violation_mw",
+    "reserve_violation_mw",
+    "ramp_violation_mw",
+    "sample_weight",
+]
+
 SIMULATOR_NAME = "pandapower"
 SIMULATOR_VERSION = "pandapower-dcopf-ieee30-v1"
 SIMULATOR_TOPOLOGY = "IEEE-30"
 MODEL_KEY = "pinn-dispatch-v2"
 MODEL_VERSION = "pinn-dispatch-v2"
+SOLVER_BACKENDS = ("pandapower", "native")
+# latin_hypercube strata depend on the total count; kronecker rows depend only on their index.
+SAMPLING_STRATEGIES = ("latin_hypercube", "kronecker")
+NATIVE_BATCH_SIZE = 256
+DEFAULT_MAX_WORKERS = 8
+# Small tasks keep workers balanced: heuristic fallbacks finish far faster than converged OPFs.
+WORKER_TASK_SIZE = 4
+SERIAL_THRESHOLD = 64
+# Rows are rounded to 3 decimals, so backends agree when they differ by at most one rounding step.
+PARITY_TOLERANCE_MW = 1e-3
+# Slack allowed when checking a repaired warm-start point against the LP constraints.
+WARM_START_TOLERANCE_MW = 1e-7
 
 _PANDAPOWER_CACHE: tuple[Any, Any, Any, Any] | None = None
+_NETWORK_TEMPLATE: tuple[Any, dict[str, Any], float] | None = None
+_NETWORK_LOCAL = threading.local()
+# Tables rewritten by simulate_dispatch_scenario; everything else on the net is read-only.
+MUTATED_TABLES = ("load", "gen", "ext_grid", "sgen", "poly_cost")
 
 
 @dataclass(frozen=True)
@@ -63,9 +97,11 @@ class DispatchScenario:
     simulator_status: str
     wind_bus: int | None = None
     solar_bus: int | None = None
+    instrumentation: dict[str, Any] | None = None
+    raw_opf: dict[str, Any] | None = None
 
     def to_row(self) -> dict[str, Any]:
-        return {
+        row = {
             "index": self.index,
             "seed": self.seed,
             "load_mw": round(self.load_mw, 3),
@@ -87,10 +123,50 @@ class DispatchScenario:
             "wind_bus": self.wind_bus,
             "solar_bus": self.solar_bus,
         }
+        if self.instrumentation is not None:
+            # Only present on instrumented runs, so default datasets stay byte-identical.
+            row["instrumentation"] = self.instrumentation
+        if self.raw_opf is not None:
+            # Unrounded solver outputs, so physics coefficients can be re-derived without the OPF.
+            row["opf"] = self.raw_opf
+        return row
 
 
 def build_feature_row(index: int, seed: int) -> dict[str, float]:
-    return build_lhs_feature_rows(index + 1, seed)[index]
+    return build_indexed_feature_rows([index], seed)[0]
+
+
+def _kronecker_alphas(dimensions: int) -> np.ndarray:
+    # Generalized golden ratio: the unique positive root of x^(d+1) = x + 1 (Roberts' R_d sequence).
+    phi = 2.0
+    for _ in range(64):
+        phi = (1.0 + phi) ** (1.0 / (dimensions + 1))
+    return np.power(1.0 / phi, np.arange(1, dimensions + 1, dtype=np.float64)) % 1.0
+
+
+def build_indexed_feature_rows(indices: Iterable[int], seed: int) -> list[dict[str, float]]:
+    """Sample feature rows from a randomly shifted Kronecker (R_d) low-discrepancy sequence.
+
+    Row ``i`` depends only on ``(i, seed)``, never on how many rows are drawn, so
+    single rows, shards and resumed runs can be regenerated in O(1) per row.
+    """
+    positions = np.asarray(list(indices), dtype=np.float64)
+    if positions.size == 0:
+        return []
+    shift = np.random.default_rng(seed).random(len(FEATURE_COLUMNS))
+    unit = (shift + np.outer(positions + 1.0, _kronecker_alphas(len(FEATURE_COLUMNS)))) % 1.0
+    lows = np.array([FEATURE_RANGES[name][0] for name in FEATURE_COLUMNS], dtype=np.float64)
+    highs = np.array([FEATURE_RANGES[name][1] for name in FEATURE_COLUMNS], dtype=np.float64)
+    values = lows + unit * (highs - lows)
+    return [dict(zip(FEATURE_COLUMNS, (float(value) for value in row), strict=True)) for row in values]
+
+
+def build_sampled_feature_rows(count: int, seed: int, sampling: str = "latin_hypercube") -> list[dict[str, float]]:
+    if sampling not in SAMPLING_STRATEGIES:
+        raise ValueError(f"Unknown dispatch sampling strategy: {sampling}")
+    if sampling == "kronecker":
+        return build_indexed_feature_rows(range(count), seed)
+    return build_lhs_feature_rows(count, seed)
 
 
 def _latin_hypercube_values(count: int, seed: int, low: float, high: float, salt: int) -> np.ndarray:
@@ -119,15 +195,66 @@ def build_lhs_feature_rows(count: int, seed: int) -> list[dict[str, float]]:
 def load_jsonl(path: Path) -> list[dict[str, Any]]:
     if not path.exists():
         return []
-    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    return list(iter_jsonl(path))
 
 
-def write_jsonl(path: Path, rows: list[dict[str, Any]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(
-        "\n".join(json.dumps(row, sort_keys=True, separators=(",", ":"), ensure_ascii=True) for row in rows) + "\n",
-        encoding="utf-8",
-    )
+def write_jsonl(path: Path, rows: Iterable[dict[str, Any]]) -> JsonlWriteResult:
+    return write_jsonl_rows(path, rows)
+
+
+DISPATCH_RECORD_DTYPE = np.dtype(
+    [(name, np.int64) for name in ROW_INT_COLUMNS] + [(name, np.float64) for name in ROW_FLOAT_COLUMNS],
+)
+_RECORD_FIELDS = operator.itemgetter(*ROW_INT_COLUMNS, *ROW_FLOAT_COLUMNS, "simulator_status")
+_INITIAL_RECORD_CAPACITY = 4096
+
+
+def _dispatch_record(row: dict[str, Any]) -> tuple[Any, ...]:
+    """Slow path for rows with null buses or no ``sample_weight`` (older datasets)."""
+    ints = tuple(-1 if row.get(name) is None else int(row[name]) for name in ROW_INT_COLUMNS)
+    floats = tuple(float(row.get(name, 1.0) if name == "sample_weight" else row[name]) for name in ROW_FLOAT_COLUMNS)
+    return (*ints, *floats, str(row["simulator_status"]))
+
+
+def dispatch_columns_from_rows(rows: Iterable[dict[str, Any]], count: int | None = None) -> dict[str, np.ndarray]:
+    """Pack scenario rows into typed columns in a single pass.
+
+    Each row is copied into a preallocated structured array with one tuple
+    assignment; the returned numeric columns are views of that array. Without
+    ``count`` the array grows geometrically, so rows are never buffered as
+    dicts. Numeric fields stay float64 so values round-trip exactly from the JSONL.
+    """
+    records = np.zeros(_INITIAL_RECORD_CAPACITY if count is None else count, dtype=DISPATCH_RECORD_DTYPE)
+    statuses: list[str] = []
+    filled = 0
+    for filled, row in enumerate(rows, start=1):
+        if filled > len(records):
+            if count is not None:
+                raise ValueError(f"Expected {count} dispatch rows, found more.")
+            records = np.resize(records, 2 * len(records))
+        try:
+            *values, status = _RECORD_FIELDS(row)
+            records[filled - 1] = tuple(values)
+        except (KeyError, TypeError):
+            *values, status = _dispatch_record(row)
+            records[filled - 1] = tuple(values)
+        statuses.append(status)
+    if count is not None and filled != count:
+        raise ValueError(f"Expected {count} dispatch rows, found {filled}.")
+    records = records[:filled]
+    columns: dict[str, np.ndarray] = {name: records[name] for name in DISPATCH_RECORD_DTYPE.names}
+    columns["simulator_status"] = np.asarray(statuses, dtype=str)
+    return columns
+
+
+def load_dispatch_columns(path: Path) -> dict[str, np.ndarray]:
+    """Memory-map the columnar sidecar when present, otherwise stream-parse the JSONL."""
+    columns = load_columns(path)
+    if columns is not None:
+        return columns
+    if not path.exists():
+        return dispatch_columns_from_rows([], count=0)
+    return dispatch_columns_from_rows(iter_jsonl(path))
 
 
 def _load_pandapower():
@@ -148,6 +275,40 @@ def _load_pandapower():
     return _PANDAPOWER_CACHE
 
 
+def _network_template() -> tuple[Any, dict[str, Any], float]:
+    """Return the pristine IEEE-30 net for this process, building it on first use."""
+    global _NETWORK_TEMPLATE
+    if _NETWORK_TEMPLATE is not None:
+        return _NETWORK_TEMPLATE
+    _, _, _, case_ieee30 = _load_pandapower()
+    base_net = case_ieee30()
+    tables = {name: base_net[name].copy(deep=True) for name in MUTATED_TABLES}
+    base_load_mw = max(1.0, _safe_float(base_net.load.p_mw.sum(), 1.0))
+    _NETWORK_TEMPLATE = (base_net, tables, base_load_mw)
+    return _NETWORK_TEMPLATE
+
+
+def _init_dispatch_worker() -> None:
+    """Process-pool initializer: pay the case_ieee30 load once per worker."""
+    _network_template()
+
+
+def _reset_network() -> tuple[Any, float]:
+    """Hand out this thread's working net with the mutated tables restored from the template.
+
+    Only the tables listed in MUTATED_TABLES are replaced; result tables and the
+    cached ppc are rebuilt by every rundcopp call, so a full deepcopy is unnecessary.
+    """
+    base_net, tables, base_load_mw = _network_template()
+    net = getattr(_NETWORK_LOCAL, "net", None)
+    if net is None:
+        net = copy.deepcopy(base_net)
+        _NETWORK_LOCAL.net = net
+    for name, table in tables.items():
+        net[name] = table.copy(deep=True)
+    return net, base_load_mw
+
+
 def _safe_float(value: Any, fallback: float = 0.0) -> float:
     try:
         numeric = float(value)
@@ -180,25 +341,65 @@ def _configure_dispatch_bounds(net, load_mw: float, reserve_margin_percent: floa
         net.ext_grid.loc[:, "max_p_mw"] = max(load_mw * 1.5, load_mw + reserve_margin_percent * load_mw * 0.02)
 
 
-def simulate_dispatch_scenario(index: int, seed: int, feature_row: dict[str, float] | None = None) -> DispatchScenario:
-    pp, create_poly_cost, create_sgen, case_ieee30 = _load_pandapower()
+def _load_scale(feature_row: dict[str, float]) -> float:
+    return max(0.85, min(1.35, 0.85 + (feature_row["load_mw"] - 5600) / 6400 * 0.5))
+
+
+def _reserve_factor(feature_row: dict[str, float]) -> float:
+    return max(0.65, 1 - feature_row["reserve_margin_percent"] / 100.0 * 0.25)
+
+
+def _ext_grid_max_p_mw(feature_row: dict[str, float]) -> float:
+    load_mw = feature_row["load_mw"]
+    return max(load_mw * 1.5, load_mw + feature_row["reserve_margin_percent"] * load_mw * 0.02)
+
+
+def _renewable_injections(feature_row: dict[str, float], base_load_mw: float) -> tuple[float, float]:
+    actual_wind_mw = max(5.0, min(base_load_mw * 0.18, feature_row["wind_generation_mw"] * 0.03 + 5.0))
+    actual_solar_mw = max(3.0, min(base_load_mw * 0.12, feature_row["solar_generation_mw"] * 0.025 + 3.0))
+    return actual_wind_mw, actual_solar_mw
+
+
+def _renewable_buses(index: int, seed: int, load_buses: list[int]) -> tuple[int, int]:
+    wind_bus = load_buses[(index + seed) % len(load_buses)]
+    solar_bus = load_buses[(index * 3 + seed) % len(load_buses)]
+    return wind_bus, solar_bus
+
+
+def _heuristic_dispatch_mw(feature_row: dict[str, float]) -> float:
+    return max(
+        0.0,
+        feature_row["load_mw"]
+        + (20 - feature_row["temperature_c"]) * 5
+        - feature_row["wind_generation_mw"] * 0.02
+        - feature_row["solar_generation_mw"] * 0.018
+        + (10 - feature_row["reserve_margin_percent"]) * 2.5,
+    )
+
+
+def simulate_dispatch_scenario(
+    index: int,
+    seed: int,
+    feature_row: dict[str, float] | None = None,
+    instrument: bool = False,
+    store_opf: bool = False,
+) -> DispatchScenario:
+    pp, create_poly_cost, create_sgen, _ = _load_pandapower()
     feature_row = feature_row or build_feature_row(index, seed)
 
-    base_net = case_ieee30()
-    base_load_mw = max(1.0, _safe_float(base_net.load.p_mw.sum(), 1.0))
-    load_scale = max(0.85, min(1.35, 0.85 + (feature_row["load_mw"] - 5600) / 6400 * 0.5))
+    prep_started = time.perf_counter()
+    net, base_load_mw = _reset_network()
+    load_scale = _load_scale(feature_row)
 
-    net = copy.deepcopy(base_net)
     if len(net.load.index) > 0:
         net.load.loc[:, "p_mw"] = net.load["p_mw"].astype(float) * load_scale
         if "q_mvar" in net.load.columns:
             net.load.loc[:, "q_mvar"] = net.load["q_mvar"].astype(float) * load_scale
 
     load_buses = [int(bus) for bus in net.load.bus.tolist()] or [int(net.bus.index[0])]
-    wind_bus = load_buses[(index + seed) % len(load_buses)]
-    solar_bus = load_buses[(index * 3 + seed) % len(load_buses)]
+    wind_bus, solar_bus = _renewable_buses(index, seed, load_buses)
 
-    reserve_factor = max(0.65, 1 - feature_row["reserve_margin_percent"] / 100.0 * 0.25)
+    reserve_factor = _reserve_factor(feature_row)
     if "max_p_mw" in net.gen.columns and len(net.gen.index) > 0:
         net.gen.loc[:, "max_p_mw"] = net.gen["max_p_mw"].astype(float) * reserve_factor
     if len(net.ext_grid.index) > 0:
@@ -207,8 +408,7 @@ def simulate_dispatch_scenario(index: int, seed: int, feature_row: dict[str, flo
         else:
             net.ext_grid.loc[:, "max_p_mw"] = net.ext_grid["max_p_mw"].astype(float).clip(lower=feature_row["load_mw"] * 1.05)
 
-    actual_wind_mw = max(5.0, min(base_load_mw * 0.18, feature_row["wind_generation_mw"] * 0.03 + 5.0))
-    actual_solar_mw = max(3.0, min(base_load_mw * 0.12, feature_row["solar_generation_mw"] * 0.025 + 3.0))
+    actual_wind_mw, actual_solar_mw = _renewable_injections(feature_row, base_load_mw)
     if len(net.sgen.index) > 0:
         net.sgen.drop(net.sgen.index, inplace=True)
     create_sgen(
@@ -238,6 +438,8 @@ def simulate_dispatch_scenario(index: int, seed: int, feature_row: dict[str, flo
     _ensure_costs(net, create_poly_cost)
 
     simulate_status = "dcopf"
+    fallback_reason = None
+    solve_started = time.perf_counter()
     try:
         pp.rundcopp(net, suppress_warnings=True)
         converged = bool(getattr(net, "OPF_converged", False))
@@ -249,44 +451,167 @@ def simulate_dispatch_scenario(index: int, seed: int, feature_row: dict[str, flo
             + _safe_float(net.res_gen.p_mw.sum(), 0.0)
             + _safe_float(net.res_sgen.p_mw.sum(), 0.0),
         )
-    except Exception:
+    except Exception as exc:
         simulate_status = "heuristic_fallback"
-        target_dispatch_mw = max(
-            0.0,
-            feature_row["load_mw"]
-            + (20 - feature_row["temperature_c"]) * 5
-            - feature_row["wind_generation_mw"] * 0.02
-            - feature_row["solar_generation_mw"] * 0.018
-            + (10 - feature_row["reserve_margin_percent"]) * 2.5,
-        )
+        fallback_reason = f"{type(exc).__name__}: {exc}"
+        target_dispatch_mw = _heuristic_dispatch_mw(feature_row)
+    solve_finished = time.perf_counter()
 
     gen_capacity = _safe_float(net.gen["max_p_mw"].sum(), 0.0) if "max_p_mw" in net.gen.columns else _safe_float(net.gen["p_mw"].sum(), 0.0)
     ext_capacity = _safe_float(net.ext_grid["max_p_mw"].sum(), feature_row["load_mw"] * 1.5) if len(net.ext_grid.index) > 0 else 0.0
     sgen_capacity = _safe_float(net.sgen["max_p_mw"].sum(), 0.0) if "max_p_mw" in net.sgen.columns else _safe_float(net.sgen["p_mw"].sum(), 0.0)
     available_generation_mw = max(1.0, gen_capacity + ext_capacity + sgen_capacity)
-    ramp_limit_mw_per_hour = max(15.0, min(60.0, feature_row["ramp_limit_mw_per_hour"] * 0.12))
-    physics_upper_bound_mw = max(
-        target_dispatch_mw,
-        target_dispatch_mw + feature_row["reserve_margin_percent"] * 0.35 + actual_wind_mw * 0.1 + actual_solar_mw * 0.1,
+    scenario = _finalize_scenario(
+        index,
+        seed,
+        feature_row,
+        target_dispatch_mw=target_dispatch_mw,
+        simulate_status=simulate_status,
+        available_generation_mw=available_generation_mw,
+        actual_wind_mw=actual_wind_mw,
+        actual_solar_mw=actual_solar_mw,
+        wind_bus=wind_bus,
+        solar_bus=solar_bus,
+        store_opf=store_opf,
     )
-    physics_lower_bound_mw = max(
-        0.0,
-        target_dispatch_mw
-        - feature_row["reserve_margin_percent"] * 0.4
-        - max(0.0, 20 - feature_row["temperature_c"]) * 0.1
-        - actual_solar_mw * 0.15,
+    if not instrument:
+        return scenario
+    return replace(
+        scenario,
+        instrumentation=_instrumentation_record(
+            solver="pandapower",
+            prep_s=solve_started - prep_started,
+            solve_s=solve_finished - solve_started,
+            fallback_reason=fallback_reason,
+        ),
     )
-    previous_dispatch_anchor_mw = max(80.0, min(350.0, feature_row["previous_dispatch_mw"]))
-    previous_direction = -1.0 if previous_dispatch_anchor_mw > target_dispatch_mw else 1.0
-    ramp_fraction = 0.12 + ((index + seed) % 6) * 0.04
-    previous_dispatch_mw = max(
+
+
+def _instrumentation_record(*, solver: str, prep_s: float, solve_s: float, fallback_reason: str | None) -> dict[str, Any]:
+    return {
+        "solver": solver,
+        "prep_s": round(prep_s, 6),
+        "solve_s": round(solve_s, 6),
+        "fallback_reason": fallback_reason,
+        "pid": os.getpid(),
+    }
+
+
+@dataclass(frozen=True)
+class PhysicsCoefficients:
+    """Coefficients of the post-OPF physics bounds, ramp limits and sample weights."""
+
+    ramp_limit_scale: float = 0.12
+    ramp_limit_min_mw: float = 15.0
+    ramp_limit_max_mw: float = 60.0
+    upper_reserve_factor: float = 0.35
+    upper_wind_factor: float = 0.1
+    upper_solar_factor: float = 0.1
+    lower_reserve_factor: float = 0.4
+    lower_cold_threshold_c: float = 20.0
+    lower_cold_factor: float = 0.1
+    lower_solar_factor: float = 0.15
+    previous_anchor_min_mw: float = 80.0
+    previous_anchor_max_mw: float = 350.0
+    ramp_fraction_base: float = 0.12
+    ramp_fraction_step: float = 0.04
+    ramp_fraction_cycle: int = 6
+    fallback_sample_weight: float = 0.4
+
+
+DEFAULT_PHYSICS = PhysicsCoefficients()
+
+
+def derive_physics_columns(
+    *,
+    index: np.ndarray,
+    seed: int | np.ndarray,
+    temperature_c: np.ndarray,
+    reserve_margin_percent: np.ndarray,
+    ramp_limit_feature: np.ndarray,
+    previous_dispatch_feature: np.ndarray,
+    target_dispatch_mw: np.ndarray,
+    actual_wind_mw: np.ndarray,
+    actual_solar_mw: np.ndarray,
+    fallback: np.ndarray,
+    coefficients: PhysicsCoefficients = DEFAULT_PHYSICS,
+) -> dict[str, np.ndarray]:
+    """Derive bounds, ramp limits, violations and sample weights for arrays of solved scenarios.
+
+    This is the single definition of the post-OPF physics; ``_finalize_scenario``
+    calls it with scalars, so array and per-scenario results are bit-identical.
+    """
+    c = coefficients
+    target = np.asarray(target_dispatch_mw, dtype=np.float64)
+    reserve = np.asarray(reserve_margin_percent, dtype=np.float64)
+    wind = np.asarray(actual_wind_mw, dtype=np.float64)
+    solar = np.asarray(actual_solar_mw, dtype=np.float64)
+    ramp_limit = np.maximum(c.ramp_limit_min_mw, np.minimum(c.ramp_limit_max_mw, np.asarray(ramp_limit_feature, dtype=np.float64) * c.ramp_limit_scale))
+    upper = np.maximum(target, target + reserve * c.upper_reserve_factor + wind * c.upper_wind_factor + solar * c.upper_solar_factor)
+    lower = np.maximum(
         0.0,
-        target_dispatch_mw + previous_direction * ramp_limit_mw_per_hour * ramp_fraction,
+        target
+        - reserve * c.lower_reserve_factor
+        - np.maximum(0.0, c.lower_cold_threshold_c - np.asarray(temperature_c, dtype=np.float64)) * c.lower_cold_factor
+        - solar * c.lower_solar_factor,
     )
-    capacity_violation_mw = max(0.0, target_dispatch_mw - physics_upper_bound_mw)
-    reserve_violation_mw = max(0.0, physics_lower_bound_mw - target_dispatch_mw)
-    ramp_violation_mw = max(0.0, abs(target_dispatch_mw - previous_dispatch_mw) - ramp_limit_mw_per_hour)
-    quality_weight = 1.0 if simulate_status != "heuristic_fallback" else 0.4
+    anchor = np.maximum(c.previous_anchor_min_mw, np.minimum(c.previous_anchor_max_mw, np.asarray(previous_dispatch_feature, dtype=np.float64)))
+    direction = np.where(anchor > target, -1.0, 1.0)
+    ramp_fraction = c.ramp_fraction_base + ((np.asarray(index, dtype=np.int64) + seed) % c.ramp_fraction_cycle) * c.ramp_fraction_step
+    previous = np.maximum(0.0, target + direction * ramp_limit * ramp_fraction)
+    return {
+        "ramp_limit_mw_per_hour": ramp_limit,
+        "physics_upper_bound_mw": upper,
+        "physics_lower_bound_mw": lower,
+        "previous_dispatch_mw": previous,
+        "capacity_violation_mw": np.maximum(0.0, target - upper),
+        "reserve_violation_mw": np.maximum(0.0, lower - target),
+        "ramp_violation_mw": np.maximum(0.0, np.abs(target - previous) - ramp_limit),
+        "sample_weight": np.where(np.asarray(fallback, dtype=bool), c.fallback_sample_weight, 1.0),
+    }
+
+
+def _finalize_scenario(
+    index: int,
+    seed: int,
+    feature_row: dict[str, float],
+    *,
+    target_dispatch_mw: float,
+    simulate_status: str,
+    available_generation_mw: float,
+    actual_wind_mw: float,
+    actual_solar_mw: float,
+    wind_bus: int,
+    solar_bus: int,
+    store_opf: bool = False,
+    derived: Mapping[str, float] | None = None,
+) -> DispatchScenario:
+    """Assemble a scenario from solver outputs, deriving the physics columns unless ``derived`` is given."""
+    if derived is None:
+        derived = {
+            name: float(value)
+            for name, value in derive_physics_columns(
+                index=np.asarray(index),
+                seed=seed,
+                temperature_c=np.asarray(feature_row["temperature_c"]),
+                reserve_margin_percent=np.asarray(feature_row["reserve_margin_percent"]),
+                ramp_limit_feature=np.asarray(feature_row["ramp_limit_mw_per_hour"]),
+                previous_dispatch_feature=np.asarray(feature_row["previous_dispatch_mw"]),
+                target_dispatch_mw=np.asarray(target_dispatch_mw),
+                actual_wind_mw=np.asarray(actual_wind_mw),
+                actual_solar_mw=np.asarray(actual_solar_mw),
+                fallback=np.asarray(simulate_status == "heuristic_fallback"),
+            ).items()
+        }
+    raw_opf = None
+    if store_opf:
+        raw_opf = {
+            "features": [feature_row[column] for column in FEATURE_COLUMNS],
+            "target_dispatch_mw": target_dispatch_mw,
+            "available_generation_mw": available_generation_mw,
+            "actual_wind_mw": actual_wind_mw,
+            "actual_solar_mw": actual_solar_mw,
+        }
 
     return DispatchScenario(
         index=index,
@@ -296,46 +621,738 @@ def simulate_dispatch_scenario(index: int, seed: int, feature_row: dict[str, flo
         wind_generation_mw=feature_row["wind_generation_mw"],
         solar_generation_mw=feature_row["solar_generation_mw"],
         reserve_margin_percent=feature_row["reserve_margin_percent"],
-        ramp_limit_mw_per_hour=ramp_limit_mw_per_hour,
-        previous_dispatch_mw=previous_dispatch_mw,
+        ramp_limit_mw_per_hour=derived["ramp_limit_mw_per_hour"],
+        previous_dispatch_mw=derived["previous_dispatch_mw"],
         target_dispatch_mw=target_dispatch_mw,
-        physics_upper_bound_mw=physics_upper_bound_mw,
-        physics_lower_bound_mw=physics_lower_bound_mw,
+        physics_upper_bound_mw=derived["physics_upper_bound_mw"],
+        physics_lower_bound_mw=derived["physics_lower_bound_mw"],
         available_generation_mw=available_generation_mw,
-        capacity_violation_mw=capacity_violation_mw,
-        reserve_violation_mw=reserve_violation_mw,
-        ramp_violation_mw=ramp_violation_mw,
-        sample_weight=quality_weight,
+        capacity_violation_mw=derived["capacity_violation_mw"],
+        reserve_violation_mw=derived["reserve_violation_mw"],
+        ramp_violation_mw=derived["ramp_violation_mw"],
+        sample_weight=derived["sample_weight"],
         simulator_status=simulate_status,
         wind_bus=wind_bus,
         solar_bus=solar_bus,
+        raw_opf=raw_opf,
     )
 
 
-def build_dispatch_rows(count: int, seed: int) -> list[dict[str, Any]]:
-    feature_rows = build_lhs_feature_rows(count, seed)
-    if count <= 0:
+@dataclass(frozen=True)
+class NativeDcopfModel:
+    """IEEE-30 DC-OPF data extracted once from pandapower for the native backend.
+
+    Flows are linear in bus injections, so each scenario reduces to a small LP
+    over the ext_grid, gen and two sgen set points constrained by the PTDF.
+    """
+
+    ptdf: np.ndarray
+    branch_limits_mw: np.ndarray
+    branch_offsets_mw: np.ndarray
+    bus_fixed_mw: np.ndarray
+    bus_lookup: np.ndarray
+    load_buses: list[int]
+    load_positions: np.ndarray
+    load_base_mw: np.ndarray
+    gen_positions: np.ndarray
+    gen_min_mw: np.ndarray
+    gen_max_mw: np.ndarray
+    gen_floor_mw: np.ndarray
+    gen_costs: np.ndarray
+    ext_positions: np.ndarray
+    ext_costs: np.ndarray
+    base_load_mw: float
+
+
+_NATIVE_MODEL: NativeDcopfModel | None = None
+
+
+def _native_dcopf_model() -> NativeDcopfModel:
+    global _NATIVE_MODEL
+    if _NATIVE_MODEL is not None:
+        return _NATIVE_MODEL
+    pp, create_poly_cost, _, _ = _load_pandapower()
+    from pandapower.pypower.idx_brch import BR_STATUS, RATE_A  # type: ignore
+    from pandapower.pypower.idx_bus import GS  # type: ignore
+    from pandapower.pypower.makeBdc import makeBdc  # type: ignore
+    from pandapower.pypower.makePTDF import makePTDF  # type: ignore
+
+    base_net, tables, base_load_mw = _network_template()
+    # Run one OPF on a template copy so the ppc carries the branch ratings pandapower's OPF uses.
+    net = copy.deepcopy(base_net)
+    _configure_dispatch_bounds(net, FEATURE_RANGES["load_mw"][0], FEATURE_RANGES["reserve_margin_percent"][0])
+    _ensure_costs(net, create_poly_cost)
+    pp.rundcopp(net, suppress_warnings=True)
+    ppc = net._ppc
+    base_mva = float(ppc["baseMVA"])
+    bus = ppc["bus"].real
+    branch = ppc["branch"].real
+    p_bus_inj, p_f_inj = makeBdc(bus, branch)[2:4]
+    ptdf = np.asarray(makePTDF(base_mva, bus, branch), dtype=np.float64)
+
+    in_service = branch[:, BR_STATUS] > 0
+    limited = in_service & (branch[:, RATE_A] > 0)
+    bus_lookup = np.asarray(net._pd2ppc_lookups["bus"], dtype=np.int64)
+
+    load = tables["load"]
+    gen = tables["gen"]
+    ext_grid = tables["ext_grid"]
+    load_scaling = load["scaling"].astype(float).to_numpy() if "scaling" in load.columns else np.ones(len(load.index))
+    load_active = load["in_service"].astype(bool).to_numpy() if "in_service" in load.columns else np.ones(len(load.index), dtype=bool)
+    gen_active = gen["in_service"].astype(bool).to_numpy() if "in_service" in gen.columns else np.ones(len(gen.index), dtype=bool)
+    gen_max = gen["max_p_mw"].astype(float).to_numpy() if "max_p_mw" in gen.columns else gen["p_mw"].astype(float).to_numpy()
+    gen_min = gen["min_p_mw"].astype(float).to_numpy() if "min_p_mw" in gen.columns else np.zeros(len(gen.index))
+    ext_costs = np.zeros(len(ext_grid.index), dtype=np.float64)
+    if len(ext_costs) > 0:
+        ext_costs[0] = 135.0
+
+    _NATIVE_MODEL = NativeDcopfModel(
+        ptdf=ptdf[limited],
+        branch_limits_mw=branch[limited, RATE_A],
+        branch_offsets_mw=np.asarray(p_f_inj, dtype=np.float64).ravel()[limited] * base_mva,
+        bus_fixed_mw=bus[:, GS] + np.asarray(p_bus_inj, dtype=np.float64).ravel() * base_mva,
+        bus_lookup=bus_lookup,
+        load_buses=[int(entry) for entry in load.bus.tolist()] or [int(base_net.bus.index[0])],
+        load_positions=bus_lookup[load.bus.astype(int).to_numpy()],
+        load_base_mw=load["p_mw"].astype(float).to_numpy() * load_scaling * load_active,
+        gen_positions=bus_lookup[gen.bus.astype(int).to_numpy()],
+        gen_min_mw=np.clip(gen_min, 0.0, None) * gen_active,
+        gen_max_mw=gen_max * gen_active,
+        gen_floor_mw=gen["p_mw"].astype(float).to_numpy(),
+        gen_costs=18.0 + gen.index.to_numpy(dtype=np.float64) * 4.5,
+        ext_positions=bus_lookup[ext_grid.bus.astype(int).to_numpy()],
+        ext_costs=ext_costs,
+        base_load_mw=base_load_mw,
+    )
+    return _NATIVE_MODEL
+
+
+@dataclass(frozen=True)
+class _NativeScenarioInputs:
+    index: int
+    feature_row: dict[str, float]
+    wind_bus: int
+    solar_bus: int
+    actual_wind_mw: float
+    actual_solar_mw: float
+    gen_max_mw: np.ndarray
+    ext_max_mw: float
+    bus_withdrawal_mw: np.ndarray
+
+
+def _native_scenario_inputs(model: NativeDcopfModel, index: int, seed: int, feature_row: dict[str, float]) -> _NativeScenarioInputs:
+    wind_bus, solar_bus = _renewable_buses(index, seed, model.load_buses)
+    actual_wind_mw, actual_solar_mw = _renewable_injections(feature_row, model.base_load_mw)
+    # Mirrors the pandas sequence in simulate_dispatch_scenario: scale by reserve factor, then clip to p_mw.
+    gen_max_mw = np.clip(model.gen_max_mw * _reserve_factor(feature_row), model.gen_floor_mw, None)
+    withdrawal = model.bus_fixed_mw.copy()
+    np.add.at(withdrawal, model.load_positions, model.load_base_mw * _load_scale(feature_row))
+    return _NativeScenarioInputs(
+        index=index,
+        feature_row=feature_row,
+        wind_bus=wind_bus,
+        solar_bus=solar_bus,
+        actual_wind_mw=actual_wind_mw,
+        actual_solar_mw=actual_solar_mw,
+        gen_max_mw=gen_max_mw,
+        ext_max_mw=_ext_grid_max_p_mw(feature_row),
+        bus_withdrawal_mw=withdrawal,
+    )
+
+
+def _native_lp_block(model: NativeDcopfModel, scenario: _NativeScenarioInputs):
+    """Return (cost, A_ub, b_ub, balance, bounds) for one scenario's DC-OPF LP.
+
+    Variables are ordered ext_grid, gen, wind sgen, solar sgen.
+    """
+    positions = np.concatenate(
+        [
+            model.ext_positions,
+            model.gen_positions,
+            model.bus_lookup[[scenario.wind_bus, scenario.solar_bus]],
+        ],
+    )
+    cost = np.concatenate([model.ext_costs, model.gen_costs, [2.0, 2.25]])
+    lower = np.concatenate([np.zeros(len(model.ext_positions)), model.gen_min_mw, [0.0, 0.0]])
+    upper = np.concatenate(
+        [
+            np.full(len(model.ext_positions), scenario.ext_max_mw),
+            scenario.gen_max_mw,
+            [scenario.actual_wind_mw, scenario.actual_solar_mw],
+        ],
+    )
+    sensitivity = model.ptdf[:, positions]
+    base_flow = model.branch_offsets_mw - model.ptdf @ scenario.bus_withdrawal_mw
+    a_ub = np.vstack([sensitivity, -sensitivity])
+    b_ub = np.concatenate([model.branch_limits_mw - base_flow, model.branch_limits_mw + base_flow])
+    return cost, a_ub, b_ub, float(scenario.bus_withdrawal_mw.sum()), np.column_stack([lower, upper])
+
+
+def _solve_native_batch(model: NativeDcopfModel, scenarios: list[_NativeScenarioInputs]) -> list[float | None]:
+    """Solve a batch of scenarios as one block-diagonal HiGHS LP.
+
+    Returns total dispatch per scenario, or None where the LP is infeasible.
+    """
+    return [None if dispatch is None else float(dispatch.sum()) for dispatch in _solve_native_dispatch(model, scenarios)]
+
+
+def _solve_native_dispatch(model: NativeDcopfModel, scenarios: list[_NativeScenarioInputs]) -> list[np.ndarray | None]:
+    """Per-unit optimal set points for each scenario, or None where the LP is infeasible.
+
+    If the stacked LP fails, scenarios are re-solved one by one to isolate failures.
+    """
+    from scipy.optimize import linprog
+    from scipy.sparse import block_diag
+
+    if not scenarios:
         return []
+    blocks = [_native_lp_block(model, scenario) for scenario in scenarios]
+    width = len(blocks[0][0])
+    result = linprog(
+        np.concatenate([block[0] for block in blocks]),
+        A_ub=block_diag([block[1] for block in blocks], format="csr"),
+        b_ub=np.concatenate([block[2] for block in blocks]),
+        A_eq=block_diag([np.ones((1, width))] * len(blocks), format="csr"),
+        b_eq=np.array([block[3] for block in blocks]),
+        bounds=np.vstack([block[4] for block in blocks]),
+        method="highs",
+    )
+    if result.status == 0:
+        return list(result.x.reshape(len(blocks), width))
+    if len(scenarios) == 1:
+        return [None]
+    return [_solve_native_dispatch(model, [scenario])[0] for scenario in scenarios]
 
-    workers = max(1, min(os.cpu_count() or 1, 8))
-    if workers == 1 or count < 64:
-        return [simulate_dispatch_scenario(index, seed, feature_rows[index]).to_row() for index in range(count)]
 
-    payloads = [(index, seed, feature_rows[index]) for index in range(count)]
-    try:
-        with ProcessPoolExecutor(max_workers=workers) as executor:
-            return list(
-                executor.map(
-                    _simulate_dispatch_row,
-                    payloads,
-                    chunksize=max(1, count // (workers * 8)),
+def _warm_start_order(scenarios: list[_NativeScenarioInputs]) -> list[int]:
+    """Visit order that puts scenarios with the same sgen buses and similar load next to each other."""
+    return sorted(
+        range(len(scenarios)),
+        key=lambda position: (
+            scenarios[position].wind_bus,
+            scenarios[position].solar_bus,
+            float(scenarios[position].bus_withdrawal_mw.sum()),
+        ),
+    )
+
+
+def _repair_warm_start(
+    warm: np.ndarray,
+    cost: np.ndarray,
+    a_ub: np.ndarray,
+    b_ub: np.ndarray,
+    balance: float,
+    bounds: np.ndarray,
+) -> np.ndarray | None:
+    """Move a neighbour's optimal set points onto this scenario's bounds and balance.
+
+    Any shortfall is taken from the cheapest units with headroom and any surplus is
+    shed from the most expensive ones. Returns the point if it satisfies every
+    constraint, else None.
+    """
+    candidate = np.clip(warm, bounds[:, 0], bounds[:, 1])
+    residual = balance - float(candidate.sum())
+    order = np.argsort(cost, kind="stable") if residual > 0 else np.argsort(-cost, kind="stable")
+    for position in order:
+        if abs(residual) <= WARM_START_TOLERANCE_MW:
+            break
+        room = bounds[position, 1] - candidate[position] if residual > 0 else bounds[position, 0] - candidate[position]
+        step = min(residual, room) if residual > 0 else max(residual, room)
+        candidate[position] += step
+        residual -= step
+    if abs(residual) > WARM_START_TOLERANCE_MW or np.any(a_ub @ candidate > b_ub + WARM_START_TOLERANCE_MW):
+        return None
+    return candidate
+
+
+def _solve_native_batch_warm(model: NativeDcopfModel, scenarios: list[_NativeScenarioInputs]) -> tuple[list[float | None], int]:
+    """Solve a batch in feature-proximity order, seeding each LP with its neighbour's solution.
+
+    DC flows are lossless, so every feasible point has the same total dispatch
+    as the optimum. A repaired neighbour solution that passes all constraints
+    therefore settles the scenario without a solver call; only the misses are
+    handed to HiGHS, and their optima become the next warm starts. Returns the
+    totals in input order and the number of scenarios settled by a warm start.
+    """
+    totals: list[float | None] = [None] * len(scenarios)
+    warm: np.ndarray | None = None
+    warm_hits = 0
+    for position in _warm_start_order(scenarios):
+        scenario = scenarios[position]
+        dispatch = None
+        if warm is not None:
+            cost, a_ub, b_ub, balance, bounds = _native_lp_block(model, scenario)
+            dispatch = _repair_warm_start(warm, cost, a_ub, b_ub, balance, bounds)
+            warm_hits += dispatch is not None
+        if dispatch is None:
+            dispatch = _solve_native_dispatch(model, [scenario])[0]
+        if dispatch is not None:
+            totals[position] = float(dispatch.sum())
+            warm = dispatch
+    return totals, warm_hits
+
+
+def _native_dispatch_scenarios(
+    indexed_rows: list[tuple[int, dict[str, float]]],
+    seed: int,
+    warm_start: bool = False,
+    instrument: bool = False,
+    store_opf: bool = False,
+) -> list[DispatchScenario]:
+    """Solve ``indexed_rows`` with the native backend.
+
+    With ``instrument`` set, batch prep and solve times are split evenly across
+    the scenarios of each batch, since HiGHS solves them as one LP. Physics
+    columns are derived for the whole batch in one vectorized call.
+    """
+    model = _native_dcopf_model()
+    prep_started = time.perf_counter()
+    inputs = [_native_scenario_inputs(model, index, seed, feature_row) for index, feature_row in indexed_rows]
+    prep_s = (time.perf_counter() - prep_started) / max(1, len(inputs))
+    totals: list[float | None] = []
+    solve_times: list[float] = []
+    for start in range(0, len(inputs), NATIVE_BATCH_SIZE):
+        batch = inputs[start : start + NATIVE_BATCH_SIZE]
+        solve_started = time.perf_counter()
+        totals.extend(_solve_native_batch_warm(model, batch)[0] if warm_start else _solve_native_batch(model, batch))
+        solve_times.extend([(time.perf_counter() - solve_started) / len(batch)] * len(batch))
+
+    fallback = np.asarray([total is None or not np.isfinite(total) for total in totals], dtype=bool)
+    targets = [
+        _heuristic_dispatch_mw(scenario.feature_row) if failed else max(0.0, total)
+        for scenario, total, failed in zip(inputs, totals, fallback, strict=True)
+    ]
+    derived_columns = derive_physics_columns(
+        index=np.asarray([scenario.index for scenario in inputs], dtype=np.int64),
+        seed=seed,
+        temperature_c=np.asarray([scenario.feature_row["temperature_c"] for scenario in inputs], dtype=np.float64),
+        reserve_margin_percent=np.asarray([scenario.feature_row["reserve_margin_percent"] for scenario in inputs], dtype=np.float64),
+        ramp_limit_feature=np.asarray([scenario.feature_row["ramp_limit_mw_per_hour"] for scenario in inputs], dtype=np.float64),
+        previous_dispatch_feature=np.asarray([scenario.feature_row["previous_dispatch_mw"] for scenario in inputs], dtype=np.float64),
+        target_dispatch_mw=np.asarray(targets, dtype=np.float64),
+        actual_wind_mw=np.asarray([scenario.actual_wind_mw for scenario in inputs], dtype=np.float64),
+        actual_solar_mw=np.asarray([scenario.actual_solar_mw for scenario in inputs], dtype=np.float64),
+        fallback=fallback,
+    )
+    derived_rows = [dict(zip(derived_columns, values)) for values in zip(*(column.tolist() for column in derived_columns.values()))]
+
+    scenarios: list[DispatchScenario] = []
+    for position, (scenario, solve_s) in enumerate(zip(inputs, solve_times, strict=True)):
+        failed = bool(fallback[position])
+        simulate_status = "heuristic_fallback" if failed else "dcopf"
+        fallback_reason = "LP infeasible" if failed else None
+        target_dispatch_mw = targets[position]
+        gen_capacity = _safe_float(scenario.gen_max_mw.sum(), 0.0)
+        ext_capacity = scenario.ext_max_mw * len(model.ext_positions)
+        sgen_capacity = scenario.actual_wind_mw + scenario.actual_solar_mw
+        finalized = _finalize_scenario(
+            scenario.index,
+            seed,
+            scenario.feature_row,
+            target_dispatch_mw=target_dispatch_mw,
+            simulate_status=simulate_status,
+            available_generation_mw=max(1.0, gen_capacity + ext_capacity + sgen_capacity),
+            actual_wind_mw=scenario.actual_wind_mw,
+            actual_solar_mw=scenario.actual_solar_mw,
+            wind_bus=scenario.wind_bus,
+            solar_bus=scenario.solar_bus,
+            store_opf=store_opf,
+            derived=derived_rows[position],
+        )
+        if instrument:
+            finalized = replace(
+                finalized,
+                instrumentation=_instrumentation_record(
+                    solver="native-highs-warm-start" if warm_start else "native-highs",
+                    prep_s=prep_s,
+                    solve_s=solve_s,
+                    fallback_reason=fallback_reason,
                 ),
             )
+        scenarios.append(finalized)
+    return scenarios
+
+
+def compare_solver_backends(
+    count: int,
+    seed: int,
+    tolerance: float = PARITY_TOLERANCE_MW,
+    warm_start: bool = False,
+) -> dict[str, Any]:
+    """Solve the same LHS design with both backends and report row-level disagreements."""
+    feature_rows = build_lhs_feature_rows(count, seed)
+    reference = [simulate_dispatch_scenario(index, seed, feature_rows[index]).to_row() for index in range(count)]
+    native = [scenario.to_row() for scenario in _native_dispatch_scenarios(list(enumerate(feature_rows)), seed, warm_start)]
+    mismatches: list[dict[str, Any]] = []
+    max_abs_diff = 0.0
+    for expected, actual in zip(reference, native, strict=True):
+        for key, value in expected.items():
+            other = actual[key]
+            if isinstance(value, float):
+                diff = abs(value - float(other))
+                max_abs_diff = max(max_abs_diff, diff)
+                if diff <= tolerance:
+                    continue
+            elif value == other:
+                continue
+            mismatches.append({"index": expected["index"], "field": key, "pandapower": value, "native": other})
+    return {
+        "scenario_count": count,
+        "seed": seed,
+        "tolerance_mw": tolerance,
+        "max_abs_diff": round(max_abs_diff, 6),
+        "mismatches": mismatches,
+        "passed": not mismatches,
+    }
+
+
+def build_dispatch_rows(
+    count: int,
+    seed: int,
+    solver: str = "pandapower",
+    sampling: str = "latin_hypercube",
+    workers: int | None = None,
+    warm_start: bool = False,
+    instrument: bool = False,
+    store_opf: bool = False,
+) -> list[dict[str, Any]]:
+    return list(
+        iter_dispatch_rows(
+            count,
+            seed,
+            solver=solver,
+            sampling=sampling,
+            workers=workers,
+            warm_start=warm_start,
+            instrument=instrument,
+            store_opf=store_opf,
+        ),
+    )
+
+
+@dataclass(frozen=True)
+class DispatchProgress:
+    completed: int
+    total: int
+    fallbacks: int
+    elapsed_s: float
+    workers: int
+
+    @property
+    def scenarios_per_second(self) -> float:
+        return self.completed / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    @property
+    def fallback_rate(self) -> float:
+        return self.fallbacks / self.completed if self.completed else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.completed}/{self.total} scenarios, {self.scenarios_per_second:.1f} scenarios/s "
+            f"on {self.workers} worker(s), fallback rate {self.fallback_rate:.1%}"
+        )
+
+
+def default_worker_count() -> int:
+    return max(1, min(os.cpu_count() or 1, DEFAULT_MAX_WORKERS))
+
+
+def iter_dispatch_rows(
+    count: int,
+    seed: int,
+    solver: str = "pandapower",
+    sampling: str = "latin_hypercube",
+    indices: Iterable[int] | None = None,
+    workers: int | None = None,
+    progress: Callable[[DispatchProgress], None] | None = None,
+    progress_every: int = 0,
+    warm_start: bool = False,
+    instrument: bool = False,
+    store_opf: bool = False,
+) -> Iterator[dict[str, Any]]:
+    """Yield scenario rows for ``indices`` (default: all of ``range(count)``) in index order.
+
+    Rows are yielded as soon as they and every earlier row are solved so callers
+    can stream them to disk. ``progress`` is called every ``progress_every`` rows
+    (when positive) and once more after the last row. ``warm_start`` lets the
+    native backend seed each LP from its nearest solved neighbour, and
+    ``instrument`` adds per-scenario timing records to the rows. ``store_opf``
+    keeps the unrounded solver outputs in each row for ``rederive_dispatch_rows``.
+    """
+    if solver not in SOLVER_BACKENDS:
+        raise ValueError(f"Unknown dispatch solver backend: {solver}")
+    if sampling not in SAMPLING_STRATEGIES:
+        raise ValueError(f"Unknown dispatch sampling strategy: {sampling}")
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be at least 1.")
+    if warm_start and solver != "native":
+        raise ValueError("warm_start requires the native solver backend; pandapower's rundcopp always starts cold.")
+    selected = list(range(count)) if indices is None else [int(index) for index in indices]
+    if count <= 0 or not selected:
+        return
+    if sampling == "kronecker":
+        feature_rows: Any = dict(zip(selected, build_indexed_feature_rows(selected, seed), strict=True))
+    else:
+        feature_rows = build_lhs_feature_rows(count, seed)
+    yield from _iter_solved_rows(
+        [(index, feature_rows[index]) for index in selected],
+        seed,
+        solver=solver,
+        workers=workers,
+        progress=progress,
+        progress_every=progress_every,
+        warm_start=warm_start,
+        instrument=instrument,
+        store_opf=store_opf,
+    )
+
+
+def iter_feature_dispatch_rows(
+    feature_rows: Iterable[Mapping[str, float]],
+    seed: int,
+    solver: str = "pandapower",
+    context_index: int = 0,
+    workers: int | None = None,
+    progress: Callable[[DispatchProgress], None] | None = None,
+    progress_every: int = 0,
+    warm_start: bool = False,
+) -> Iterator[dict[str, Any]]:
+    """Solve caller-supplied feature rows (e.g. a sensitivity design) through the scenario pipeline.
+
+    Every row is solved as scenario ``context_index``, so renewable bus placement
+    is held fixed and the outputs depend on the features alone.
+    """
+    if solver not in SOLVER_BACKENDS:
+        raise ValueError(f"Unknown dispatch solver backend: {solver}")
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be at least 1.")
+    if warm_start and solver != "native":
+        raise ValueError("warm_start requires the native solver backend; pandapower's rundcopp always starts cold.")
+    payloads = [(context_index, {name: float(row[name]) for name in FEATURE_COLUMNS}) for row in feature_rows]
+    if not payloads:
+        return
+    yield from _iter_solved_rows(
+        payloads,
+        seed,
+        solver=solver,
+        workers=workers,
+        progress=progress,
+        progress_every=progress_every,
+        warm_start=warm_start,
+    )
+
+
+def _iter_solved_rows(
+    payloads: list[tuple[int, dict[str, float]]],
+    seed: int,
+    *,
+    solver: str,
+    workers: int | None,
+    progress: Callable[[DispatchProgress], None] | None,
+    progress_every: int,
+    warm_start: bool = False,
+    instrument: bool = False,
+    store_opf: bool = False,
+) -> Iterator[dict[str, Any]]:
+    workers = default_worker_count() if workers is None else workers
+    if solver == "native":
+        rows = _iter_native_rows(payloads, seed, warm_start, instrument, store_opf)
+        workers = 1
+    elif workers == 1 or len(payloads) < SERIAL_THRESHOLD:
+        rows = (simulate_dispatch_scenario(index, seed, feature_row, instrument, store_opf).to_row() for index, feature_row in payloads)
+        workers = 1
+    else:
+        rows = _iter_pooled_rows(payloads, seed, workers, instrument, store_opf)
+
+    started = time.perf_counter()
+    fallbacks = 0
+    for completed, row in enumerate(rows, start=1):
+        fallbacks += row["simulator_status"] == "heuristic_fallback"
+        yield row
+        if progress is not None and (completed == len(payloads) or (progress_every > 0 and completed % progress_every == 0)):
+            progress(DispatchProgress(completed, len(payloads), fallbacks, time.perf_counter() - started, workers))
+
+
+def _iter_native_rows(
+    payloads: list[tuple[int, dict[str, float]]],
+    seed: int,
+    warm_start: bool = False,
+    instrument: bool = False,
+    store_opf: bool = False,
+) -> Iterator[dict[str, Any]]:
+    for start in range(0, len(payloads), NATIVE_BATCH_SIZE):
+        batch = payloads[start : start + NATIVE_BATCH_SIZE]
+        for scenario in _native_dispatch_scenarios(batch, seed, warm_start, instrument, store_opf):
+            yield scenario.to_row()
+
+
+def _iter_pooled_rows(
+    payloads: list[tuple[int, dict[str, float]]],
+    seed: int,
+    workers: int,
+    instrument: bool = False,
+    store_opf: bool = False,
+) -> Iterator[dict[str, Any]]:
+    yielded = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_dispatch_worker) as executor:
+            for row in _schedule_dispatch_tasks(executor, payloads, seed, workers, instrument, store_opf):
+                yield row
+                yielded += 1
     except (PermissionError, RuntimeError, OSError):
+        # Sandboxes without process support: finish the remaining rows on threads.
         with ThreadPoolExecutor(max_workers=min(workers, 4)) as executor:
-            return list(executor.map(_simulate_dispatch_row, payloads))
+            yield from _schedule_dispatch_tasks(executor, payloads[yielded:], seed, min(workers, 4), instrument, store_opf)
+
+
+def _schedule_dispatch_tasks(
+    executor: Executor,
+    payloads: list[tuple[int, dict[str, float]]],
+    seed: int,
+    workers: int,
+    instrument: bool = False,
+    store_opf: bool = False,
+) -> Iterator[dict[str, Any]]:
+    """Run small tasks as workers free up and reassemble their rows in submission order.
+
+    At most ``workers * 8`` tasks are in flight or waiting to be yielded, so a slow
+    task near the front bounds memory instead of letting finished rows pile up.
+    """
+    tasks = [payloads[start : start + WORKER_TASK_SIZE] for start in range(0, len(payloads), WORKER_TASK_SIZE)]
+    window = workers * 8
+    running: dict[Any, int] = {}
+    finished: dict[int, list[dict[str, Any]]] = {}
+    submitted = 0
+    next_task = 0
+    while next_task < len(tasks):
+        while submitted < len(tasks) and submitted - next_task < window:
+            running[executor.submit(_simulate_dispatch_task, seed, tasks[submitted], instrument, store_opf)] = submitted
+            submitted += 1
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            finished[running.pop(future)] = future.result()
+        while next_task in finished:
+            yield from finished.pop(next_task)
+            next_task += 1
+
+
+def _simulate_dispatch_task(
+    seed: int,
+    task: list[tuple[int, dict[str, float]]],
+    instrument: bool = False,
+    store_opf: bool = False,
+) -> list[dict[str, Any]]:
+    return [simulate_dispatch_scenario(index, seed, feature_row, instrument, store_opf).to_row() for index, feature_row in task]
+
+
+REDERIVE_CHUNK_ROWS = 65536
 
 
-def _simulate_dispatch_row(args: tuple[int, int, dict[str, float]]) -> dict[str, Any]:
-    index, seed, feature_row = args
-    return simulate_dispatch_scenario(index, seed, feature_row).to_row()
+def rederive_dispatch_rows(
+    rows: Iterable[dict[str, Any]],
+    coefficients: PhysicsCoefficients = DEFAULT_PHYSICS,
+) -> Iterator[dict[str, Any]]:
+    """Recompute physics columns for rows generated with ``store_opf`` without re-running the OPF.
+
+    Rows are processed in chunks through ``derive_physics_columns``; with the
+    default coefficients the output matches the original rows byte-for-byte.
+    """
+    chunk: list[dict[str, Any]] = []
+    for row in rows:
+        if "opf" not in row:
+            raise ValueError(f"Scenario {row.get('index')} has no stored OPF outputs; regenerate with --store-opf.")
+        chunk.append(row)
+        if len(chunk) >= REDERIVE_CHUNK_ROWS:
+            yield from _rederive_chunk(chunk, coefficients)
+            chunk = []
+    if chunk:
+        yield from _rederive_chunk(chunk, coefficients)
+
+
+def _rederive_chunk(rows: list[dict[str, Any]], coefficients: PhysicsCoefficients) -> Iterator[dict[str, Any]]:
+    features = np.asarray([row["opf"]["features"] for row in rows], dtype=np.float64).reshape(len(rows), len(FEATURE_COLUMNS))
+    derived_columns = derive_physics_columns(
+        index=np.asarray([row["index"] for row in rows], dtype=np.int64),
+        seed=np.asarray([row["seed"] for row in rows], dtype=np.int64),
+        temperature_c=features[:, FEATURE_COLUMNS.index("temperature_c")],
+        reserve_margin_percent=features[:, FEATURE_COLUMNS.index("reserve_margin_percent")],
+        ramp_limit_feature=features[:, FEATURE_COLUMNS.index("ramp_limit_mw_per_hour")],
+        previous_dispatch_feature=features[:, FEATURE_COLUMNS.index("previous_dispatch_mw")],
+        target_dispatch_mw=np.asarray([row["opf"]["target_dispatch_mw"] for row in rows], dtype=np.float64),
+        actual_wind_mw=np.asarray([row["opf"]["actual_wind_mw"] for row in rows], dtype=np.float64),
+        actual_solar_mw=np.asarray([row["opf"]["actual_solar_mw"] for row in rows], dtype=np.float64),
+        fallback=np.asarray([row["simulator_status"] == "heuristic_fallback" for row in rows], dtype=bool),
+        coefficients=coefficients,
+    )
+    derived_lists = {name: column.tolist() for name, column in derived_columns.items()}
+    for position, row in enumerate(rows):
+        opf = row["opf"]
+        yield _finalize_scenario(
+            int(row["index"]),
+            int(row["seed"]),
+            dict(zip(FEATURE_COLUMNS, opf["features"])),
+            target_dispatch_mw=opf["target_dispatch_mw"],
+            simulate_status=row["simulator_status"],
+            available_generation_mw=opf["available_generation_mw"],
+            actual_wind_mw=opf["actual_wind_mw"],
+            actual_solar_mw=opf["actual_solar_mw"],
+            wind_bus=row["wind_bus"],
+            solar_bus=row["solar_bus"],
+            store_opf=True,
+            derived={name: values[position] for name, values in derived_lists.items()},
+        ).to_row()
+
+
+INSTRUMENTATION_TIMINGS = ("prep_s", "solve_s")
+# Histogram edges in seconds; the last bucket is open-ended.
+INSTRUMENTATION_BUCKETS_S = (0.0, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def summarize_instrumentation(rows: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """Aggregate instrumented rows into percentiles, histograms and fallback/worker counts."""
+    timings: dict[str, list[float]] = {name: [] for name in (*INSTRUMENTATION_TIMINGS, "total_s")}
+    statuses: dict[str, int] = {}
+    fallback_reasons: dict[str, int] = {}
+    workers: dict[str, int] = {}
+    solvers: dict[str, int] = {}
+    for row in rows:
+        record = row.get("instrumentation")
+        if record is None:
+            continue
+        for name in INSTRUMENTATION_TIMINGS:
+            timings[name].append(float(record[name]))
+        timings["total_s"].append(float(record["prep_s"]) + float(record["solve_s"]))
+        statuses[row["simulator_status"]] = statuses.get(row["simulator_status"], 0) + 1
+        if record.get("fallback_reason"):
+            fallback_reasons[record["fallback_reason"]] = fallback_reasons.get(record["fallback_reason"], 0) + 1
+        workers[str(record["pid"])] = workers.get(str(record["pid"]), 0) + 1
+        solvers[record["solver"]] = solvers.get(record["solver"], 0) + 1
+
+    edges = np.asarray([*INSTRUMENTATION_BUCKETS_S, np.inf])
+    summary: dict[str, Any] = {
+        "scenario_count": len(timings["total_s"]),
+        "solvers": solvers,
+        "statuses": statuses,
+        "fallback_reasons": fallback_reasons,
+        "scenarios_per_worker_pid": workers,
+        "timings": {},
+    }
+    for name, values in timings.items():
+        if not values:
+            continue
+        data = np.asarray(values, dtype=np.float64)
+        p50, p90, p99 = np.percentile(data, [50, 90, 99])
+        counts, _ = np.histogram(data, bins=edges)
+        summary["timings"][name] = {
+            "mean": round(float(data.mean()), 6),
+            "p50": round(float(p50), 6),
+            "p90": round(float(p90), 6),
+            "p99": round(float(p99), 6),
+            "max": round(float(data.max()), 6),
+            "sum": round(float(data.sum()), 6),
+            "histogram": [
+                {"le": None if not np.isfinite(edge) else float(edge), "count": int(count)}
+                for edge, count in zip(edges[1:], counts)
+            ],
+        }
+    return summary
@@ -0,0 +1,71 @@
+"""Cross-check the native DC-OPF backend against pandapower over many seeds.
+
+Each seed draws its own LHS design, so a sweep over a few hundred seeds covers
+far more of the feature space than the single-seed ``--parity-sample`` gate in
+``generate_scenarios.py``. Nothing is written to the scenario cache.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+if __package__ is None or __package__ == "":
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from training.common.weight_export import DEFAULT_SEED, write_json
+from training.dispatch_pinn.simulator import PARITY_TOLERANCE_MW, compare_solver_backends
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check native solver parity against pandapower on many seeds.")
+    parser.add_argument("--seeds", type=int, default=200, help="Number of consecutive seeds to check. Default: 200.")
+    parser.add_argument("--first-seed", type=int, default=DEFAULT_SEED, help="First seed of the sweep. Default: 42.")
+    parser.add_argument("--count", type=int, default=4, help="Scenarios solved per seed. Default: 4.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=PARITY_TOLERANCE_MW,
+        help=f"Largest accepted absolute difference for float fields. Default: {PARITY_TOLERANCE_MW}.",
+    )
+    parser.add_argument("--warm-start", action="store_true", help="Solve the native LPs with warm starts.")
+    parser.add_argument("--out-report", default=None, help="Optional path to write the per-seed parity report JSON.")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = []
+    for seed in range(args.first_seed, args.first_seed + args.seeds):
+        parity = compare_solver_backends(args.count, seed, tolerance=args.tolerance, warm_start=args.warm_start)
+        results.append(parity)
+        if not parity["passed"]:
+            print(f"[parity] seed {seed}: {len(parity['mismatches'])} mismatches (first: {parity['mismatches'][0]})", file=sys.stderr)
+    elapsed = time.perf_counter() - started
+    failed = [parity["seed"] for parity in results if not parity["passed"]]
+    max_abs_diff = max((parity["max_abs_diff"] for parity in results), default=0.0)
+    print(
+        f"[parity] {len(results) - len(failed)}/{len(results)} seeds passed, "
+        f"{len(results) * args.count} scenarios, max abs diff {max_abs_diff:g} in {elapsed:.1f}s",
+        file=sys.stderr,
+    )
+
+    if args.out_report:
+        write_json(
+            Path(args.out_report),
+            {
+                "first_seed": args.first_seed,
+                "seeds": args.seeds,
+                "scenarios_per_seed": args.count,
+                "tolerance_mw": args.tolerance,
+                "warm_start": args.warm_start,
+                "max_abs_diff": max_abs_diff,
+                "failed_seeds": failed,
+                "results": results,
+            },
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any
+
+if __package__ is None or __package__ == "":
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import numpy as np
+import torch
+
+from training.common.weight_export import DEFAULT_SEED, write_json
+from training.dispatch_pinn.simulator import FEATURE_COLUMNS, default_worker_count, load_dispatch_columns
+from training.dispatch_pinn.train import (
+    DispatchTrainingData,
+    PenaltyWeights,
+    build_model,
+    evaluate_split,
+    fit_dispatch_model,
+    prepare_training_data,
+    set_determinism,
+    split_tensors,
+    with_statistics,
+    write_training_outputs,
+)
+
+SHARED_ARRAYS = (
+    "features",
+    "targets",
+    "upper_bounds",
+    "lower_bounds",
+    "previous",
+    "ramp_limits",
+    "sample_weights",
+    "train_idx",
+    "val_idx",
+    "test_idx",
+)
+SELECTION_METRICS = ("validation_loss", "physics_violation_rate")
+
+_WORKER_DATA: DispatchTrainingData | None = None
+_WORKER_SEGMENTS: list[shared_memory.SharedMemory] = []
+
+
+@dataclass(frozen=True)
+class TrialConfig:
+    trial: int
+    hidden_dim: int
+    learning_rate: float
+    batch_size: int
+    capacity_penalty: float
+    reserve_penalty: float
+    ramp_penalty: float
+
+    @property
+    def penalties(self) -> PenaltyWeights:
+        return PenaltyWeights(capacity=self.capacity_penalty, reserve=self.reserve_penalty, ramp=self.ramp_penalty)
+
+
+def build_trials(args: argparse.Namespace) -> list[TrialConfig]:
+    grid = list(
+        itertools.product(
+            args.hidden_dims,
+            args.learning_rates,
+            args.batch_sizes,
+            args.capacity_penalties,
+            args.reserve_penalties,
+            args.ramp_penalties,
+        ),
+    )
+    if args.search == "random" and args.trials < len(grid):
+        rng = np.random.default_rng(args.seed)
+        grid = [grid[position] for position in sorted(rng.choice(len(grid), size=args.trials, replace=False))]
+    return [
+        TrialConfig(
+            trial=trial,
+            hidden_dim=int(hidden_dim),
+            learning_rate=float(learning_rate),
+            batch_size=int(batch_size),
+            capacity_penalty=float(capacity),
+            reserve_penalty=float(reserve),
+            ramp_penalty=float(ramp),
+        )
+        for trial, (hidden_dim, learning_rate, batch_size, capacity, reserve, ramp) in enumerate(grid)
+    ]
+
+
+def _share_arrays(data: DispatchTrainingData) -> tuple[list[shared_memory.SharedMemory], dict[str, tuple[str, tuple[int, ...], str]]]:
+    """Copy the training arrays into shared memory once; workers map them without copying."""
+    segments = []
+    layout = {}
+    for name in SHARED_ARRAYS:
+        values = np.ascontiguousarray(getattr(data, name))
+        segment = shared_memory.SharedMemory(create=True, size=max(1, values.nbytes))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=segment.buf)[...] = values
+        segments.append(segment)
+        layout[name] = (segment.name, values.shape, values.dtype.str)
+    return segments, layout
+
+
+def _attach_arrays(layout: dict[str, tuple[str, tuple[int, ...], str]]) -> DispatchTrainingData:
+    arrays = {}
+    for name, (segment_name, shape, dtype) in layout.items():
+        # Pool workers share the parent's resource tracker, so the parent's unlink covers these handles.
+        segment = shared_memory.SharedMemory(name=segment_name)
+        _WORKER_SEGMENTS.append(segment)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+    return with_statistics(**arrays)
+
+
+def _init_sweep_worker(layout: dict[str, tuple[str, tuple[int, ...], str]], seed: int) -> None:
+    global _WORKER_DATA
+    torch.set_num_threads(1)
+    set_determinism(seed)
+    _WORKER_DATA = _attach_arrays(layout)
+
+
+def _run_trial(config: TrialConfig, seed: int, epochs: int, data: DispatchTrainingData | None = None) -> dict[str, Any]:
+    data = data if data is not None else _WORKER_DATA
+    if data is None:
+        raise RuntimeError("Sweep worker was not initialized with training data.")
+    started = time.perf_counter()
+    model, tensors = fit_dispatch_model(
+        data,
+        seed=seed,
+        epochs=epochs,
+        hidden_dim=config.hidden_dim,
+        learning_rate=config.learning_rate,
+        batch_size=config.batch_size,
+        penalties=config.penalties,
+    )
+    validation = evaluate_split(model, data, tensors["val"], config.penalties)
+    return {
+        **asdict(config),
+        **{f"val_{key}" if key != "validation_loss" else key: value for key, value in validation.items()},
+        "train_seconds": round(time.perf_counter() - started, 3),
+        "pid": os.getpid(),
+        "state": {key: value.detach().cpu().numpy() for key, value in model.state_dict().items()},
+    }
+
+
+def _selection_key(result: dict[str, Any], select_by: str) -> tuple[float, float, int]:
+    loss = float(result["validation_loss"])
+    violations = float(result["val_physics_violation_rate"])
+    primary, secondary = (loss, violations) if select_by == "validation_loss" else (violations, loss)
+    return primary, secondary, int(result["trial"])
+
+
+def run_sweep(
+    data: DispatchTrainingData,
+    trials: list[TrialConfig],
+    *,
+    seed: int,
+    epochs: int,
+    workers: int,
+) -> list[dict[str, Any]]:
+    """Train every trial, in parallel across processes when ``workers`` > 1."""
+    if workers <= 1 or len(trials) <= 1:
+        return [_run_trial(config, seed, epochs, data) for config in trials]
+    segments, layout = _share_arrays(data)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_sweep_worker, initargs=(layout, seed)) as executor:
+            futures = [executor.submit(_run_trial, config, seed, epochs) for config in trials]
+            results = []
+            for future in futures:
+                result = future.result()
+                print(
+                    f"[sweep] trial {result['trial']}: validation_loss={result['validation_loss']:.6f} "
+                    f"physics_violation_rate={result['val_physics_violation_rate']:.6f} ({result['train_seconds']:.1f}s)",
+                    file=sys.stderr,
+                    flush=True,
+                )
+                results.append(result)
+            return results
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Grid or random hyperparameter sweep for the dispatch PINN.")
+    parser.add_argument("--input", required=True, help="Scenario JSONL generated by generate_scenarios.py.")
+    parser.add_argument("--out-results", required=True, help="Path to write the per-trial results table JSON.")
+    parser.add_argument("--out-weights", required=True, help="Path to write the winning dispatch-pinn-v2.json.")
+    parser.add_argument("--out-metrics", required=True, help="Path to write the winning trial's metrics JSON.")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Deterministic seed shared by every trial. Default: 42.")
+    parser.add_argument("--epochs", type=int, default=300, help="Training epochs per trial.")
+    parser.add_argument("--hidden-dims", type=int, nargs="+", default=[32], help="Hidden layer widths to try.")
+    parser.add_argument("--learning-rates", type=float, nargs="+", default=[0.008], help="Adam learning rates to try.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[0], help="Batch sizes to try; 0 is full-batch.")
+    parser.add_argument("--capacity-penalties", type=float, nargs="+", default=[0.25], help="Capacity penalty weights to try.")
+    parser.add_argument("--reserve-penalties", type=float, nargs="+", default=[0.2], help="Reserve penalty weights to try.")
+    parser.add_argument("--ramp-penalties", type=float, nargs="+", default=[0.55], help="Ramp penalty weights to try.")
+    parser.add_argument("--search", choices=("grid", "random"), default="grid", help="Try every combination or a seeded random subset.")
+    parser.add_argument("--trials", type=int, default=16, help="Combinations to sample for --search random. Default: 16.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=default_worker_count(),
+        help=f"Parallel trial processes, each limited to one torch thread. Default: min(cpu count, 8) = {default_worker_count()}.",
+    )
+    parser.add_argument("--select-by", choices=SELECTION_METRICS, default="validation_loss", help="Metric that picks the winner; the other breaks ties.")
+    args = parser.parse_args()
+
+    columns = load_dispatch_columns(Path(args.input))
+    if len(columns["index"]) == 0:
+        raise SystemExit("No scenario rows found. Run generate_scenarios.py first.")
+    trials = build_trials(args)
+    if not trials:
+        raise SystemExit("The search space is empty.")
+
+    set_determinism(args.seed)
+    data = prepare_training_data(columns, args.seed)
+    results = run_sweep(data, trials, seed=args.seed, epochs=args.epochs, workers=args.workers)
+    winner = min(results, key=lambda result: _selection_key(result, args.select_by))
+    config = trials[winner["trial"]]
+
+    model = build_model(input_dim=len(FEATURE_COLUMNS), hidden_dim=config.hidden_dim)
+    model.load_state_dict({key: torch.from_numpy(value) for key, value in winner["state"].items()})
+    model.eval()
+    metrics = evaluate_split(model, data, split_tensors(data)["test"], config.penalties)
+    write_training_outputs(
+        model,
+        data,
+        metrics,
+        seed=args.seed,
+        out_weights=Path(args.out_weights),
+        out_metrics=Path(args.out_metrics),
+        extra_metrics={"sweep": {"trial": config.trial, "trial_count": len(trials), "select_by": args.select_by, **asdict(config)}},
+    )
+    write_json(
+        Path(args.out_results),
+        {
+            "seed": args.seed,
+            "epochs": args.epochs,
+            "search": args.search,
+            "select_by": args.select_by,
+            "winner": config.trial,
+            "trials": [{key: value for key, value in result.items() if key != "state"} for result in results],
+        },
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
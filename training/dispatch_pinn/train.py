@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 import argparse
-import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, Mapping
 
 if __package__ is None or __package__ == "":
-    import sys
-
     sys.path.append(str(Path(__file__).resolve().parents[2]))
 
 import numpy as np
@@ -15,16 +17,60 @@ import torch
 from torch import nn
 
 from training.common.weight_export import DEFAULT_SEED, build_manifest, compute_artifact_sha, write_json
-from training.dispatch_pinn.simulator import FEATURE_COLUMNS, MODEL_KEY, MODEL_VERSION, SIMULATOR_VERSION
+from training.dispatch_pinn.simulator import FEATURE_COLUMNS, MODEL_KEY, MODEL_VERSION, SIMULATOR_VERSION, load_dispatch_columns
+
+
+@dataclass(frozen=True)
+class PenaltyWeights:
+    """Physics penalty multipliers applied on top of the weighted MSE."""
+
+    capacity: float = 0.25
+    reserve: float = 0.2
+    ramp: float = 0.55
+
+
+DEFAULT_PENALTIES = PenaltyWeights()
+DEFAULT_PATIENCE = 8
+CHECKPOINT_FILE = "checkpoint-latest.pt"
+
+
+@dataclass(frozen=True)
+class DispatchTrainingData:
+    """Raw training arrays plus the split and normalization statistics derived from them."""
+
+    features: np.ndarray
+    targets: np.ndarray
+    upper_bounds: np.ndarray
+    lower_bounds: np.ndarray
+    previous: np.ndarray
+    ramp_limits: np.ndarray
+    sample_weights: np.ndarray
+    train_idx: np.ndarray
+    val_idx: np.ndarray
+    test_idx: np.ndarray
+    feature_means: np.ndarray
+    feature_stds: np.ndarray
+    target_mean: float
+    target_std: float
+
+    @property
+    def row_count(self) -> int:
+        return len(self.targets)
 
 
-def load_rows(path: Path) -> list[dict[str, object]]:
-    if not path.exists():
-        return []
-    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+@dataclass(frozen=True)
+class SplitTensors:
+    x: torch.Tensor
+    y: torch.Tensor
+    raw_y: torch.Tensor
+    upper: torch.Tensor
+    lower: torch.Tensor
+    previous: torch.Tensor
+    ramp: torch.Tensor
+    sample_weights: torch.Tensor
 
 
-def _set_determinism(seed: int) -> None:
+def set_determinism(seed: int) -> None:
     np.random.seed(seed)
     torch.manual_seed(seed)
     try:
@@ -33,7 +79,7 @@ def _set_determinism(seed: int) -> None:
         pass
 
 
-def _build_model(input_dim: int, hidden_dim: int) -> nn.Module:
+def build_model(input_dim: int, hidden_dim: int) -> nn.Module:
     return nn.Sequential(
         nn.Linear(input_dim, hidden_dim),
         nn.ReLU(),
@@ -50,14 +96,27 @@ def _split_indices(size: int, seed: int, train_ratio: float = 0.8, val_ratio: fl
     return indices[:train_end], indices[train_end:val_end], indices[val_end:]
 
 
-def _prepare_arrays(rows: list[dict[str, object]]) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
-    features = np.array([[float(row[column]) for column in FEATURE_COLUMNS] for row in rows], dtype=np.float32)
-    targets = np.array([float(row["target_dispatch_mw"]) for row in rows], dtype=np.float32).reshape(-1, 1)
-    upper_bounds = np.array([float(row["physics_upper_bound_mw"]) for row in rows], dtype=np.float32).reshape(-1, 1)
-    lower_bounds = np.array([float(row["physics_lower_bound_mw"]) for row in rows], dtype=np.float32).reshape(-1, 1)
-    previous = np.array([float(row["previous_dispatch_mw"]) for row in rows], dtype=np.float32).reshape(-1, 1)
-    ramp_limits = np.array([float(row["ramp_limit_mw_per_hour"]) for row in rows], dtype=np.float32).reshape(-1, 1)
-    sample_weights = np.array([float(row.get("sample_weight", 1.0)) for row in rows], dtype=np.float32).reshape(-1, 1)
+TRAINING_COLUMNS = (
+    *FEATURE_COLUMNS,
+    "target_dispatch_mw",
+    "physics_upper_bound_mw",
+    "physics_lower_bound_mw",
+    "previous_dispatch_mw",
+    "ramp_limit_mw_per_hour",
+    "sample_weight",
+)
+
+
+def prepare_arrays(columns: Mapping[str, np.ndarray]) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Cast every training column into one float32 block and return views of it."""
+    block = np.empty((len(columns["target_dispatch_mw"]), len(TRAINING_COLUMNS)), dtype=np.float32)
+    for position, name in enumerate(TRAINING_COLUMNS):
+        block[:, position] = columns[name]
+    width = len(FEATURE_COLUMNS)
+    features = block[:, :width]
+    targets, upper_bounds, lower_bounds, previous, ramp_limits, sample_weights = (
+        block[:, position : position + 1] for position in range(width, len(TRAINING_COLUMNS))
+    )
     return features, targets, upper_bounds, lower_bounds, previous, ramp_limits, sample_weights
 
 
@@ -71,13 +130,19 @@ def _weighted_loss(
     previous: torch.Tensor,
     ramp_limits: torch.Tensor,
     sample_weights: torch.Tensor,
+    penalties: PenaltyWeights = DEFAULT_PENALTIES,
 ) -> torch.Tensor:
     scaled_predictions = predictions * target_std + target_mean
     mse = ((predictions - targets) ** 2) * sample_weights
     capacity_penalty = torch.relu(scaled_predictions - upper_bounds)
     reserve_penalty = torch.relu(lower_bounds - scaled_predictions)
     ramp_penalty = torch.relu(torch.abs(scaled_predictions - previous) - ramp_limits)
-    return mse.mean() + 0.25 * capacity_penalty.mean() + 0.2 * reserve_penalty.mean() + 0.55 * ramp_penalty.mean()
+    return (
+        mse.mean()
+        + penalties.capacity * capacity_penalty.mean()
+        + penalties.reserve * reserve_penalty.mean()
+        + penalties.ramp * ramp_penalty.mean()
+    )
 
 
 def _evaluate(
@@ -90,6 +155,7 @@ def _evaluate(
     ramp_limits: torch.Tensor,
     target_mean: torch.Tensor,
     target_std: torch.Tensor,
+    penalties: PenaltyWeights = DEFAULT_PENALTIES,
 ) -> dict[str, float]:
     with torch.no_grad():
         predictions = model(x) * target_std + target_mean
@@ -109,6 +175,7 @@ def _evaluate(
             previous,
             ramp_limits,
             torch.ones_like(targets),
+            penalties,
         ).item()
     return {
         "mape": round(float(mape), 6),
@@ -126,7 +193,7 @@ def _round_vector(vector: np.ndarray) -> list[float]:
     return [round(float(value), 6) for value in vector.tolist()]
 
 
-def _export_weights(
+def export_weights(
     model: nn.Module,
     feature_means: np.ndarray,
     feature_stds: np.ndarray,
@@ -171,25 +238,35 @@ def _export_weights(
     return artifact
 
 
-def main() -> int:
-    parser = argparse.ArgumentParser(description="Train pandapower-calibrated dispatch weights.")
-    parser.add_argument("--input", required=True, help="Scenario JSONL generated by generate_scenarios.py.")
-    parser.add_argument("--out-weights", required=True, help="Path to write dispatch-pinn-v2.json.")
-    parser.add_argument("--out-metrics", required=True, help="Path to write metrics JSON.")
-    parser.add_argument("--count", type=int, default=5000, help="Scenario count used for the manifest.")
-    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Deterministic seed. Default: 42.")
-    parser.add_argument("--epochs", type=int, default=300, help="Training epochs.")
-    parser.add_argument("--hidden-dim", type=int, default=32, help="Hidden layer width.")
-    parser.add_argument("--learning-rate", type=float, default=0.008, help="Adam learning rate.")
-    args = parser.parse_args()
+def prepare_training_data(columns: Mapping[str, np.ndarray], seed: int) -> DispatchTrainingData:
+    features, targets, upper_bounds, lower_bounds, previous, ramp_limits, sample_weights = prepare_arrays(columns)
+    train_idx, val_idx, test_idx = _split_indices(len(targets), seed)
+    return with_statistics(
+        features,
+        targets,
+        upper_bounds,
+        lower_bounds,
+        previous,
+        ramp_limits,
+        sample_weights,
+        train_idx,
+        val_idx,
+        test_idx,
+    )
 
-    rows = load_rows(Path(args.input))
-    if not rows:
-        raise SystemExit("No scenario rows found. Run generate_scenarios.py first.")
 
-    _set_determinism(args.seed)
-    features, targets, upper_bounds, lower_bounds, previous, ramp_limits, sample_weights = _prepare_arrays(rows)
-    train_idx, val_idx, test_idx = _split_indices(len(rows), args.seed)
+def with_statistics(
+    features: np.ndarray,
+    targets: np.ndarray,
+    upper_bounds: np.ndarray,
+    lower_bounds: np.ndarray,
+    previous: np.ndarray,
+    ramp_limits: np.ndarray,
+    sample_weights: np.ndarray,
+    train_idx: np.ndarray,
+    val_idx: np.ndarray,
+    test_idx: np.ndarray,
+) -> DispatchTrainingData:
     target_mean = float(targets[train_idx].mean())
     target_std = float(targets[train_idx].std())
     if not np.isfinite(target_std) or target_std == 0:
@@ -198,121 +275,345 @@ def main() -> int:
     feature_means = features[train_idx].mean(axis=0)
     feature_stds = features[train_idx].std(axis=0)
     feature_stds[feature_stds == 0] = 1.0
+    return DispatchTrainingData(
+        features=features,
+        targets=targets,
+        upper_bounds=upper_bounds,
+        lower_bounds=lower_bounds,
+        previous=previous,
+        ramp_limits=ramp_limits,
+        sample_weights=sample_weights,
+        train_idx=train_idx,
+        val_idx=val_idx,
+        test_idx=test_idx,
+        feature_means=feature_means,
+        feature_stds=feature_stds,
+        target_mean=target_mean,
+        target_std=target_std,
+    )
+
 
-    x_all = torch.tensor((features - feature_means) / feature_stds, dtype=torch.float32)
-    y_all = torch.tensor((targets - target_mean) / target_std, dtype=torch.float32)
-    raw_targets_all = torch.tensor(targets, dtype=torch.float32)
-    upper_all = torch.tensor(upper_bounds, dtype=torch.float32)
-    lower_all = torch.tensor(lower_bounds, dtype=torch.float32)
-    previous_all = torch.tensor(previous, dtype=torch.float32)
-    ramp_all = torch.tensor(ramp_limits, dtype=torch.float32)
-    sample_weights_all = torch.tensor(sample_weights, dtype=torch.float32)
-
-    x_train = x_all[train_idx]
-    y_train = y_all[train_idx]
-    raw_y_train = raw_targets_all[train_idx]
-    upper_train = upper_all[train_idx]
-    lower_train = lower_all[train_idx]
-    previous_train = previous_all[train_idx]
-    ramp_train = ramp_all[train_idx]
-    sample_weights_train = sample_weights_all[train_idx]
-
-    x_val = x_all[val_idx]
-    y_val = y_all[val_idx]
-    raw_y_val = raw_targets_all[val_idx]
-    upper_val = upper_all[val_idx]
-    lower_val = lower_all[val_idx]
-    previous_val = previous_all[val_idx]
-    ramp_val = ramp_all[val_idx]
-
-    x_test = x_all[test_idx]
-    y_test = y_all[test_idx]
-    raw_y_test = raw_targets_all[test_idx]
-    upper_test = upper_all[test_idx]
-    lower_test = lower_all[test_idx]
-    previous_test = previous_all[test_idx]
-    ramp_test = ramp_all[test_idx]
-
-    model = _build_model(input_dim=len(FEATURE_COLUMNS), hidden_dim=args.hidden_dim)
-    optimizer = torch.optim.Adam(model.parameters(), lr=args.learning_rate)
+def split_tensors(data: DispatchTrainingData) -> dict[str, SplitTensors]:
+    x_all = torch.tensor((data.features - data.feature_means) / data.feature_stds, dtype=torch.float32)
+    y_all = torch.tensor((data.targets - data.target_mean) / data.target_std, dtype=torch.float32)
+    raw_targets_all = torch.tensor(data.targets, dtype=torch.float32)
+    upper_all = torch.tensor(data.upper_bounds, dtype=torch.float32)
+    lower_all = torch.tensor(data.lower_bounds, dtype=torch.float32)
+    previous_all = torch.tensor(data.previous, dtype=torch.float32)
+    ramp_all = torch.tensor(data.ramp_limits, dtype=torch.float32)
+    sample_weights_all = torch.tensor(data.sample_weights, dtype=torch.float32)
+    return {
+        split: SplitTensors(
+            x=x_all[indices],
+            y=y_all[indices],
+            raw_y=raw_targets_all[indices],
+            upper=upper_all[indices],
+            lower=lower_all[indices],
+            previous=previous_all[indices],
+            ramp=ramp_all[indices],
+            sample_weights=sample_weights_all[indices],
+        )
+        for split, indices in (("train", data.train_idx), ("val", data.val_idx), ("test", data.test_idx))
+    }
+
+
+def fit_dispatch_model(
+    data: DispatchTrainingData,
+    *,
+    seed: int,
+    epochs: int,
+    hidden_dim: int,
+    learning_rate: float,
+    batch_size: int = 0,
+    penalties: PenaltyWeights = DEFAULT_PENALTIES,
+    log_every: int = 0,
+    patience: int = DEFAULT_PATIENCE,
+    violation_weight: float = 0.0,
+    checkpoint_dir: Path | None = None,
+    checkpoint_every: int = 0,
+    resume: bool = False,
+) -> tuple[nn.Module, dict[str, SplitTensors]]:
+    """Train the dispatch MLP and return it with the best early-stopping weights loaded.
+
+    Early stopping tracks validation loss plus ``violation_weight`` times the
+    validation physics violation rate. With ``checkpoint_dir`` set, the model,
+    optimizer, RNG and early-stopping state are saved every ``checkpoint_every``
+    epochs, and ``resume`` continues from the latest checkpoint bit-for-bit.
+    """
+    tensors = split_tensors(data)
+    train, val = tensors["train"], tensors["val"]
+    torch.manual_seed(seed)
+    model = build_model(input_dim=len(FEATURE_COLUMNS), hidden_dim=hidden_dim)
+    optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate)
+    target_mean_t = torch.tensor(data.target_mean, dtype=torch.float32)
+    target_std_t = torch.tensor(data.target_std, dtype=torch.float32)
+    val_weights = torch.ones_like(val.y)
+    train_tensors = (train.x, train.y, train.upper, train.lower, train.previous, train.ramp, train.sample_weights)
+    train_size = len(data.train_idx)
+    batch_size = batch_size if 0 < batch_size < train_size else 0
+    # A dedicated generator keeps shuffling off the global RNG, so model initialization is unchanged.
+    shuffle_generator = torch.Generator().manual_seed(seed)
 
     best_state = None
     best_val_loss = float("inf")
-    patience = 8
     stale_epochs = 0
-
-    for _ in range(args.epochs):
+    start_epoch = 0
+    fingerprint = {
+        "seed": seed,
+        "hidden_dim": hidden_dim,
+        "learning_rate": learning_rate,
+        "batch_size": batch_size,
+        "penalties": asdict(penalties),
+        "patience": patience,
+        "violation_weight": violation_weight,
+        "train_size": train_size,
+    }
+    checkpoint_path = checkpoint_dir / CHECKPOINT_FILE if checkpoint_dir is not None else None
+    if resume and checkpoint_path is not None and checkpoint_path.exists():
+        checkpoint = torch.load(checkpoint_path, weights_only=True)
+        if checkpoint["fingerprint"] != fingerprint:
+            raise SystemExit(f"Cannot resume from {checkpoint_path}: it was written with {checkpoint['fingerprint']}, not {fingerprint}.")
+        model.load_state_dict(checkpoint["model"])
+        optimizer.load_state_dict(checkpoint["optimizer"])
+        torch.set_rng_state(checkpoint["torch_rng"])
+        shuffle_generator.set_state(checkpoint["shuffle_rng"])
+        best_state = checkpoint["best_state"]
+        best_val_loss = float(checkpoint["best_score"])
+        stale_epochs = int(checkpoint["stale_epochs"])
+        start_epoch = epochs if checkpoint["stopped"] else int(checkpoint["epoch"])
+
+    for epoch in range(start_epoch, epochs):
+        epoch_started = time.perf_counter()
         model.train()
-        optimizer.zero_grad()
-        predictions = model(x_train)
-        loss = _weighted_loss(
-            predictions,
-            y_train,
-            torch.tensor(target_mean, dtype=torch.float32),
-            torch.tensor(target_std, dtype=torch.float32),
-            upper_train,
-            lower_train,
-            previous_train,
-            ramp_train,
-            sample_weights_train,
-        )
-        loss.backward()
-        optimizer.step()
+        if batch_size:
+            order = torch.randperm(train_size, generator=shuffle_generator)
+            batches = [order[start : start + batch_size] for start in range(0, train_size, batch_size)]
+        else:
+            batches = [None]
+        for batch in batches:
+            x_batch, y_batch, upper_batch, lower_batch, previous_batch, ramp_batch, weights_batch = (
+                train_tensors if batch is None else tuple(tensor[batch] for tensor in train_tensors)
+            )
+            optimizer.zero_grad()
+            loss = _weighted_loss(
+                model(x_batch),
+                y_batch,
+                target_mean_t,
+                target_std_t,
+                upper_batch,
+                lower_batch,
+                previous_batch,
+                ramp_batch,
+                weights_batch,
+                penalties,
+            )
+            loss.backward()
+            optimizer.step()
 
         model.eval()
-        val_loss = _weighted_loss(
-            model(x_val),
-            y_val,
-            torch.tensor(target_mean, dtype=torch.float32),
-            torch.tensor(target_std, dtype=torch.float32),
-            upper_val,
-            lower_val,
-            previous_val,
-            ramp_val,
-            torch.ones_like(y_val),
-        ).item()
-        if val_loss + 1e-7 < best_val_loss:
-            best_val_loss = val_loss
+        with torch.no_grad():
+            val_predictions = model(val.x)
+            val_loss = _weighted_loss(
+                val_predictions,
+                val.y,
+                target_mean_t,
+                target_std_t,
+                val.upper,
+                val.lower,
+                val.previous,
+                val.ramp,
+                val_weights,
+                penalties,
+            ).item()
+            score = val_loss
+            if violation_weight:
+                scaled = val_predictions * target_std_t + target_mean_t
+                violation_rate = torch.mean(
+                    ((scaled > val.upper) | (scaled < val.lower) | (torch.abs(scaled - val.previous) > val.ramp)).float(),
+                ).item()
+                score = val_loss + violation_weight * violation_rate
+        if log_every > 0 and (epoch + 1) % log_every == 0:
+            print(
+                f"epoch {epoch + 1}: train_loss={loss.item():.6f} val_loss={val_loss:.6f} "
+                f"batches={len(batches)} time={time.perf_counter() - epoch_started:.3f}s",
+                file=sys.stderr,
+            )
+        if score + 1e-7 < best_val_loss:
+            best_val_loss = score
             best_state = {key: value.detach().clone() for key, value in model.state_dict().items()}
             stale_epochs = 0
         else:
             stale_epochs += 1
-        if stale_epochs >= patience:
+        stopped = stale_epochs >= patience
+        if checkpoint_path is not None and (stopped or epoch + 1 == epochs or (checkpoint_every > 0 and (epoch + 1) % checkpoint_every == 0)):
+            _save_checkpoint(
+                checkpoint_path,
+                {
+                    "fingerprint": fingerprint,
+                    "epoch": epoch + 1,
+                    "stopped": stopped,
+                    "model": model.state_dict(),
+                    "optimizer": optimizer.state_dict(),
+                    "torch_rng": torch.get_rng_state(),
+                    "shuffle_rng": shuffle_generator.get_state(),
+                    "best_state": best_state,
+                    "best_score": best_val_loss,
+                    "stale_epochs": stale_epochs,
+                },
+            )
+        if stopped:
             break
 
     if best_state is not None:
         model.load_state_dict(best_state)
+    return model, tensors
+
+
+def _save_checkpoint(path: Path, checkpoint: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_name(f"{path.name}.tmp")
+    torch.save(checkpoint, staging)
+    os.replace(staging, path)
+
 
-    metrics = _evaluate(
+def evaluate_split(
+    model: nn.Module,
+    data: DispatchTrainingData,
+    split: SplitTensors,
+    penalties: PenaltyWeights = DEFAULT_PENALTIES,
+) -> dict[str, float]:
+    return _evaluate(
         model,
-        x_test,
-        raw_y_test,
-        upper_test,
-        lower_test,
-        previous_test,
-        ramp_test,
-        torch.tensor(target_mean, dtype=torch.float32),
-        torch.tensor(target_std, dtype=torch.float32),
+        split.x,
+        split.raw_y,
+        split.upper,
+        split.lower,
+        split.previous,
+        split.ramp,
+        torch.tensor(data.target_mean, dtype=torch.float32),
+        torch.tensor(data.target_std, dtype=torch.float32),
+        penalties,
     )
+
+
+def write_training_outputs(
+    model: nn.Module,
+    data: DispatchTrainingData,
+    metrics: dict[str, float],
+    *,
+    seed: int,
+    out_weights: Path,
+    out_metrics: Path,
+    extra_metrics: Mapping[str, object] | None = None,
+) -> dict[str, object]:
     trained_at = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
-    weights = _export_weights(model, feature_means, feature_stds, metrics, args.seed, len(rows), trained_at, target_mean, target_std)
+    weights = export_weights(
+        model,
+        data.feature_means,
+        data.feature_stds,
+        metrics,
+        seed,
+        data.row_count,
+        trained_at,
+        data.target_mean,
+        data.target_std,
+    )
 
-    write_json(Path(args.out_weights), weights)
+    write_json(out_weights, weights)
     write_json(
-        Path(args.out_metrics),
+        out_metrics,
         {
             "model_key": MODEL_KEY,
-            "scenario_count": len(rows),
-            "seed": args.seed,
+            "scenario_count": data.row_count,
+            "seed": seed,
             "training_data_profile": "simulator-calibrated",
             "placeholder": False,
             "note": "Pandapower DC-OPF calibrated dispatch weights trained on IEEE-30 LHS scenarios.",
             **metrics,
-            "train_sample_count": int(len(train_idx)),
-            "validation_sample_count": int(len(val_idx)),
-            "test_sample_count": int(len(test_idx)),
+            "train_sample_count": int(len(data.train_idx)),
+            "validation_sample_count": int(len(data.val_idx)),
+            "test_sample_count": int(len(data.test_idx)),
+            **dict(extra_metrics or {}),
         },
     )
+    return weights
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Train pandapower-calibrated dispatch weights.")
+    parser.add_argument("--input", required=True, help="Scenario JSONL generated by generate_scenarios.py.")
+    parser.add_argument("--out-weights", required=True, help="Path to write dispatch-pinn-v2.json.")
+    parser.add_argument("--out-metrics", required=True, help="Path to write metrics JSON.")
+    parser.add_argument("--count", type=int, default=5000, help="Scenario count used for the manifest.")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Deterministic seed. Default: 42.")
+    parser.add_argument("--epochs", type=int, default=300, help="Training epochs.")
+    parser.add_argument("--hidden-dim", type=int, default=32, help="Hidden layer width.")
+    parser.add_argument("--learning-rate", type=float, default=0.008, help="Adam learning rate.")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=0,
+        help="Mini-batch size with seeded per-epoch shuffling. 0 trains full-batch, as published artifacts were. Default: 0.",
+    )
+    parser.add_argument("--num-threads", type=int, default=None, help="torch intra-op thread count. Default: torch's choice.")
+    parser.add_argument("--log-every", type=int, default=0, help="Log loss and epoch time to stderr every N epochs. 0 disables.")
+    parser.add_argument("--patience", type=int, default=DEFAULT_PATIENCE, help="Epochs without improvement before stopping. Default: 8.")
+    parser.add_argument(
+        "--violation-weight",
+        type=float,
+        default=0.0,
+        help="Add this multiple of the validation physics violation rate to the early-stopping score. Default: 0.",
+    )
+    parser.add_argument("--checkpoint-dir", default=None, help="Directory for periodic training checkpoints.")
+    parser.add_argument("--checkpoint-every", type=int, default=10, help="Epochs between checkpoints when --checkpoint-dir is set. Default: 10.")
+    parser.add_argument("--resume", action="store_true", help="Continue from the latest checkpoint in --checkpoint-dir.")
+    parser.add_argument(
+        "--export-compiled",
+        default=None,
+        help="Also compile the exported weights to TorchScript (.pt/.ts) or ONNX (.onnx) for offline scoring.",
+    )
+    args = parser.parse_args()
+
+    if args.batch_size < 0:
+        raise SystemExit("--batch-size must be non-negative.")
+    if args.resume and args.checkpoint_dir is None:
+        raise SystemExit("--resume requires --checkpoint-dir.")
+    if args.num_threads is not None:
+        torch.set_num_threads(max(1, args.num_threads))
+
+    columns = load_dispatch_columns(Path(args.input))
+    if len(columns["index"]) == 0:
+        raise SystemExit("No scenario rows found. Run generate_scenarios.py first.")
+
+    set_determinism(args.seed)
+    data = prepare_training_data(columns, args.seed)
+    model, tensors = fit_dispatch_model(
+        data,
+        seed=args.seed,
+        epochs=args.epochs,
+        hidden_dim=args.hidden_dim,
+        learning_rate=args.learning_rate,
+        batch_size=args.batch_size,
+        log_every=args.log_every,
+        patience=args.patience,
+        violation_weight=args.violation_weight,
+        checkpoint_dir=Path(args.checkpoint_dir) if args.checkpoint_dir else None,
+        checkpoint_every=args.checkpoint_every,
+        resume=args.resume,
+    )
+    metrics = evaluate_split(model, data, tensors["test"])
+    weights = write_training_outputs(
+        model,
+        data,
+        metrics,
+        seed=args.seed,
+        out_weights=Path(args.out_weights),
+        out_metrics=Path(args.out_metrics),
+    )
+    if args.export_compiled:
+        from training.dispatch_pinn.predictor import export_compiled_model
+
+        export_compiled_model(weights, Path(args.export_compiled))
     return 0
 
 
@@ -11,13 +11,19 @@ if __package__ is None or __package__ == "":
 
 import numpy as np
 
+from training.common.columnar import load_columns
+from training.common.jsonl_io import iter_jsonl, read_jsonl_rows
 from training.common.weight_export import DEFAULT_SEED, write_json
 from training.pv_fault_gnn.simulator import (
     FAULT_CLASSES,
     NODE_FEATURE_COLUMNS,
     build_node_feature_vector,
+    check_prediction_parity,
     classify_score,
-    forward_gnn,
+    column_scenario_summaries,
+    predict_column_scenarios,
+    predict_scenario,
+    predict_scenarios,
     round_value,
     split_indices,
     top_margin_from_prediction,
@@ -35,28 +41,12 @@ def label_margin_from_prediction(prediction: dict[str, object]) -> float:
 
 
 def load_rows(path: Path) -> list[dict[str, object]]:
-    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
-
-
-def score_row(weights: dict[str, object], row: dict[str, object]) -> dict[str, object]:
-    prediction = forward_gnn(
-        weights,
-        [
-            {
-                "id": str(node["id"]),
-                "features": build_node_feature_vector(node),
-            }
-            for node in row["nodes"]
-        ],
-        [
-            {
-                "from": str(edge["from"]),
-                "to": str(edge["to"]),
-                "weight": float(edge.get("weight", 1.0)),
-            }
-            for edge in row["edges"]
-        ],
-    )
+    return list(iter_jsonl(path))
+
+
+def score_row(weights: dict[str, object], row: dict[str, object], prediction: dict[str, object] | None = None) -> dict[str, object]:
+    if prediction is None:
+        prediction = predict_scenario(weights, row)
     return {
         "index": int(row["index"]),
         "fault_class": str(row["fault_class"]),
@@ -112,30 +102,58 @@ def main() -> int:
     parser.add_argument("--out-fixture", required=True, help="Path to write the Python↔TS conformance fixture.")
     parser.add_argument("--fixture-limit", type=int, default=20, help="Maximum rows to include in the conformance fixture.")
     parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Deterministic seed. Default: 42.")
+    parser.add_argument(
+        "--parity-sample",
+        type=int,
+        default=256,
+        help="Rows re-scored with the scalar forward_gnn to assert bit-identical batched predictions. -1 checks all, 0 disables.",
+    )
     args = parser.parse_args()
 
     weights = json.loads(Path(args.weights).read_text(encoding="utf-8"))
-    rows = load_rows(Path(args.input))
-    train_idx, val_idx, test_idx = split_indices(len(rows), args.seed)
+    input_path = Path(args.input)
+    # With a columnar sidecar only the parity sample and the fixture rows are parsed from the JSONL.
+    columns = load_columns(input_path)
+    if columns is not None:
+        row_count = len(columns["index"])
+        rows = column_scenario_summaries(columns, np.arange(row_count))
+        predictions = predict_column_scenarios(weights, columns, np.arange(row_count))
+    else:
+        rows = load_rows(input_path)
+        row_count = len(rows)
+        predictions = predict_scenarios(weights, rows)
+    train_idx, val_idx, test_idx = split_indices(row_count, args.seed)
     split_lookup = {index: "train" for index in train_idx}
     split_lookup.update({index: "val" for index in val_idx})
     split_lookup.update({index: "test" for index in test_idx})
 
+    sample = row_count if args.parity_sample < 0 else min(row_count, args.parity_sample)
+    if sample > 0:
+        reference_rows = rows[:sample] if columns is None else list(read_jsonl_rows(input_path, range(sample)).values())
+        mismatches = check_prediction_parity(weights, reference_rows, predictions[:sample])
+        if mismatches:
+            raise SystemExit(f"Batched forward_gnn diverged from the scalar reference on {len(mismatches)} rows (first: {mismatches[0]}).")
+
     evaluations = []
-    for row in rows:
-        scored = score_row(weights, row)
+    for position, (row, prediction) in enumerate(zip(rows, predictions, strict=True)):
+        scored = score_row(weights, row, prediction)
         scored["split"] = split_lookup.get(int(row["index"]), "train")
+        scored["position"] = position
         evaluations.append(scored)
 
     test_evaluations = [entry for entry in evaluations if entry["split"] == "test"]
     validation_evaluations = [entry for entry in evaluations if entry["split"] == "val"]
 
     fixture_rows = select_fixture_rows(test_evaluations + validation_evaluations, limit=args.fixture_limit)
+    if columns is not None:
+        full_rows = read_jsonl_rows(input_path, (int(entry["position"]) for entry in fixture_rows))
+        for entry in fixture_rows:
+            entry["split_row"] = full_rows[int(entry["position"])]
 
     report = {
         "model_key": weights["manifest"]["model_key"],
         "seed": args.seed,
-        "scenario_count": len(rows),
+        "scenario_count": row_count,
         "passed": True,
         "note": f"Simulator-calibrated PV fault evaluation on {weights['manifest']['simulator_config']['version']}.",
         "fixture_label_margin_floor": 0.1,
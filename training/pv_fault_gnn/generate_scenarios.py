@@ -8,8 +8,33 @@ if __package__ is None or __package__ == "":
 
     sys.path.append(str(Path(__file__).resolve().parents[2]))
 
+import pvlib
+
+from training.common.columnar import discard_columns, write_columns
+from training.common.jsonl_io import iter_jsonl
+from training.common.scenario_cache import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_CACHE_MAX_BYTES,
+    lookup_cached_dataset,
+    restore_cached_dataset,
+    scenario_cache_key,
+    store_cached_dataset,
+)
 from training.common.weight_export import DEFAULT_SEED
-from training.pv_fault_gnn.simulator import build_dataset_rows, write_jsonl
+from training.pv_fault_gnn import simulator, solar_table
+from training.pv_fault_gnn.simulator import (
+    GRAPH_MODES,
+    MODEL_KEY,
+    NODE_COUNT,
+    NODE_VALUE_FIELDS,
+    SIMULATOR_VERSION,
+    TOPOLOGY,
+    build_pv_dataset_manifest,
+    iter_dataset_rows,
+    pv_columns_from_rows,
+    write_jsonl,
+)
+from training.pv_fault_gnn.solar_table import DEFAULT_SOLAR_STEP_S, SOLAR_MODES
 
 
 def main() -> int:
@@ -19,13 +44,104 @@ def main() -> int:
     parser.add_argument("--count", type=int, default=20000, help="Scenario count to generate.")
     parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Deterministic seed. Default: 42.")
     parser.add_argument("--topology", default="mv_oberrhein", help="Topology label to record in the manifest.")
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Also write memory-mappable .npy columns (nodes as [N, nodes, k] tensors) next to --out.",
+    )
+    parser.add_argument("--node-count", type=int, default=NODE_COUNT, help=f"PV nodes placed on the topology. Default: {NODE_COUNT}.")
+    parser.add_argument(
+        "--graph",
+        choices=GRAPH_MODES,
+        default="chain",
+        help=(
+            "chain links consecutive PV nodes (matches published fixtures); feeder derives edges from the "
+            "radial line graph, one tree per substation. Default: chain."
+        ),
+    )
+    parser.add_argument(
+        "--solar-mode",
+        choices=SOLAR_MODES,
+        default="exact",
+        help=(
+            "exact calls pvlib per timestamp (matches published fixtures); table interpolates a cached "
+            "clear-sky/zenith grid and skips pvlib on repeat runs. Default: exact."
+        ),
+    )
+    parser.add_argument(
+        "--solar-step-s",
+        type=int,
+        default=DEFAULT_SOLAR_STEP_S,
+        help="Grid spacing of the cached solar table in seconds. Default: 60.",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always regenerate; neither read nor populate the scenario cache.")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="Scenario cache directory. Default: ~/.cache/ceip-scenarios.")
+    parser.add_argument("--cache-max-gb", type=float, default=DEFAULT_CACHE_MAX_BYTES / 1024**3, help="LRU size budget for the cache. Default: 10.")
     args = parser.parse_args()
 
-    rows, manifest = build_dataset_rows(count=args.count, seed=args.seed, topology=args.topology)
-    write_jsonl(Path(args.out), rows)
+    out = Path(args.out)
+    cache_dir = Path(args.cache_dir).expanduser()
+    cache_params = {
+        "model_key": MODEL_KEY,
+        "simulator_version": SIMULATOR_VERSION,
+        "topology": TOPOLOGY,
+        "count": args.count,
+        "seed": args.seed,
+        # Clear-sky GHI and zenith come from pvlib in both solar modes.
+        "pvlib": pvlib.__version__,
+    }
+    if args.node_count != NODE_COUNT or args.graph != "chain":
+        cache_params["node_count"] = args.node_count
+        cache_params["graph"] = args.graph
+    if args.solar_mode != "exact":
+        cache_params["solar_mode"] = args.solar_mode
+        cache_params["solar_step_s"] = args.solar_step_s
+    cache_key = None if args.no_cache else scenario_cache_key(cache_params, [simulator.__file__, solar_table.__file__])
+    cached = lookup_cached_dataset(cache_key, cache_dir) if cache_key is not None else None
+
+    rows = None
+    manifest = build_pv_dataset_manifest(count=args.count, seed=args.seed, topology=args.topology)
+    if args.node_count != NODE_COUNT or args.graph != "chain":
+        manifest["network_graph"] = {"node_count": args.node_count, "graph": args.graph}
+    if args.solar_mode != "exact":
+        manifest["solar_lookup"] = {"mode": args.solar_mode, "step_s": args.solar_step_s}
+    if cached is not None:
+        written = restore_cached_dataset(cached, out)
+    else:
+        # Stream rows to disk unless the columnar pass needs them in memory afterwards.
+        scenarios = iter_dataset_rows(
+            count=args.count,
+            seed=args.seed,
+            solar_mode=args.solar_mode,
+            solar_step_s=args.solar_step_s,
+            cache_dir=None if args.no_cache else cache_dir,
+            node_count=args.node_count,
+            graph=args.graph,
+        )
+        if args.columnar:
+            rows = list(scenarios)
+            scenarios = iter(rows)
+        written = write_jsonl(out, scenarios)
+        if cache_key is not None:
+            store_cached_dataset(
+                cache_key,
+                written,
+                params=cache_params,
+                cache_dir=cache_dir,
+                max_bytes=int(args.cache_max_gb * 1024**3),
+            )
     from training.common.weight_export import write_json  # local import keeps startup cost low
 
-    write_json(Path(args.manifest), manifest)
+    write_json(Path(args.manifest), {**manifest, "dataset_sha256": written.sha256})
+    if args.columnar:
+        write_columns(
+            out,
+            pv_columns_from_rows(rows if rows is not None else list(iter_jsonl(out))),
+            source_sha256=written.sha256,
+            metadata={"model_key": manifest["model_key"], "node_value_fields": NODE_VALUE_FIELDS},
+        )
+    else:
+        discard_columns(out)
     return 0
 
 
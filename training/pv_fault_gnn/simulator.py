@@ -2,18 +2,23 @@ from __future__ import annotations
 
 import json
 import math
+import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator
 
-import networkx as nx
 import numpy as np
 import pandas as pd
+import pandapower as pp
 import pandapower.networks as pn
 from pvlib.location import Location
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
 from scipy.stats import qmc
 
 from training.common.dataset_manifest import build_dataset_manifest
+from training.common.jsonl_io import JsonlWriteResult, write_jsonl_rows
+from training.common.scenario_cache import DEFAULT_CACHE_DIR, scenario_cache_key
 from training.common.weight_export import (
     DEFAULT_SEED,
     PLACEHOLDER_TRAINED_AT,
@@ -22,6 +27,7 @@ from training.common.weight_export import (
     stable_json_dumps,
     write_json,
 )
+from training.pv_fault_gnn.solar_table import DEFAULT_SOLAR_STEP_S, SolarLookup, build_solar_lookup
 
 MODEL_KEY = "pv-gnn-v2"
 MODEL_VERSION = "pv-gnn-v2"
@@ -29,6 +35,9 @@ SIMULATOR_NAME = "pvlib"
 SIMULATOR_VERSION = "pvlib-mv_oberrhein-gnn-v1"
 TOPOLOGY = "mv_oberrhein"
 NODE_COUNT = 5
+# chain links consecutive PV nodes (the published datasets); feeder follows the radial line graph.
+GRAPH_MODES = ("chain", "feeder")
+MIN_BRANCH_KM = 0.1
 NODE_FEATURE_COLUMNS = [
     "output_delta_ratio",
     "voltage_penalty",
@@ -43,6 +52,21 @@ FAULT_CLASSES = [
     "hot_spot_derating",
     "localized_short_circuit",
 ]
+# Numeric node fields packed into the columnar node_values tensor, in this order.
+NODE_VALUE_FIELDS = [
+    "expected_output_mw",
+    "observed_output_mw",
+    "voltage_v",
+    "inverter_temp_c",
+    "irradiance",
+    "offline",
+    "depth",
+    "target_severity",
+]
+# Node fields build_node_feature_vector reads, in the order of the feature formulas.
+FEATURE_SOURCE_FIELDS = ["expected_output_mw", "observed_output_mw", "voltage_v", "inverter_temp_c", "irradiance", "offline"]
+SCENARIO_VALUE_FIELDS = ["scenario_score", "class_bias", "ambient_temp_c", "ghi_wm2", "solar_factor"]
+NETWORK_CONTEXT_SUBDIR = "network"
 THRESHOLD_ORDER = [
     "inverter_trip",
     "soiling_cluster",
@@ -81,10 +105,47 @@ def stable_json_line(payload: Any) -> str:
     return stable_json_dumps(payload)
 
 
-def write_jsonl(path: str | Path, rows: list[dict[str, object]]) -> None:
-    destination = Path(path)
-    destination.parent.mkdir(parents=True, exist_ok=True)
-    destination.write_text("\n".join(stable_json_line(row) for row in rows) + "\n", encoding="utf-8")
+def write_jsonl(path: str | Path, rows: Iterable[dict[str, object]]) -> JsonlWriteResult:
+    return write_jsonl_rows(path, rows)
+
+
+def pv_columns_from_rows(rows: list[dict[str, Any]]) -> dict[str, np.ndarray]:
+    """Pack scenario rows into columns, with per-node data as [scenarios, nodes, k] tensors."""
+    node_counts = {len(row["nodes"]) for row in rows}
+    edge_counts = {len(row["edges"]) for row in rows}
+    if len(node_counts) > 1 or len(edge_counts) > 1:
+        raise ValueError("Columnar PV output requires the same node and edge count in every scenario.")
+    node_total = node_counts.pop() if node_counts else NODE_COUNT
+    node_positions = {f"pv-{position + 1}": position for position in range(node_total)}
+    columns: dict[str, np.ndarray] = {
+        "index": np.asarray([int(row["index"]) for row in rows], dtype=np.int64),
+        "seed": np.asarray([int(row["seed"]) for row in rows], dtype=np.int64),
+        "fault_class": np.asarray([str(row["fault_class"]) for row in rows], dtype=str).reshape(len(rows)),
+        "fault_node_index": np.asarray([int(row["fault_node_index"]) for row in rows], dtype=np.int64),
+        "timestamp": np.asarray([str(row["timestamp"]) for row in rows], dtype=str).reshape(len(rows)),
+        "node_values": np.asarray(
+            [[[float(node[field]) for field in NODE_VALUE_FIELDS] for node in row["nodes"]] for row in rows],
+            dtype=np.float64,
+        ).reshape(len(rows), node_total, len(NODE_VALUE_FIELDS)),
+        "node_features": np.asarray(
+            [[node["feature_vector"] for node in row["nodes"]] for row in rows],
+            dtype=np.float64,
+        ).reshape(len(rows), node_total, len(NODE_FEATURE_COLUMNS)),
+        "node_bus": np.asarray([[int(node["bus"]) for node in row["nodes"]] for row in rows], dtype=np.int64).reshape(len(rows), node_total),
+    }
+    for field in SCENARIO_VALUE_FIELDS:
+        columns[field] = np.asarray([float(row[field]) for row in rows], dtype=np.float64)
+    edge_total = edge_counts.pop() if edge_counts else 0
+    columns["edge_from"] = np.asarray(
+        [[node_positions[str(edge["from"])] for edge in row["edges"]] for row in rows], dtype=np.int64
+    ).reshape(len(rows), edge_total)
+    columns["edge_to"] = np.asarray(
+        [[node_positions[str(edge["to"])] for edge in row["edges"]] for row in rows], dtype=np.int64
+    ).reshape(len(rows), edge_total)
+    columns["edge_weight"] = np.asarray(
+        [[float(edge.get("weight", 1.0)) for edge in row["edges"]] for row in rows], dtype=np.float64
+    ).reshape(len(rows), edge_total)
+    return columns
 
 
 def parse_bus_geo(raw: Any) -> tuple[float, float]:
@@ -111,7 +172,243 @@ class NetworkContext:
     center_longitude: float
 
 
-def build_network_context() -> NetworkContext:
+@dataclass(frozen=True)
+class SparseAdjacency:
+    """Symmetric node adjacency in CSR form; each row lists its neighbours in edge order."""
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    weights: np.ndarray
+
+    @property
+    def node_count(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def neighbor_sum(self, values: np.ndarray, weighted: bool = True) -> np.ndarray:
+        """Sum neighbour values over the last (node) axis of ``values``.
+
+        Each row is accumulated left to right in edge order, exactly like a
+        Python ``sum`` over an adjacency list, so results are bit-identical to
+        the scalar loops. Rows are visited by descending degree, so step ``k``
+        only touches nodes with more than ``k`` neighbours and the total work
+        is proportional to the edge count.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        totals = np.zeros(values.shape[:-1] + (self.node_count,), dtype=np.float64)
+        degree = self.degree
+        order = np.argsort(-degree, kind="stable")
+        sorted_degree = degree[order]
+        for step in range(int(sorted_degree[0]) if len(sorted_degree) else 0):
+            rows = order[: int(np.count_nonzero(sorted_degree > step))]
+            slots = self.indptr[rows] + step
+            contribution = values[..., self.indices[slots]]
+            if weighted:
+                contribution = contribution * self.weights[slots]
+            totals[..., rows] += contribution
+        return totals
+
+
+def build_adjacency(node_count: int, sources: Iterable[int], targets: Iterable[int], weights: Iterable[float]) -> SparseAdjacency:
+    """CSR adjacency for undirected edges given as node positions; both directions are stored."""
+    sources = np.asarray(list(sources), dtype=np.int64)
+    targets = np.asarray(list(targets), dtype=np.int64)
+    weights = np.asarray(list(weights), dtype=np.float64)
+    rows = np.column_stack([sources, targets]).reshape(-1)
+    columns = np.column_stack([targets, sources]).reshape(-1)
+    # A stable sort by row keeps every node's neighbours in edge order.
+    order = np.argsort(rows, kind="stable")
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=node_count), out=indptr[1:])
+    return SparseAdjacency(indptr=indptr, indices=columns[order], weights=np.repeat(weights, 2)[order])
+
+
+def context_adjacency(context: NetworkContext) -> SparseAdjacency:
+    positions = {f"pv-{position + 1}": position for position in range(len(context.buses))}
+    return build_adjacency(
+        len(context.buses),
+        (positions[str(edge["from"])] for edge in context.edges),
+        (positions[str(edge["to"])] for edge in context.edges),
+        (float(edge.get("weight", 1.0)) for edge in context.edges),
+    )
+
+
+def _branch_graph(branch_lengths: dict[tuple[int, int], float]) -> tuple[dict[int, int], list[int], csr_matrix]:
+    buses = sorted({bus for pair in branch_lengths for bus in pair})
+    positions = {bus: position for position, bus in enumerate(buses)}
+    rows = [positions[left] for left, _ in branch_lengths]
+    columns = [positions[right] for _, right in branch_lengths]
+    graph = csr_matrix((list(branch_lengths.values()), (rows, columns)), shape=(len(buses), len(buses)))
+    return positions, buses, graph
+
+
+def _shortest_path_lengths(line_lengths: dict[tuple[int, int], float], sources: list[int]) -> dict[tuple[int, int], float]:
+    """Weighted distances from every source to every reachable bus in one multi-source Dijkstra pass."""
+    positions, buses, graph = _branch_graph(line_lengths)
+    present = list(dict.fromkeys(source for source in sources if source in positions))
+    if not present:
+        return {}
+    distances = dijkstra(graph, directed=False, indices=[positions[source] for source in present])
+    lengths: dict[tuple[int, int], float] = {}
+    for source, row in zip(present, distances.tolist(), strict=True):
+        for bus, distance in zip(buses, row, strict=True):
+            if math.isfinite(distance):
+                lengths[(source, bus)] = float(distance)
+    return lengths
+
+
+def _chain_graph(net: Any, root_bus: int, selected_buses: list[int]) -> tuple[dict[int, float], list[dict[str, object]]]:
+    """Line-graph depths from ``root_bus`` and one edge between each pair of consecutive selected buses."""
+    line_lengths: dict[tuple[int, int], float] = {}
+    for line in net.line.itertuples():
+        # Like nx.Graph.add_edge, a later parallel line replaces the earlier one.
+        line_lengths[tuple(sorted((int(line.from_bus), int(line.to_bus))))] = max(MIN_BRANCH_KM, float(getattr(line, "length_km", 1.0) or 1.0))
+    path_lengths = _shortest_path_lengths(line_lengths, [root_bus, *selected_buses[:-1]])
+
+    bus_depths: dict[int, float] = {}
+    for bus in selected_buses:
+        depth = path_lengths.get((root_bus, bus))
+        bus_depths[bus] = depth if depth is not None else float(abs(bus - root_bus) or 1.0)
+
+    edges: list[dict[str, object]] = []
+    for index in range(len(selected_buses) - 1):
+        left = selected_buses[index]
+        right = selected_buses[index + 1]
+        path_length = path_lengths.get((left, right))
+        if path_length is None:
+            path_length = float(abs(right - left) or 1.0)
+        edges.append(
+            {
+                "from": f"pv-{index + 1}",
+                "to": f"pv-{index + 2}",
+                "weight": round_value(1 / (1 + path_length / 8), 4),
+            },
+        )
+    return bus_depths, edges
+
+
+def _feeder_graph(net: Any, root_bus: int, selected_buses: list[int]) -> tuple[dict[int, float], list[dict[str, object]]]:
+    """Depths and edges from the radial operating topology.
+
+    Branches are the in-service lines without an open switch plus the
+    transformers. One multi-source Dijkstra pass from every external grid bus
+    gives each bus its parent towards the substation; every selected bus is
+    linked to the nearest selected bus on that path, so each feeder becomes a
+    tree and separate feeders stay separate components.
+    """
+    switches = net.switch
+    open_lines = {int(element) for element in switches.element[(switches.et == "l") & ~switches.closed.astype(bool)]}
+    branch_lengths: dict[tuple[int, int], float] = {}
+    for line in net.line.itertuples():
+        if bool(line.in_service) and int(line.Index) not in open_lines:
+            branch_lengths[tuple(sorted((int(line.from_bus), int(line.to_bus))))] = max(MIN_BRANCH_KM, float(getattr(line, "length_km", 1.0) or 1.0))
+    for trafo in net.trafo.itertuples():
+        if bool(trafo.in_service):
+            branch_lengths[tuple(sorted((int(trafo.hv_bus), int(trafo.lv_bus))))] = MIN_BRANCH_KM
+    positions, _, graph = _branch_graph(branch_lengths)
+    roots = [int(bus) for bus in net.ext_grid.bus.tolist() if int(bus) in positions] or [root_bus]
+    if not branch_lengths or roots[0] not in positions:
+        return {bus: float(abs(bus - root_bus) or 1.0) for bus in selected_buses}, []
+    distances, predecessors, _ = dijkstra(
+        graph,
+        directed=False,
+        indices=[positions[bus] for bus in roots],
+        min_only=True,
+        return_predecessors=True,
+    )
+
+    node_positions = {positions[bus]: position for position, bus in enumerate(selected_buses) if bus in positions}
+    bus_depths: dict[int, float] = {}
+    edges: list[dict[str, object]] = []
+    for node_position, bus in enumerate(selected_buses):
+        index = positions.get(bus)
+        if index is None or not math.isfinite(distances[index]):
+            bus_depths[bus] = float(abs(bus - root_bus) or 1.0)
+            continue
+        bus_depths[bus] = float(distances[index])
+        ancestor = int(predecessors[index])
+        while ancestor >= 0 and ancestor not in node_positions:
+            ancestor = int(predecessors[ancestor])
+        if ancestor >= 0:
+            path_length = float(distances[index] - distances[ancestor])
+            edges.append(
+                {
+                    "from": f"pv-{node_positions[ancestor] + 1}",
+                    "to": f"pv-{node_position + 1}",
+                    "weight": round_value(1 / (1 + path_length / 8), 4),
+                },
+            )
+    return bus_depths, edges
+
+
+def network_context_path(cache_dir: Path = DEFAULT_CACHE_DIR, *, node_count: int = NODE_COUNT, graph: str = "chain") -> Path:
+    params = {"purpose": "network_context", "topology": TOPOLOGY, "node_count": node_count, "pandapower": pp.__version__}
+    if graph != "chain":
+        params["graph"] = graph
+    return cache_dir / NETWORK_CONTEXT_SUBDIR / f"{scenario_cache_key(params, [__file__])}.json"
+
+
+def load_network_context(
+    cache_dir: Path | None = DEFAULT_CACHE_DIR,
+    refresh: bool = False,
+    *,
+    node_count: int = NODE_COUNT,
+    graph: str = "chain",
+) -> NetworkContext:
+    """Return the cached ``NetworkContext``, building and persisting it on a miss.
+
+    The cache key covers the topology, node count, graph mode, the pandapower
+    version and this module's source, so any change to the context logic
+    rebuilds it. ``cache_dir=None`` builds the context in memory without
+    touching the cache.
+    """
+    if cache_dir is None:
+        return build_network_context(node_count=node_count, graph=graph)
+    path = network_context_path(cache_dir, node_count=node_count, graph=graph)
+    if path.exists() and not refresh:
+        payload = load_json(path)
+        # Touch the file so LRU eviction sees it as recently used.
+        os.utime(path)
+        return NetworkContext(
+            buses=[int(bus) for bus in payload["buses"]],
+            bus_coordinates={int(bus): (float(coords[0]), float(coords[1])) for bus, coords in payload["bus_coordinates"]},
+            capacities_mw={int(bus): float(value) for bus, value in payload["capacities_mw"]},
+            root_bus=int(payload["root_bus"]),
+            bus_depths={int(bus): float(value) for bus, value in payload["bus_depths"]},
+            edges=payload["edges"],
+            center_latitude=float(payload["center_latitude"]),
+            center_longitude=float(payload["center_longitude"]),
+        )
+    context = build_network_context(node_count=node_count, graph=graph)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_name(f"{path.name}.tmp")
+    # Dict fields are stored as [key, value] pairs so integer bus ids and insertion order survive JSON.
+    write_json(
+        staging,
+        {
+            "buses": context.buses,
+            "bus_coordinates": [[bus, list(coords)] for bus, coords in context.bus_coordinates.items()],
+            "capacities_mw": [[bus, value] for bus, value in context.capacities_mw.items()],
+            "root_bus": context.root_bus,
+            "bus_depths": [[bus, value] for bus, value in context.bus_depths.items()],
+            "edges": context.edges,
+            "center_latitude": context.center_latitude,
+            "center_longitude": context.center_longitude,
+        },
+    )
+    os.replace(staging, path)
+    return context
+
+
+def build_network_context(*, node_count: int = NODE_COUNT, graph: str = "chain") -> NetworkContext:
+    """Place ``node_count`` PV nodes on the topology and connect them according to ``graph``."""
+    if graph not in GRAPH_MODES:
+        raise ValueError(f"Unknown graph mode {graph!r}; use one of {GRAPH_MODES}.")
+    if node_count < 1:
+        raise ValueError("node_count must be at least 1.")
     net = pn.mv_oberrhein()
     candidate_buses = sorted({int(bus) for bus in net.sgen.bus.tolist()} or {int(bus) for bus in net.bus.index.tolist()})
     bus_coordinates: dict[int, tuple[float, float]] = {}
@@ -121,65 +418,44 @@ def build_network_context() -> NetworkContext:
         bus_coordinates[int(row.Index)] = (longitude, latitude)
 
     candidate_buses.sort(key=lambda bus: (*bus_coordinates.get(bus, (0.0, 0.0)), bus))
-    if len(candidate_buses) < NODE_COUNT:
+    if len(candidate_buses) < node_count:
         candidate_buses = sorted({int(bus) for bus in net.bus.index.tolist()})
+    if len(candidate_buses) < node_count:
+        raise ValueError(f"{TOPOLOGY} has {len(candidate_buses)} buses; cannot place {node_count} PV nodes.")
 
-    sampled_positions = np.linspace(0, max(0, len(candidate_buses) - 1), NODE_COUNT)
+    sampled_positions = np.linspace(0, max(0, len(candidate_buses) - 1), node_count)
     selected_buses: list[int] = []
+    seen: set[int] = set()
     for position in sampled_positions:
         bus = candidate_buses[int(round(position))]
-        if bus not in selected_buses:
+        if bus not in seen:
             selected_buses.append(bus)
+            seen.add(bus)
     for bus in candidate_buses:
-        if len(selected_buses) >= NODE_COUNT:
+        if len(selected_buses) >= node_count:
             break
-        if bus not in selected_buses:
+        if bus not in seen:
             selected_buses.append(bus)
-    selected_buses = selected_buses[:NODE_COUNT]
+            seen.add(bus)
+    selected_buses = selected_buses[:node_count]
 
     capacities_mw: dict[int, float] = {}
-    for bus in selected_buses:
-        bus_rows = net.sgen.loc[net.sgen.bus == bus]
-        capacity = float(bus_rows.p_mw.sum()) if not bus_rows.empty else 0.0
+    sgen_capacity = net.sgen.groupby("bus").p_mw.sum()
+    for position, bus in enumerate(selected_buses):
+        capacity = float(sgen_capacity.get(bus, 0.0))
         if capacity <= 0:
-            capacity = 1.2 + 0.15 * (selected_buses.index(bus) + 1)
+            capacity = 1.2 + 0.15 * (position + 1)
         capacities_mw[bus] = round_value(capacity, 4)
 
     root_bus = int(net.ext_grid.bus.iloc[0]) if not net.ext_grid.empty else selected_buses[0]
-    graph = nx.Graph()
-    for line in net.line.itertuples():
-        graph.add_edge(
-            int(line.from_bus),
-            int(line.to_bus),
-            weight=max(0.1, float(getattr(line, "length_km", 1.0) or 1.0)),
-        )
-
-    bus_depths: dict[int, float] = {}
-    for bus in selected_buses:
-        try:
-            bus_depths[bus] = float(nx.shortest_path_length(graph, root_bus, bus, weight="weight"))
-        except Exception:
-            bus_depths[bus] = float(abs(bus - root_bus) or 1.0)
+    if graph == "feeder":
+        bus_depths, edges = _feeder_graph(net, root_bus, selected_buses)
+    else:
+        bus_depths, edges = _chain_graph(net, root_bus, selected_buses)
 
     max_depth = max(bus_depths.values()) or 1.0
     normalized_depths = {bus: round_value(depth / max_depth, 6) for bus, depth in bus_depths.items()}
 
-    edges: list[dict[str, object]] = []
-    for index in range(len(selected_buses) - 1):
-        left = selected_buses[index]
-        right = selected_buses[index + 1]
-        try:
-            path_length = float(nx.shortest_path_length(graph, left, right, weight="weight"))
-        except Exception:
-            path_length = float(abs(right - left) or 1.0)
-        edges.append(
-            {
-                "from": f"pv-{index + 1}",
-                "to": f"pv-{index + 2}",
-                "weight": round_value(1 / (1 + path_length / 8), 4),
-            },
-        )
-
     coordinates = [bus_coordinates.get(bus, (0.0, 0.0)) for bus in selected_buses]
     longitudes = [coords[0] for coords in coordinates if coords != (0.0, 0.0)]
     latitudes = [coords[1] for coords in coordinates if coords != (0.0, 0.0)]
@@ -198,163 +474,341 @@ def build_network_context() -> NetworkContext:
     )
 
 
-def build_dataset_rows(
+CLASS_BIAS = {
+    "healthy_cluster": 0.03,
+    "inverter_trip": 0.20,
+    "soiling_cluster": 0.32,
+    "hot_spot_derating": 0.42,
+    "localized_short_circuit": 0.56,
+}
+CLUSTER_CLASSES = {"soiling_cluster", "hot_spot_derating", "localized_short_circuit"}
+SCENARIO_START = "2026-01-01T00:00:00Z"
+
+
+def clamp_array(values: np.ndarray, min_value: float = 0.0, max_value: float = 1.0) -> np.ndarray:
+    """Elementwise ``clamp`` with the builtin ``max(min, min(max, value))`` tie and NaN behaviour."""
+    values = np.asarray(values, dtype=np.float64)
+    bounded = np.where(values < max_value, values, max_value)
+    bounded = np.where(bounded > min_value, bounded, min_value)
+    return np.where(np.isfinite(values), bounded, min_value)
+
+
+def round_array(values: np.ndarray, decimals: int = 6) -> np.ndarray:
+    """Elementwise ``round_value``: ``np.rint`` and ``round`` both round half to even on the same scaled double."""
+    values = np.asarray(values, dtype=np.float64)
+    factor = float(10**decimals)
+    with np.errstate(invalid="ignore", over="ignore"):
+        # ``round`` returns an int, so -0.3 and -0.0 become 0.0; adding 0.0 clears rint's negative zero the same way.
+        rounded = (np.rint(values * factor) + 0.0) / factor
+    return np.where(np.isfinite(values), rounded, 0.0)
+
+
+def _sin_table(start: int, stop: int, scale: float) -> np.ndarray:
+    # math.sin keeps libm results; numpy's SIMD sin may differ in the last bit.
+    return np.fromiter((math.sin(step * scale) for step in range(start, stop)), dtype=np.float64, count=max(0, stop - start))
+
+
+def _isoformat_utc(values: pd.DatetimeIndex) -> list[str]:
+    """``Timestamp.isoformat()`` with ``Z`` for UTC: 9 fraction digits with nanoseconds, 6 with microseconds, else none."""
+    nanoseconds = values.asi8 % 1_000_000_000
+    texts = np.datetime_as_string(values.tz_convert(None).to_numpy(), unit="ns").tolist()
+    formatted = []
+    for text, fraction in zip(texts, nanoseconds.tolist(), strict=True):
+        if fraction % 1000:
+            formatted.append(f"{text}Z")
+        elif fraction:
+            formatted.append(f"{text[:-3]}Z")
+        else:
+            formatted.append(f"{text[:-10]}Z")
+    return formatted
+
+
+@dataclass(frozen=True)
+class FaultClassBatch:
+    """Every scenario of one fault class as [scenarios] and [scenarios, nodes] arrays."""
+
+    fault_class: str
+    class_bias: float
+    timestamps: list[str]
+    ghi: np.ndarray
+    solar_factor: np.ndarray
+    ambient_temp_c: np.ndarray
+    fault_node_index: np.ndarray
+    in_cluster: np.ndarray
+    expected_output_mw: np.ndarray
+    observed_output_mw: np.ndarray
+    voltage_v: np.ndarray
+    inverter_temp_c: np.ndarray
+    irradiance: np.ndarray
+    offline: np.ndarray
+    target_severity: np.ndarray
+    feature_vectors: np.ndarray
+    scenario_score: np.ndarray
+
+    @property
+    def count(self) -> int:
+        return len(self.timestamps)
+
+
+def simulate_fault_class(
+    context: NetworkContext,
+    fault_class: str,
+    lhs: np.ndarray,
+    *,
+    seed: int,
+    solar: SolarLookup,
+    start_time: pd.Timestamp,
+    adjacency: SparseAdjacency | None = None,
+) -> FaultClassBatch:
+    """Compute all node quantities for one fault class at once.
+
+    Every expression keeps the operand order of the original per-node loop, so
+    the rounded outputs are bit-identical to it; only ``sin``/``cos`` go through
+    ``math`` to stay on the same libm results.
+    """
+    count = len(lhs)
+    node_total = len(context.buses)
+    adjacency = adjacency or context_adjacency(context)
+    class_bias = CLASS_BIAS[fault_class]
+    sample = [lhs[:, column] for column in range(5)]
+
+    # Timedelta(seconds=x) truncates x * 1e9 to integer nanoseconds.
+    offsets_ns = (sample[0] * 365 * 24 * 3600 * 1_000_000_000).astype(np.int64)
+    timestamps = start_time + pd.to_timedelta(offsets_ns, unit="ns")
+    ghi, zenith = solar(timestamps)
+    cos_zenith = np.fromiter((max(0.0, math.cos(math.radians(value))) for value in zenith.tolist()), dtype=np.float64, count=count)
+    solar_factor = clamp_array(cos_zenith * (ghi / 1000))
+    cloudiness = sample[1]
+    weather_noise = sample[2]
+    seasonal = np.fromiter(
+        (math.sin(2 * math.pi * value - math.pi / 3) for value in sample[3].tolist()),
+        dtype=np.float64,
+        count=count,
+    )
+    ambient_temp_c = round_array(4 + 16 * seasonal + (weather_noise - 0.5) * 8, 3)
+
+    cluster_center = np.rint(sample[4] * (node_total - 1)).astype(np.int64)
+    positions = np.arange(node_total)[None, :]
+    in_cluster = positions == cluster_center[:, None]
+    fault_node_index = cluster_center
+    if fault_class in {"soiling_cluster", "hot_spot_derating"}:
+        in_cluster |= positions == np.minimum(node_total - 1, cluster_center + 1)[:, None]
+    elif fault_class == "localized_short_circuit":
+        fault_node_index = np.maximum(0, cluster_center - 1)
+        in_cluster |= positions == fault_node_index[:, None]
+    is_fault_node = positions == fault_node_index[:, None]
+
+    capacity = np.asarray([context.capacities_mw[bus] for bus in context.buses], dtype=np.float64)[None, :]
+    depth_penalty = np.asarray([context.bus_depths.get(bus, 0.0) for bus in context.buses], dtype=np.float64)[None, :]
+    base_expected = capacity * (0.35 + 0.6 * solar_factor)[:, None]
+    irradiance = np.repeat((ghi * (0.88 + 0.08 * (1 - cloudiness)))[:, None], node_total, axis=1)
+    ripple = _sin_table(seed, seed + count + node_total, 0.9)
+    steps = np.arange(count)[:, None] + positions
+    observed_multiplier = 0.95 + (0.03 * ripple[steps]) if count else np.empty((0, node_total))
+    offline = np.zeros((count, node_total), dtype=bool)
+    temp_boost = np.zeros((count, node_total))
+    voltage_drop = np.zeros((count, node_total))
+
+    column = {index: values[:, None] for index, values in enumerate(sample)}
+    if fault_class == "inverter_trip":
+        faulted = is_fault_node
+        observed_multiplier = np.where(faulted, 0.02 + 0.04 * column[2], observed_multiplier)
+        offline = faulted
+        voltage_drop = np.where(faulted, voltage_drop + (0.08 + 0.04 * column[1]), voltage_drop)
+    elif fault_class == "soiling_cluster":
+        faulted = in_cluster
+        observed_multiplier = np.where(faulted, 0.48 + 0.18 * column[2], observed_multiplier)
+        irradiance = np.where(faulted, irradiance * (0.72 + 0.12 * column[1]), irradiance)
+        voltage_drop = np.where(faulted, voltage_drop + (0.03 + 0.02 * column[4]), voltage_drop)
+    elif fault_class == "hot_spot_derating":
+        faulted = in_cluster
+        observed_multiplier = np.where(faulted, 0.58 + 0.15 * column[2], observed_multiplier)
+        temp_boost = np.where(faulted, temp_boost + (18 + 12 * column[1]), temp_boost)
+        voltage_drop = np.where(faulted, voltage_drop + (0.02 + 0.02 * column[4]), voltage_drop)
+    elif fault_class == "localized_short_circuit":
+        faulted = in_cluster
+        observed_multiplier = np.where(faulted, 0.18 + 0.12 * column[2], observed_multiplier)
+        voltage_drop = np.where(faulted, voltage_drop + (0.14 + 0.08 * column[1]), voltage_drop)
+    else:
+        faulted = np.zeros((count, node_total), dtype=bool)
+    observed_multiplier = np.where(faulted, observed_multiplier, observed_multiplier * (0.98 + 0.03 * column[1]))
+
+    expected_output_mw = round_array(np.where(base_expected > 0.01, base_expected, 0.01), 6)
+    observed_raw = expected_output_mw * observed_multiplier
+    observed_output_mw = round_array(np.where(observed_raw > 0.0, observed_raw, 0.0), 6)
+    voltage_pu = clamp_array(1.02 - depth_penalty * 0.08 - (1 - observed_multiplier) * 0.12 - voltage_drop, 0.75, 1.05)
+    voltage_v = round_array(voltage_pu * 600, 6)
+    inverter_temp_c = round_array(
+        ambient_temp_c[:, None] + 6 + 10 * (irradiance / 1000) + temp_boost + (0.8 * column[0]),
+        6,
+    )
+    irradiance = round_array(irradiance, 6)
+
+    expected = np.where(expected_output_mw > 0.001, expected_output_mw, 0.001)
+    observed = np.where(observed_output_mw > 0.0, observed_output_mw, 0.0)
+    output_delta = clamp_array(np.abs(expected - observed) / expected)
+    thermal_excess = (inverter_temp_c - 45) / 40
+    irradiance_ratio = irradiance / 1000
+    base_severity = clamp_array(
+        class_bias
+        + 0.46 * output_delta
+        + 0.18 * clamp_array(np.abs(voltage_v - 600) / 120)
+        + 0.16 * clamp_array(np.where(thermal_excess > 0.0, thermal_excess, 0.0))
+        + 0.10 * clamp_array(1 - np.where(irradiance_ratio < 1.0, irradiance_ratio, 1.0))
+        + 0.10 * offline.astype(np.float64),
+    )
+
+    # Unweighted neighbour mean over the context graph; isolated nodes get 0.
+    degree = adjacency.degree
+    neighbor_total = adjacency.neighbor_sum(base_severity, weighted=False)
+    neighbor_mean = np.where(degree > 0, neighbor_total / np.where(degree > 0, degree, 1), 0.0)
+    final_severity = clamp_array(base_severity * 0.82 + neighbor_mean * 0.18)
+
+    thermal_feature = (inverter_temp_c - 45) / 55
+    feature_vectors = np.stack(
+        [
+            round_array(output_delta, 6),
+            round_array(clamp_array(np.abs(voltage_v - 600) / 600), 6),
+            round_array(clamp_array(np.where(thermal_feature > 0.0, thermal_feature, 0.0)), 6),
+            round_array(clamp_array(1 - np.where(irradiance_ratio < 1.0, irradiance_ratio, 1.0)), 6),
+            round_array(offline.astype(np.float64), 6),
+        ],
+        axis=-1,
+    )
+    scenario_score = round_array(final_severity.max(axis=1, initial=0.0), 6)
+
+    return FaultClassBatch(
+        fault_class=fault_class,
+        class_bias=class_bias,
+        timestamps=_isoformat_utc(timestamps),
+        ghi=round_array(ghi, 6),
+        solar_factor=round_array(solar_factor, 6),
+        ambient_temp_c=ambient_temp_c,
+        fault_node_index=fault_node_index,
+        in_cluster=in_cluster,
+        expected_output_mw=expected_output_mw,
+        observed_output_mw=observed_output_mw,
+        voltage_v=voltage_v,
+        inverter_temp_c=inverter_temp_c,
+        irradiance=irradiance,
+        offline=offline,
+        target_severity=round_array(final_severity, 6),
+        feature_vectors=feature_vectors,
+        scenario_score=scenario_score,
+    )
+
+
+def iter_fault_class_rows(batch: FaultClassBatch, context: NetworkContext, *, seed: int, start_index: int) -> Iterator[dict[str, object]]:
+    """Materialize a batch as scenario row dicts, one row at a time."""
+    node_ids = [f"pv-{position + 1}" for position in range(len(context.buses))]
+    buses = [int(bus) for bus in context.buses]
+    depths = [round_value(context.bus_depths.get(bus, 0.0), 6) for bus in context.buses]
+    node_columns = zip(
+        batch.expected_output_mw.tolist(),
+        batch.observed_output_mw.tolist(),
+        batch.voltage_v.tolist(),
+        batch.inverter_temp_c.tolist(),
+        batch.irradiance.tolist(),
+        batch.offline.tolist(),
+        batch.in_cluster.tolist(),
+        batch.target_severity.tolist(),
+        batch.feature_vectors.tolist(),
+    )
+    scenario_columns = zip(
+        batch.timestamps,
+        batch.fault_node_index.tolist(),
+        batch.scenario_score.tolist(),
+        batch.ambient_temp_c.tolist(),
+        batch.ghi.tolist(),
+        batch.solar_factor.tolist(),
+    )
+    for row_index, (scenario, nodes) in enumerate(zip(scenario_columns, node_columns)):
+        timestamp, fault_node_index, scenario_score, ambient_temp_c, ghi, solar_factor = scenario
+        expected, observed, voltage, temperature, irradiance, offline, in_cluster, severity, features = nodes
+        yield {
+            "index": start_index + row_index,
+            "seed": seed,
+            "fault_class": batch.fault_class,
+            "fault_node_id": node_ids[fault_node_index],
+            "fault_node_index": fault_node_index,
+            "scenario_score": scenario_score,
+            "timestamp": timestamp,
+            "network_source": TOPOLOGY,
+            "simulator_status": "synthetic-pvlib-pandapower",
+            "nodes": [
+                {
+                    "id": node_ids[position],
+                    "bus": buses[position],
+                    "expected_output_mw": expected[position],
+                    "observed_output_mw": observed[position],
+                    "voltage_v": voltage[position],
+                    "inverter_temp_c": temperature[position],
+                    "irradiance": irradiance[position],
+                    "offline": offline[position],
+                    "fault_role": "primary" if position == fault_node_index else ("cluster" if in_cluster[position] else "support"),
+                    "depth": depths[position],
+                    "target_severity": severity[position],
+                    "feature_vector": features[position],
+                }
+                for position in range(len(buses))
+            ],
+            "edges": context.edges,
+            "class_bias": batch.class_bias,
+            "ambient_temp_c": ambient_temp_c,
+            "ghi_wm2": ghi,
+            "solar_factor": solar_factor,
+        }
+
+
+def iter_dataset_rows(
     *,
     count: int,
     seed: int = DEFAULT_SEED,
-    topology: str = TOPOLOGY,
-) -> tuple[list[dict[str, object]], dict[str, object]]:
-    context = build_network_context()
+    context: NetworkContext | None = None,
+    solar_mode: str = "exact",
+    solar_step_s: int = DEFAULT_SOLAR_STEP_S,
+    cache_dir: Path | None = DEFAULT_CACHE_DIR,
+    node_count: int = NODE_COUNT,
+    graph: str = "chain",
+) -> Iterator[dict[str, object]]:
+    """Yield scenario rows class by class; each class is simulated as one array batch.
+
+    ``solar_mode="table"`` interpolates GHI and zenith from a cached grid
+    instead of calling pvlib (see ``solar_table``); the default stays exact.
+    ``node_count`` and ``graph`` select the network context when none is given.
+    ``cache_dir=None`` builds the network context and solar table in memory.
+    """
+    context = context or load_network_context(cache_dir, node_count=node_count, graph=graph)
+    adjacency = context_adjacency(context)
     class_counts = [count // len(FAULT_CLASSES)] * len(FAULT_CLASSES)
     for index in range(count % len(FAULT_CLASSES)):
         class_counts[index] += 1
 
-    rows: list[dict[str, object]] = []
-    start_time = pd.Timestamp("2026-01-01T00:00:00Z")
-    base_location = Location(context.center_latitude, context.center_longitude, tz="UTC")
-
+    start_time = pd.Timestamp(SCENARIO_START)
+    location = Location(context.center_latitude, context.center_longitude, tz="UTC")
+    solar = build_solar_lookup(solar_mode, location, start_time, step_s=solar_step_s, cache_dir=cache_dir)
+    start_index = 0
     for class_index, fault_class in enumerate(FAULT_CLASSES):
         class_count = class_counts[class_index]
         sampler = qmc.LatinHypercube(d=5, seed=seed + 97 * (class_index + 1))
         lhs = sampler.random(class_count) if class_count > 0 else np.empty((0, 5))
-        class_bias = {
-            "healthy_cluster": 0.03,
-            "inverter_trip": 0.20,
-            "soiling_cluster": 0.32,
-            "hot_spot_derating": 0.42,
-            "localized_short_circuit": 0.56,
-        }[fault_class]
-
-        timestamps = pd.DatetimeIndex([
-            start_time + pd.Timedelta(seconds=float(sample[0]) * 365 * 24 * 3600)
-            for sample in lhs
-        ])
-        clearsky = base_location.get_clearsky(timestamps) if len(timestamps) else pd.DataFrame(columns=["ghi"])
-        solar_position = base_location.get_solarposition(timestamps) if len(timestamps) else pd.DataFrame(columns=["apparent_zenith"])
-
-        for row_index, sample in enumerate(lhs):
-            timestamp = timestamps[row_index]
-            ghi = float(clearsky.iloc[row_index]["ghi"]) if not clearsky.empty else 800.0
-            zenith = float(solar_position.iloc[row_index]["apparent_zenith"]) if not solar_position.empty else 45.0
-            solar_factor = clamp(max(0.0, math.cos(math.radians(zenith))) * (ghi / 1000))
-            cloudiness = float(sample[1])
-            weather_noise = float(sample[2])
-            ambient_temp_c = round_value(4 + 16 * math.sin(2 * math.pi * float(sample[3]) - math.pi / 3) + (weather_noise - 0.5) * 8, 3)
-            cluster_center = int(round(float(sample[4]) * (NODE_COUNT - 1)))
-            cluster_nodes = [cluster_center]
-            if fault_class in {"soiling_cluster", "hot_spot_derating", "localized_short_circuit"}:
-                cluster_nodes.append(min(NODE_COUNT - 1, cluster_center + 1))
-            if fault_class == "localized_short_circuit":
-                cluster_nodes = [cluster_center, max(0, cluster_center - 1)]
-            cluster_nodes = sorted({node for node in cluster_nodes if 0 <= node < NODE_COUNT})
-
-            nodes: list[dict[str, object]] = []
-            fault_node_index = cluster_nodes[0] if cluster_nodes else cluster_center
-
-            for node_index, bus in enumerate(context.buses):
-                capacity = context.capacities_mw[bus]
-                base_expected = capacity * (0.35 + 0.6 * solar_factor)
-                depth_penalty = context.bus_depths.get(bus, 0.0)
-                irradiance = ghi * (0.88 + 0.08 * (1 - cloudiness))
-                observed_multiplier = 0.95 + (0.03 * math.sin((row_index + node_index + seed) * 0.9))
-                offline = False
-                temp_boost = 0.0
-                voltage_drop = 0.0
-
-                if fault_class == "inverter_trip" and node_index == fault_node_index:
-                    observed_multiplier = 0.02 + 0.04 * float(sample[2])
-                    offline = True
-                    voltage_drop += 0.08 + 0.04 * float(sample[1])
-                elif fault_class == "soiling_cluster" and node_index in cluster_nodes:
-                    observed_multiplier = 0.48 + 0.18 * float(sample[2])
-                    irradiance *= 0.72 + 0.12 * float(sample[1])
-                    voltage_drop += 0.03 + 0.02 * float(sample[4])
-                elif fault_class == "hot_spot_derating" and node_index in cluster_nodes:
-                    observed_multiplier = 0.58 + 0.15 * float(sample[2])
-                    temp_boost += 18 + 12 * float(sample[1])
-                    voltage_drop += 0.02 + 0.02 * float(sample[4])
-                elif fault_class == "localized_short_circuit" and node_index in cluster_nodes:
-                    observed_multiplier = 0.18 + 0.12 * float(sample[2])
-                    voltage_drop += 0.14 + 0.08 * float(sample[1])
-                else:
-                    observed_multiplier *= 0.98 + 0.03 * float(sample[1])
-
-                expected_output_mw = round_value(max(0.01, base_expected), 6)
-                observed_output_mw = round_value(max(0.0, expected_output_mw * observed_multiplier), 6)
-                voltage_pu = clamp(1.02 - depth_penalty * 0.08 - (1 - observed_multiplier) * 0.12 - voltage_drop, 0.75, 1.05)
-                voltage_v = round_value(voltage_pu * 600, 6)
-                inverter_temp_c = round_value(
-                    ambient_temp_c + 6 + 10 * (irradiance / 1000) + temp_boost + (0.8 * float(sample[0])),
-                    6,
-                )
-                node = {
-                    "id": f"pv-{node_index + 1}",
-                    "bus": int(bus),
-                    "expected_output_mw": expected_output_mw,
-                    "observed_output_mw": observed_output_mw,
-                    "voltage_v": voltage_v,
-                    "inverter_temp_c": inverter_temp_c,
-                    "irradiance": round_value(irradiance, 6),
-                    "offline": offline,
-                    "fault_role": "primary" if node_index == fault_node_index else ("cluster" if node_index in cluster_nodes else "support"),
-                    "depth": round_value(depth_penalty, 6),
-                }
-                nodes.append(node)
-
-            base_severities = []
-            for node in nodes:
-                expected = max(0.001, float(node["expected_output_mw"]))
-                observed = max(0.0, float(node["observed_output_mw"]))
-                output_delta = clamp(abs(expected - observed) / expected)
-                voltage_penalty = clamp(abs(float(node["voltage_v"]) - 600) / 120)
-                thermal_penalty = clamp(max(0.0, (float(node["inverter_temp_c"]) - 45) / 40))
-                irradiance_deficit = clamp(1 - min(1.0, float(node["irradiance"]) / 1000))
-                offline_penalty = 1.0 if node["offline"] else 0.0
-                severity = clamp(
-                    class_bias
-                    + 0.46 * output_delta
-                    + 0.18 * voltage_penalty
-                    + 0.16 * thermal_penalty
-                    + 0.10 * irradiance_deficit
-                    + 0.10 * offline_penalty,
-                )
-                base_severities.append(severity)
-
-            final_severities: list[float] = []
-            for node_index, node in enumerate(nodes):
-                neighbor_scores = []
-                if node_index > 0:
-                    neighbor_scores.append(base_severities[node_index - 1])
-                if node_index + 1 < len(nodes):
-                    neighbor_scores.append(base_severities[node_index + 1])
-                neighbor_mean = mean(neighbor_scores)
-                severity = clamp(base_severities[node_index] * 0.82 + neighbor_mean * 0.18)
-                final_severities.append(severity)
-                node["target_severity"] = round_value(severity, 6)
-                node["feature_vector"] = build_node_feature_vector(node)
-
-            scenario_score = max(final_severities) if final_severities else 0.0
-            rows.append(
-                {
-                    "index": len(rows),
-                    "seed": seed,
-                    "fault_class": fault_class,
-                    "fault_node_id": str(nodes[fault_node_index]["id"]),
-                    "fault_node_index": fault_node_index,
-                    "scenario_score": round_value(scenario_score, 6),
-                    "timestamp": timestamp.isoformat().replace("+00:00", "Z"),
-                    "network_source": TOPOLOGY,
-                    "simulator_status": "synthetic-pvlib-pandapower",
-                    "nodes": nodes,
-                    "edges": context.edges,
-                    "class_bias": class_bias,
-                    "ambient_temp_c": ambient_temp_c,
-                    "ghi_wm2": round_value(ghi, 6),
-                    "solar_factor": round_value(solar_factor, 6),
-                },
-            )
+        batch = simulate_fault_class(context, fault_class, lhs, seed=seed, solar=solar, start_time=start_time, adjacency=adjacency)
+        yield from iter_fault_class_rows(batch, context, seed=seed, start_index=start_index)
+        start_index += batch.count
 
-    manifest = build_dataset_manifest(
+
+def build_dataset_rows(
+    *,
+    count: int,
+    seed: int = DEFAULT_SEED,
+    topology: str = TOPOLOGY,
+) -> tuple[list[dict[str, object]], dict[str, object]]:
+    rows = list(iter_dataset_rows(count=count, seed=seed))
+    return rows, build_pv_dataset_manifest(count=count, seed=seed, topology=topology)
+
+
+def build_pv_dataset_manifest(*, count: int, seed: int = DEFAULT_SEED, topology: str = TOPOLOGY) -> dict[str, Any]:
+    return build_dataset_manifest(
         model_key=MODEL_KEY,
         scenario_count=count,
         simulator_name=SIMULATOR_NAME,
@@ -365,7 +819,6 @@ def build_dataset_rows(
         source_description="pvlib + pandapower synthetic PV fault scenarios on mv_oberrhein topology",
         sampling_strategy="latin_hypercube",
     )
-    return rows, manifest
 
 
 def build_node_feature_vector(node: dict[str, object]) -> list[float]:
@@ -407,6 +860,92 @@ def dense_forward(layer: dict[str, Any], input_vector: list[float], decimals: in
     return output
 
 
+def build_node_feature_array(nodes: list[list[dict[str, Any]]]) -> np.ndarray:
+    """``build_node_feature_vector`` for [scenarios][nodes] node dicts as one [scenarios, nodes, 5] array."""
+    width = len(nodes[0]) if nodes else 0
+    values = np.asarray(
+        [
+            (
+                node["expected_output_mw"],
+                node["observed_output_mw"],
+                node["voltage_v"],
+                node["inverter_temp_c"],
+                node.get("irradiance", 1000.0),
+                node.get("offline", False),
+            )
+            for row in nodes
+            for node in row
+        ],
+        dtype=np.float64,
+    ).reshape(len(nodes), width, len(FEATURE_SOURCE_FIELDS))
+    return node_feature_array_from_values(values)
+
+
+def node_feature_array_from_values(values: np.ndarray) -> np.ndarray:
+    """Feature vectors from a [..., FEATURE_SOURCE_FIELDS] array, elementwise identical to ``build_node_feature_vector``."""
+    values = np.asarray(values, dtype=np.float64)
+    expected = np.where(values[..., 0] > 0.001, values[..., 0], 0.001)
+    observed = np.where(values[..., 1] > 0.0, values[..., 1], 0.0)
+    voltage_v = values[..., 2]
+    thermal = (values[..., 3] - 45) / 55
+    irradiance_ratio = values[..., 4] / 1000
+    offline = values[..., 5] != 0.0
+    return np.stack(
+        [
+            round_array(clamp_array(np.abs(expected - observed) / expected), 6),
+            round_array(clamp_array(np.abs(voltage_v - 600) / 600), 6),
+            round_array(clamp_array(np.where(thermal > 0.0, thermal, 0.0)), 6),
+            round_array(clamp_array(1 - np.where(irradiance_ratio < 1.0, irradiance_ratio, 1.0)), 6),
+            round_array(offline.astype(np.float64), 6),
+        ],
+        axis=-1,
+    )
+
+
+def dense_forward_batch(layer: dict[str, Any], inputs: np.ndarray, decimals: int = 1) -> np.ndarray:
+    """Vectorized ``dense_forward`` over an [N, features] matrix, bit-identical to the scalar path.
+
+    Totals accumulate in float32 one input column at a time, in the scalar
+    order. ``np.exp`` may differ from ``math.exp`` in the last ulp, which can
+    only matter next to a rounding tie, so those elements are recomputed with
+    the scalar expression.
+    """
+    inputs = np.asarray(inputs, dtype=np.float64)
+    weights = layer["weights"]
+    bias = layer["bias"]
+    activation = str(layer["activation"])
+    width = max((len(row) for row in weights), default=0)
+    matrix = np.zeros((len(weights), width), dtype=np.float32)
+    present = np.zeros((len(weights), width), dtype=bool)
+    for row_index, row in enumerate(weights):
+        matrix[row_index, : len(row)] = np.asarray([float(value) for value in row], dtype=np.float64).astype(np.float32)
+        present[row_index, : len(row)] = True
+    columns = np.zeros((len(inputs), width), dtype=np.float32)
+    columns[:, : min(width, inputs.shape[1])] = inputs[:, :width].astype(np.float32)
+    biases = [float(bias[row_index] if row_index < len(bias) else 0.0) for row_index in range(len(weights))]
+    totals = np.tile(np.asarray(biases, dtype=np.float64).astype(np.float32), (len(inputs), 1))
+    for column_index in range(width):
+        step = totals + matrix[:, column_index] * columns[:, column_index : column_index + 1]
+        totals = np.where(present[:, column_index], step, totals)
+
+    totals = totals.astype(np.float64)
+    if activation == "relu":
+        values = np.where(totals > 0.0, totals, 0.0)
+    elif activation == "sigmoid":
+        with np.errstate(over="ignore"):
+            values = 1.0 / (1.0 + np.exp(-totals))
+    else:
+        values = totals
+    output = round_array(values, decimals)
+    if activation == "sigmoid":
+        scaled = values * float(10**decimals)
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) <= 1e-6
+        for position in np.flatnonzero(near_tie):
+            total = float(totals.flat[position])
+            output.flat[position] = round_value(1.0 / (1.0 + math.exp(-total)), decimals)
+    return output
+
+
 def classify_score(score: float, thresholds: dict[str, float]) -> str:
     score = round_value(score, 2)
     if score >= thresholds.get("localized_short_circuit", 0.76):
@@ -421,33 +960,39 @@ def classify_score(score: float, thresholds: dict[str, float]) -> str:
 
 
 def forward_gnn(weights: dict[str, Any], nodes: list[dict[str, Any]], edges: list[dict[str, Any]]) -> dict[str, Any]:
-    node_states: dict[str, float] = {}
+    """Score one scenario graph; message passing runs over a CSR adjacency, so each iteration is linear in edges."""
+    positions: dict[Any, int] = {}
+    for node in nodes:
+        positions.setdefault(node["id"], len(positions))
+    node_total = len(positions)
+    # Edge endpoints missing from ``nodes`` still count towards neighbour weights with a fixed state of 0.
+    for edge in edges:
+        positions.setdefault(str(edge["from"]), len(positions))
+        positions.setdefault(str(edge["to"]), len(positions))
+
+    states = np.zeros(len(positions), dtype=np.float64)
     for node in nodes:
         projected = dense_forward(weights["node_projection"], [float(value) for value in node["features"]], 4)
         base_score = mean(projected) if projected else 0.0
-        node_states[node["id"]] = clamp(base_score)
+        states[positions[node["id"]]] = clamp(base_score)
 
-    adjacency: dict[str, list[dict[str, float]]] = {}
-    for edge in edges:
-        weight = float(edge.get("weight") or weights["edge_weights"][0] or 1.0)
-        adjacency.setdefault(str(edge["from"]), []).append({"id": str(edge["to"]), "weight": weight})
-        adjacency.setdefault(str(edge["to"]), []).append({"id": str(edge["from"]), "weight": weight})
+    adjacency = build_adjacency(
+        len(positions),
+        (positions[str(edge["from"])] for edge in edges),
+        (positions[str(edge["to"])] for edge in edges),
+        (float(edge.get("weight") or weights["edge_weights"][0] or 1.0) for edge in edges),
+    )
+    has_neighbors = (adjacency.degree > 0)[:node_total]
+    total_weight = adjacency.neighbor_sum(np.ones(len(positions)))[:node_total]
+    total_weight = np.where(total_weight != 0.0, total_weight, 1.0)
 
     iterations = max(1, int(weights.get("iterations", 4)))
     for iteration in range(iterations):
-        next_states: dict[str, float] = {}
-        for node in nodes:
-            neighbors = adjacency.get(node["id"], [])
-            if neighbors:
-                weighted_neighbor = sum(node_states.get(entry["id"], 0.0) * entry["weight"] for entry in neighbors)
-                total_weight = sum(entry["weight"] for entry in neighbors) or 1.0
-                neighbor_score = weighted_neighbor / total_weight
-            else:
-                neighbor_score = 0.0
-            current = node_states.get(node["id"], 0.0)
-            blend = float(weights["edge_weights"][iteration % max(1, len(weights["edge_weights"]))] or 1.0)
-            next_states[node["id"]] = clamp(current * (1 - blend * 0.25) + neighbor_score * blend * 0.25)
-        node_states.update(next_states)
+        neighbor_score = np.where(has_neighbors, adjacency.neighbor_sum(states)[:node_total] / total_weight, 0.0)
+        blend = float(weights["edge_weights"][iteration % max(1, len(weights["edge_weights"]))] or 1.0)
+        states[:node_total] = clamp_array(states[:node_total] * (1 - blend * 0.25) + neighbor_score * blend * 0.25)
+
+    node_states = dict(zip(list(positions)[:node_total], states[:node_total].tolist()))
 
     node_scores = {node_id: round_value(score, 6) for node_id, score in node_states.items()}
     top_suspects = sorted(
@@ -515,6 +1060,211 @@ def predict_scenario(weights: dict[str, Any], scenario: dict[str, Any]) -> dict[
     return forward_gnn(weights, nodes, edges)
 
 
+SUSPECT_REASONS = ["localized_short_circuit", "hot_spot_derating", "soiling_cluster", "inverter_trip", "background_signal"]
+
+
+def _reason_codes(scores: np.ndarray, thresholds: dict[str, float]) -> np.ndarray:
+    """Index into SUSPECT_REASONS for each score, following forward_gnn's threshold chain."""
+    conditions = [
+        scores >= thresholds.get("localized_short_circuit", 0.75),
+        scores >= thresholds.get("hot_spot_derating", 0.55),
+        scores >= thresholds.get("soiling_cluster", 0.4),
+        scores >= thresholds.get("inverter_trip", 0.25),
+    ]
+    return np.select(conditions, [0, 1, 2, 3], default=4)
+
+
+def forward_gnn_batch(
+    weights: dict[str, Any],
+    node_ids: list[str],
+    features: np.ndarray,
+    edges: list[dict[str, Any]],
+) -> list[dict[str, Any]]:
+    """``forward_gnn`` for many scenarios that share one graph.
+
+    ``features`` is [scenarios, nodes, k] in ``node_ids`` order. The projection,
+    message passing and ranking all run on [scenarios, nodes] arrays with the
+    scalar operation order, so every prediction is bit-identical to
+    ``forward_gnn`` on the same scenario.
+    """
+    features = np.asarray(features, dtype=np.float64)
+    batch = features.shape[0]
+    positions: dict[str, int] = {}
+    for node_id in node_ids:
+        positions.setdefault(node_id, len(positions))
+    node_total = len(positions)
+    for edge in edges:
+        positions.setdefault(str(edge["from"]), len(positions))
+        positions.setdefault(str(edge["to"]), len(positions))
+    scored_ids = list(positions)[:node_total]
+
+    # A repeated node id keeps the state of its last occurrence, as in the dict-based scalar path.
+    last_occurrence = {node_id: index for index, node_id in enumerate(node_ids)}
+    projected = dense_forward_batch(
+        weights["node_projection"],
+        features[:, list(last_occurrence.values()), :].reshape(batch * node_total, features.shape[-1]),
+        4,
+    ).reshape(batch, node_total, len(weights["node_projection"]["weights"]))
+    base_scores = np.zeros((batch, node_total), dtype=np.float64)
+    for column in range(projected.shape[-1]):
+        base_scores = base_scores + projected[..., column]
+    if projected.shape[-1]:
+        base_scores = base_scores / projected.shape[-1]
+    states = np.zeros((batch, len(positions)), dtype=np.float64)
+    states[:, :node_total] = clamp_array(base_scores)
+
+    edge_weights = [float(edge.get("weight") or weights["edge_weights"][0] or 1.0) for edge in edges]
+    adjacency = build_adjacency(
+        len(positions),
+        (positions[str(edge["from"])] for edge in edges),
+        (positions[str(edge["to"])] for edge in edges),
+        edge_weights,
+    )
+    has_neighbors = (adjacency.degree > 0)[:node_total]
+    total_weight = adjacency.neighbor_sum(np.ones(len(positions)))[:node_total]
+    total_weight = np.where(total_weight != 0.0, total_weight, 1.0)
+    iterations = max(1, int(weights.get("iterations", 4)))
+    for iteration in range(iterations):
+        neighbor_score = np.where(has_neighbors, adjacency.neighbor_sum(states)[:, :node_total] / total_weight, 0.0)
+        blend = float(weights["edge_weights"][iteration % max(1, len(weights["edge_weights"]))] or 1.0)
+        states[:, :node_total] = clamp_array(states[:, :node_total] * (1 - blend * 0.25) + neighbor_score * blend * 0.25)
+
+    thresholds = weights["class_thresholds"]
+    scores = states[:, :node_total]
+    node_scores = round_array(scores, 6)
+    # sorted() on (-bucket, nodeId) is reproduced with one integer key per node.
+    id_rank = np.empty(node_total, dtype=np.int64)
+    id_rank[sorted(range(node_total), key=lambda position: scored_ids[position])] = np.arange(node_total)
+    node_buckets = np.rint(clamp_array(node_scores) * 1000).astype(np.int64)
+    suspect_order = np.argsort(-node_buckets * max(1, node_total) + id_rank, axis=1, kind="stable")[:, :5]
+    suspect_reasons = _reason_codes(np.take_along_axis(scores, suspect_order, axis=1), thresholds)
+
+    edge_from = np.asarray([positions[str(edge["from"])] for edge in edges], dtype=np.int64)
+    edge_to = np.asarray([positions[str(edge["to"])] for edge in edges], dtype=np.int64)
+    edge_scores = round_array(((states[:, edge_from] + states[:, edge_to]) / 2) * np.asarray(edge_weights, dtype=np.float64), 6)
+    edge_labels = [(str(edge["from"]), str(edge["to"])) for edge in edges]
+    unique_labels = sorted(set(edge_labels))
+    label_rank = {label: rank for rank, label in enumerate(unique_labels)}
+    pair_rank = np.asarray([label_rank[label] for label in edge_labels], dtype=np.int64)
+    edge_buckets = np.rint(clamp_array(edge_scores) * 1000).astype(np.int64)
+    edge_order = np.argsort(-edge_buckets * max(1, len(unique_labels)) + pair_rank, axis=1, kind="stable")[:, :5]
+
+    top_scores = np.take_along_axis(node_scores, suspect_order[:, :1], axis=1)[:, 0] if node_total else np.zeros(batch)
+    labels = list(thresholds)
+    probabilities = np.empty((batch, len(labels)), dtype=np.float64)
+    for column, threshold in enumerate(thresholds.values()):
+        probabilities[:, column] = round_array(clamp_array(top_scores / max(0.001, float(threshold))), 6)
+    confidence = round_array(clamp_array(top_scores), 4).tolist()
+
+    predictions: list[dict[str, Any]] = []
+    rows = zip(
+        top_scores.tolist(),
+        confidence,
+        node_scores.tolist(),
+        suspect_order.tolist(),
+        suspect_reasons.tolist(),
+        edge_scores.tolist(),
+        edge_order.tolist(),
+        probabilities.tolist(),
+    )
+    for top_score, confidence_score, row_scores, suspects, reasons, row_edges, top_edges, row_probabilities in rows:
+        predictions.append(
+            {
+                "faultClass": classify_score(top_score, thresholds),
+                "confidenceScore": confidence_score,
+                "nodeScores": dict(zip(scored_ids, row_scores)),
+                "topSuspects": [
+                    {"nodeId": scored_ids[position], "riskScore": row_scores[position], "reason": SUSPECT_REASONS[reason]}
+                    for position, reason in zip(suspects, reasons)
+                ],
+                "topEdges": [
+                    {"fromNodeId": edge_labels[position][0], "toNodeId": edge_labels[position][1], "riskScore": row_edges[position]}
+                    for position in top_edges
+                ],
+                "classProbabilities": dict(zip(labels, row_probabilities)),
+            },
+        )
+    return predictions
+
+
+def predict_scenarios(weights: dict[str, Any], scenarios: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Batched ``predict_scenario``: scenarios that share a graph are scored as one tensor batch."""
+    groups: dict[tuple[Any, ...], list[int]] = {}
+    for position, scenario in enumerate(scenarios):
+        key = (
+            tuple(str(node["id"]) for node in scenario["nodes"]),
+            tuple((str(edge["from"]), str(edge["to"]), float(edge.get("weight", 1.0))) for edge in scenario["edges"]),
+        )
+        groups.setdefault(key, []).append(position)
+
+    predictions: list[dict[str, Any] | None] = [None] * len(scenarios)
+    for (node_ids, edge_keys), members in groups.items():
+        features = build_node_feature_array([scenarios[position]["nodes"] for position in members])
+        edges = [{"from": source, "to": target, "weight": weight} for source, target, weight in edge_keys]
+        for position, prediction in zip(members, forward_gnn_batch(weights, list(node_ids), features, edges), strict=True):
+            predictions[position] = prediction
+    return predictions  # type: ignore[return-value]
+
+
+def column_scenario_summaries(columns: dict[str, np.ndarray], positions: np.ndarray) -> list[dict[str, Any]]:
+    """Scenario-level fields of the sidecar rows at ``positions``; enough for the scoring metrics without node dicts."""
+    return [
+        {
+            "index": index,
+            "fault_class": fault_class,
+            "fault_node_id": f"pv-{fault_node_index + 1}",
+            "scenario_score": scenario_score,
+        }
+        for index, fault_class, fault_node_index, scenario_score in zip(
+            np.asarray(columns["index"][positions]).tolist(),
+            np.asarray(columns["fault_class"][positions]).tolist(),
+            np.asarray(columns["fault_node_index"][positions]).tolist(),
+            np.asarray(columns["scenario_score"][positions]).tolist(),
+            strict=True,
+        )
+    ]
+
+
+def predict_column_scenarios(weights: dict[str, Any], columns: dict[str, np.ndarray], positions: np.ndarray) -> list[dict[str, Any]]:
+    """``predict_scenarios`` for the sidecar rows at ``positions``, read from the memory-mapped columns.
+
+    Node ids are the ``pv-{n}`` positions ``pv_columns_from_rows`` packed the
+    nodes by, and features come from the stored node values, so predictions
+    match ``predict_scenarios`` on the JSONL rows.
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    node_values = np.asarray(columns["node_values"][positions])
+    features = node_feature_array_from_values(node_values[..., [NODE_VALUE_FIELDS.index(field) for field in FEATURE_SOURCE_FIELDS]])
+    node_ids = [f"pv-{position + 1}" for position in range(node_values.shape[1])]
+    edge_from = np.asarray(columns["edge_from"][positions])
+    edge_to = np.asarray(columns["edge_to"][positions])
+    edge_weight = np.asarray(columns["edge_weight"][positions])
+
+    groups: dict[bytes, list[int]] = {}
+    for member in range(len(positions)):
+        key = edge_from[member].tobytes() + edge_to[member].tobytes() + edge_weight[member].tobytes()
+        groups.setdefault(key, []).append(member)
+    predictions: list[dict[str, Any] | None] = [None] * len(positions)
+    for members in groups.values():
+        first = members[0]
+        edges = [
+            {"from": node_ids[source], "to": node_ids[target], "weight": weight}
+            for source, target, weight in zip(edge_from[first].tolist(), edge_to[first].tolist(), edge_weight[first].tolist(), strict=True)
+        ]
+        for member, prediction in zip(members, forward_gnn_batch(weights, node_ids, features[members], edges), strict=True):
+            predictions[member] = prediction
+    return predictions  # type: ignore[return-value]
+
+
+def check_prediction_parity(weights: dict[str, Any], scenarios: list[dict[str, Any]], predictions: list[dict[str, Any]]) -> list[int]:
+    """Return positions where the batched predictions differ from ``predict_scenario`` in their JSON encoding."""
+    return [
+        position
+        for position, (scenario, prediction) in enumerate(zip(scenarios, predictions, strict=True))
+        if stable_json_dumps(predict_scenario(weights, scenario)) != stable_json_dumps(prediction)
+    ]
+
+
 def split_indices(size: int, seed: int, train_ratio: float = 0.8, val_ratio: float = 0.1) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     rng = np.random.default_rng(seed)
     indices = np.arange(size)
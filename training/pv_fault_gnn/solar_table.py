@@ -0,0 +1,122 @@
+"""Clear-sky GHI and apparent zenith lookups for PV fault scenario synthesis.
+
+``exact`` calls pvlib for every scenario timestamp, which is what the published
+datasets and conformance fixtures were generated with. ``table`` precomputes
+both quantities once on a fixed time grid over the scenario year, stores the
+grid as ``.npz`` in the scenario cache directory (keyed by location, start,
+step, clear-sky model and this module's source), and linearly interpolates, so
+repeated generations for the same topology skip pvlib entirely.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import pvlib
+from pvlib.location import Location
+
+from training.common.scenario_cache import DEFAULT_CACHE_DIR, scenario_cache_key
+
+SOLAR_MODES = ("exact", "table")
+DEFAULT_SOLAR_STEP_S = 60
+SOLAR_TABLE_SUBDIR = "solar"
+SOLAR_TABLE_SPAN_S = 365 * 24 * 3600
+CLEARSKY_MODEL = "ineichen"
+
+SolarLookup = Callable[[pd.DatetimeIndex], tuple[np.ndarray, np.ndarray]]
+
+
+def exact_solar_lookup(location: Location) -> SolarLookup:
+    """Direct pvlib evaluation; the solar position is computed once and shared with the clear-sky model."""
+
+    def lookup(timestamps: pd.DatetimeIndex) -> tuple[np.ndarray, np.ndarray]:
+        if len(timestamps) == 0:
+            return np.empty(0), np.empty(0)
+        solar_position = location.get_solarposition(timestamps)
+        clearsky = location.get_clearsky(timestamps, model=CLEARSKY_MODEL, solar_position=solar_position)
+        return clearsky["ghi"].to_numpy(dtype=np.float64), solar_position["apparent_zenith"].to_numpy(dtype=np.float64)
+
+    return lookup
+
+
+def solar_table_path(location: Location, start: pd.Timestamp, step_s: int, cache_dir: Path = DEFAULT_CACHE_DIR) -> Path:
+    params = {
+        "purpose": "solar_table",
+        "latitude": float(location.latitude),
+        "longitude": float(location.longitude),
+        "altitude": float(location.altitude),
+        "start": start.isoformat(),
+        "span_s": SOLAR_TABLE_SPAN_S,
+        "step_s": int(step_s),
+        "model": CLEARSKY_MODEL,
+        "pvlib": pvlib.__version__,
+    }
+    return cache_dir / SOLAR_TABLE_SUBDIR / f"{scenario_cache_key(params, [__file__])}.npz"
+
+
+def load_solar_table(
+    location: Location,
+    start: pd.Timestamp,
+    step_s: int = DEFAULT_SOLAR_STEP_S,
+    cache_dir: Path | None = DEFAULT_CACHE_DIR,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return (ghi, apparent_zenith) on ``start + k * step_s``, building and caching the grid on first use.
+
+    ``cache_dir=None`` computes the grid without reading or writing the cache.
+    """
+    if step_s <= 0:
+        raise ValueError("step_s must be positive.")
+    path = solar_table_path(location, start, step_s, cache_dir) if cache_dir is not None else None
+    if path is not None and path.exists():
+        # Touch the file so LRU eviction sees it as recently used.
+        os.utime(path)
+        with np.load(path, allow_pickle=False) as table:
+            return table["ghi"], table["apparent_zenith"]
+    grid = start + pd.to_timedelta(np.arange(0, SOLAR_TABLE_SPAN_S + step_s, step_s, dtype=np.int64), unit="s")
+    ghi, zenith = exact_solar_lookup(location)(grid)
+    if path is None:
+        return ghi, zenith
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_name(f"{path.stem}.tmp.npz")
+    np.savez(staging, ghi=ghi, apparent_zenith=zenith)
+    os.replace(staging, path)
+    return ghi, zenith
+
+
+def table_solar_lookup(
+    location: Location,
+    start: pd.Timestamp,
+    step_s: int = DEFAULT_SOLAR_STEP_S,
+    cache_dir: Path | None = DEFAULT_CACHE_DIR,
+) -> SolarLookup:
+    """Linear interpolation into the cached grid; timestamps must fall within a year of ``start``."""
+    ghi_grid, zenith_grid = load_solar_table(location, start, step_s, cache_dir)
+    grid_s = np.arange(len(ghi_grid), dtype=np.float64) * step_s
+    start_ns = start.value
+
+    def lookup(timestamps: pd.DatetimeIndex) -> tuple[np.ndarray, np.ndarray]:
+        offsets_s = (timestamps.asi8 - start_ns) / 1e9
+        if len(offsets_s) and (offsets_s.min() < 0 or offsets_s.max() > grid_s[-1]):
+            raise ValueError("Timestamps fall outside the cached solar table; use the exact solar mode.")
+        return np.interp(offsets_s, grid_s, ghi_grid), np.interp(offsets_s, grid_s, zenith_grid)
+
+    return lookup
+
+
+def build_solar_lookup(
+    mode: str,
+    location: Location,
+    start: pd.Timestamp,
+    *,
+    step_s: int = DEFAULT_SOLAR_STEP_S,
+    cache_dir: Path | None = DEFAULT_CACHE_DIR,
+) -> SolarLookup:
+    if mode == "exact":
+        return exact_solar_lookup(location)
+    if mode == "table":
+        return table_solar_lookup(location, start, step_s, cache_dir)
+    raise ValueError(f"Unknown solar lookup mode {mode!r}; use one of {SOLAR_MODES}.")
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import argparse
-import json
 import math
 import random
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -16,6 +16,8 @@ import numpy as np
 import torch
 from torch import nn
 
+from training.common.columnar import load_columns
+from training.common.jsonl_io import iter_jsonl
 from training.common.metrics_export import build_placeholder_metrics
 from training.common.weight_export import DEFAULT_SEED, build_manifest, compute_artifact_sha, write_json
 from training.pv_fault_gnn.simulator import (
@@ -23,15 +25,18 @@ from training.pv_fault_gnn.simulator import (
     MODEL_KEY,
     MODEL_VERSION,
     NODE_FEATURE_COLUMNS,
+    NODE_VALUE_FIELDS,
     SIMULATOR_NAME,
     SIMULATOR_VERSION,
     TOPOLOGY,
     build_node_feature_vector,
     classify_score,
+    column_scenario_summaries,
     confusion_counts,
     f1_from_counts,
-    forward_gnn,
     mean,
+    predict_column_scenarios,
+    predict_scenarios,
     round_value,
     split_indices,
     top_margin_from_prediction,
@@ -50,10 +55,24 @@ CLASS_TARGET_WEIGHT = 0.8
 NODE_TARGET_WEIGHT = 0.2
 
 
+@dataclass(frozen=True)
+class ScenarioSplit:
+    """One split's rows. With a columnar sidecar the rows are scenario summaries and
+    scoring reads node data from ``columns`` at ``positions`` instead of the JSONL."""
+
+    rows: list[dict[str, object]]
+    columns: dict[str, np.ndarray] | None = None
+    positions: np.ndarray | None = None
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, np.ndarray], positions: np.ndarray) -> ScenarioSplit:
+        return cls(rows=column_scenario_summaries(columns, positions), columns=columns, positions=positions)
+
+
 def load_rows(path: Path) -> list[dict[str, object]]:
     if not path.exists():
         return []
-    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    return list(iter_jsonl(path))
 
 
 def set_determinism(seed: int) -> None:
@@ -77,6 +96,15 @@ def flatten_nodes(rows: list[dict[str, object]]) -> tuple[np.ndarray, np.ndarray
     return np.asarray(features, dtype=np.float32), np.asarray(targets, dtype=np.float32)
 
 
+def flatten_node_columns(columns: dict[str, np.ndarray], indices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Columnar equivalent of flatten_nodes for the scenarios at ``indices``."""
+    features = np.asarray(columns["node_features"][indices], dtype=np.float64)
+    severities = np.asarray(columns["node_values"][indices][:, :, NODE_VALUE_FIELDS.index("target_severity")], dtype=np.float64)
+    anchors = np.asarray([CLASS_TARGET_ANCHORS.get(str(label), 0.5) for label in columns["fault_class"][indices]], dtype=np.float64)
+    targets = np.round((anchors[:, None] * CLASS_TARGET_WEIGHT + severities * NODE_TARGET_WEIGHT) * 1e6) / 1e6
+    return features.reshape(-1, features.shape[-1]).astype(np.float32), targets.reshape(-1).astype(np.float32)
+
+
 def standardize(features: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     means = features.mean(axis=0)
     stds = features.std(axis=0)
@@ -104,35 +132,22 @@ def export_layer(model: nn.Module) -> dict[str, object]:
     }
 
 
-def predict_scores(weights: dict[str, object], rows: list[dict[str, object]]) -> list[dict[str, object]]:
-    outputs = []
-    for row in rows:
-      # Scenario-level evaluation uses the worst node score, mirroring runtime behavior.
-        prediction = forward_gnn(
-            weights,
-            [
-                {
-                    "id": str(node["id"]),
-                    "features": build_node_feature_vector(node),
-                }
-                for node in row["nodes"]
-            ],
-            [
-                {
-                    "from": str(edge["from"]),
-                    "to": str(edge["to"]),
-                    "weight": float(edge.get("weight", 1.0)),
-                }
-                for edge in row["edges"]
-            ],
-        )
-        outputs.append({
+def predict_scores(weights: dict[str, object], split: ScenarioSplit) -> list[dict[str, object]]:
+    # Scenario-level evaluation uses the worst node score, mirroring runtime behavior.
+    # predict_scenarios batches rows that share a graph and is bit-identical to forward_gnn per row.
+    if split.columns is not None:
+        predictions = predict_column_scenarios(weights, split.columns, split.positions)
+    else:
+        predictions = predict_scenarios(weights, split.rows)
+    return [
+        {
             "row": row,
             "prediction": prediction,
             "score": float(prediction["confidenceScore"]),
             "fault_class": str(row["fault_class"]),
-        })
-    return outputs
+        }
+        for row, prediction in zip(split.rows, predictions, strict=True)
+    ]
 
 
 def initial_thresholds(results: list[dict[str, object]]) -> dict[str, float]:
@@ -206,8 +221,8 @@ def candidate_edge_schedules() -> list[list[float]]:
 
 def evaluate_candidate(
     candidate_edge_weights: list[float],
-    train_rows: list[dict[str, object]],
-    val_rows: list[dict[str, object]],
+    train_split: ScenarioSplit,
+    val_split: ScenarioSplit,
     node_layer: dict[str, object],
 ) -> dict[str, object]:
     provisional_weights = {
@@ -222,13 +237,13 @@ def evaluate_candidate(
             "localized_short_circuit": 0.7,
         },
     }
-    val_results = predict_scores(provisional_weights, val_rows)
+    val_results = predict_scores(provisional_weights, val_split)
     thresholds = refine_thresholds(val_results, initial_thresholds(val_results))
     final_weights = {
         **provisional_weights,
         "class_thresholds": thresholds,
     }
-    val_predictions = predict_scores(final_weights, val_rows)
+    val_predictions = predict_scores(final_weights, val_split)
     labels = [entry["fault_class"] for entry in val_predictions]
     predicted = [classify_score(float(entry["score"]), thresholds) for entry in val_predictions]
     f1 = f1_from_counts(confusion_counts(labels, predicted))
@@ -269,19 +284,25 @@ def main() -> int:
     parser.add_argument("--learning-rate", type=float, default=0.01, help="Adam learning rate.")
     args = parser.parse_args()
 
-    rows = load_rows(Path(args.input))
-    if not rows:
+    # A columnar sidecar replaces the JSONL entirely; node data is read from the memory-mapped columns.
+    columns = load_columns(Path(args.input))
+    rows = load_rows(Path(args.input)) if columns is None else []
+    row_count = len(columns["index"]) if columns is not None else len(rows)
+    if not row_count:
         raise SystemExit("No scenario rows found. Run generate_scenarios.py first.")
 
     set_determinism(args.seed)
-    train_idx, val_idx, test_idx = split_indices(len(rows), args.seed)
-    train_rows = [rows[index] for index in train_idx]
-    val_rows = [rows[index] for index in val_idx]
-    test_rows = [rows[index] for index in test_idx]
-
-    x_train, y_train = flatten_nodes(train_rows)
-    x_val, y_val = flatten_nodes(val_rows)
-    x_test, y_test = flatten_nodes(test_rows)
+    train_idx, val_idx, test_idx = split_indices(row_count, args.seed)
+    if columns is not None:
+        train_split, val_split, test_split = (ScenarioSplit.from_columns(columns, indices) for indices in (train_idx, val_idx, test_idx))
+        x_train, y_train = flatten_node_columns(columns, train_idx)
+        x_val, y_val = flatten_node_columns(columns, val_idx)
+        x_test, y_test = flatten_node_columns(columns, test_idx)
+    else:
+        train_split, val_split, test_split = (ScenarioSplit(rows=[rows[index] for index in indices]) for indices in (train_idx, val_idx, test_idx))
+        x_train, y_train = flatten_nodes(train_split.rows)
+        x_val, y_val = flatten_nodes(val_split.rows)
+        x_test, y_test = flatten_nodes(test_split.rows)
 
     x_train_std, feature_means, feature_stds = standardize(x_train)
     x_val_std = (x_val - feature_means) / feature_stds
@@ -334,7 +355,7 @@ def main() -> int:
 
     node_layer = export_layer(model)
     candidate_results = [
-        evaluate_candidate(candidate, train_rows, val_rows, node_layer)
+        evaluate_candidate(candidate, train_split, val_split, node_layer)
         for candidate in candidate_edge_schedules()
     ]
     best_candidate = max(
@@ -349,9 +370,9 @@ def main() -> int:
         "class_thresholds": best_candidate["thresholds"],
     }
 
-    train_results = predict_scores(final_weights, train_rows)
+    train_results = predict_scores(final_weights, train_split)
     val_results = best_candidate["val_predictions"]
-    test_results = predict_scores(final_weights, test_rows)
+    test_results = predict_scores(final_weights, test_split)
 
     train_macro_f1 = f1_from_counts(
         confusion_counts(